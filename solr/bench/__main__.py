@@ -0,0 +1,4 @@
+from solr.bench.query import main
+
+if __name__ == "__main__":
+    main()
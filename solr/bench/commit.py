@@ -0,0 +1,63 @@
+import os
+import time
+from argparse import ArgumentParser, Namespace
+
+from solr.usage.commit import COMMIT_MODES, CommitPolicy
+from solr.usage.document import generate_documents_columnar, get_solr_client
+from solr.util import with_env
+
+
+def measure_commit_policy(
+    client, policy: CommitPolicy, documents: list, batch_size: int
+) -> float:
+    start_time = time.perf_counter()
+    for index in range(0, len(documents), batch_size):
+        policy.add(client, documents[index : index + batch_size])
+    policy.finish(client)
+    return len(documents) / (time.perf_counter() - start_time)
+
+
+def run_commit_benchmark(
+    solr_url: str,
+    collection_name: str,
+    modes: list[str],
+    number_of_documents: int,
+    batch_size: int,
+) -> list[dict]:
+    client = get_solr_client(solr_url, collection_name)
+    documents = generate_documents_columnar(1, number_of_documents)
+
+    results = []
+    for mode in modes:
+        docs_per_second = measure_commit_policy(
+            client, CommitPolicy(mode), documents, batch_size
+        )
+        results.append({"mode": mode, "docs_per_second": docs_per_second})
+        print(f"mode={mode:<7} {docs_per_second:>12,.0f} docs/s")
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Compare ingest throughput per commit policy")
+    parser.add_argument("--modes", nargs="+", default=list(COMMIT_MODES))
+    parser.add_argument("--documents", type=int, default=50_000)
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="Documents per add request"
+    )
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    args = parse_args()
+    run_commit_benchmark(
+        os.getenv("SOLR_URL"),
+        os.getenv("SOLR_COLLECTION"),
+        args.modes,
+        args.documents,
+        args.batch_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import timeit
+from argparse import ArgumentParser, Namespace
+
+import pysolr
+
+from solr.usage.document import generate_documents_columnar
+from solr.usage.encoding import UPDATE_FORMATS, encode_documents
+
+
+def run_case(name: str, func, number_of_documents: int, repeat: int) -> dict:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    size = len(func())
+    print(
+        f"{name:<35} {best * 1000:>10.2f} ms  "
+        f"{number_of_documents / best:>12,.0f} docs/s  {size / 1024:>10,.0f} KiB"
+    )
+    return {
+        "case": name,
+        "seconds": best,
+        "documents_per_second": number_of_documents / best,
+        "bytes": size,
+    }
+
+
+def run_encoding_benchmark(number_of_documents: int, repeat: int) -> list[dict]:
+    documents = generate_documents_columnar(1, number_of_documents)
+    # What pysolr builds and posts for client.add(documents)
+    solr = pysolr.Solr("http://localhost:8983/solr/bench")
+
+    results = [
+        run_case(
+            "pysolr add body (json + sanitize)",
+            lambda: pysolr.sanitize(solr._build_docs(documents)[1]),
+            number_of_documents,
+            repeat,
+        )
+    ]
+    for update_format in UPDATE_FORMATS:
+        results.append(
+            run_case(
+                f"encode_documents({update_format})",
+                lambda: encode_documents(documents, update_format),
+                number_of_documents,
+                repeat,
+            )
+        )
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(
+        description="Encode time and payload size of JSON vs. CBOR update bodies"
+    )
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_encoding_benchmark(args.documents, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
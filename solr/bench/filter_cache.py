@@ -0,0 +1,121 @@
+import os
+import random
+import time
+from argparse import ArgumentParser, Namespace
+
+from solr.session import get_http_session
+from solr.usage.document import get_solr_client
+from solr.usage.query_builder import SolrQuery, escape_query_value
+from solr.util import with_env
+
+FILTER_CACHE_METRIC = "CACHE.searcher.filterCache"
+
+
+def read_filter_cache_stats(solr_url: str, collection_name: str) -> dict:
+    """
+    Sum the cumulative filterCache counters of the collection's cores hosted
+    on the node behind ``solr_url``.
+    """
+    response = get_http_session().get(
+        f"{solr_url}/admin/metrics",
+        params={"group": "core", "prefix": FILTER_CACHE_METRIC, "wt": "json"},
+    )
+    response.raise_for_status()
+
+    stats = {"lookups": 0, "hits": 0}
+    for registry, metrics in response.json()["metrics"].items():
+        if f".{collection_name}." not in registry:
+            continue
+        cache = metrics.get(FILTER_CACHE_METRIC, {})
+        for name in stats:
+            stats[name] += cache.get(f"cumulative_{name}", cache.get(name, 0))
+    return stats
+
+
+def sample_facet_values(client, field: str, limit: int) -> list:
+    results = client.search(
+        "*:*", rows=0, facet="true", **{"facet.field": field, "facet.limit": limit}
+    )
+    return results.facets["facet_fields"][field][::2]
+
+
+def legacy_query(client, gender: str, city: str, min_age: int, max_age: int):
+    """All constraints in ``q``, as the query helpers did before the builder."""
+    return client.search(
+        f"gender:{escape_query_value(gender)} AND city:{escape_query_value(city)}"
+        f" AND age:[{min_age} TO {max_age}]"
+    )
+
+
+def filter_query(client, gender: str, city: str, min_age: int, max_age: int):
+    return (
+        SolrQuery()
+        .filter("gender", gender)
+        .filter("city", city)
+        .range("age", min_age, max_age)
+        .search(client)
+    )
+
+
+def run_filter_cache_benchmark(
+    solr_url: str, collection_name: str, number_of_queries: int, seed: int
+) -> list[dict]:
+    client = get_solr_client(solr_url, collection_name)
+    genders = sample_facet_values(client, "gender", 10)
+    cities = sample_facet_values(client, "city", 1_000)
+    # A handful of age brackets repeat across queries, cities mostly do not
+    age_ranges = [(18, 25), (26, 35), (36, 50), (51, 65), (66, 80)]
+
+    rng = random.Random(seed)
+    workload = [
+        (rng.choice(genders), rng.choice(cities), *rng.choice(age_ranges))
+        for _ in range(number_of_queries)
+    ]
+
+    results = []
+    for name, query in (("q", legacy_query), ("fq", filter_query)):
+        before = read_filter_cache_stats(solr_url, collection_name)
+        start_time = time.perf_counter()
+        for arguments in workload:
+            query(client, *arguments)
+        elapsed = time.perf_counter() - start_time
+        after = read_filter_cache_stats(solr_url, collection_name)
+
+        lookups = after["lookups"] - before["lookups"]
+        hits = after["hits"] - before["hits"]
+        hit_rate = hits / lookups if lookups else 0.0
+        results.append(
+            {
+                "style": name,
+                "queries_per_second": number_of_queries / elapsed,
+                "filter_cache_lookups": lookups,
+                "filter_cache_hits": hits,
+                "filter_cache_hit_rate": hit_rate,
+            }
+        )
+        print(
+            f"style={name:<3} {number_of_queries / elapsed:>10,.1f} queries/s "
+            f"filterCache lookups={lookups:>7} hits={hits:>7} hit rate={hit_rate:.1%}"
+        )
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(
+        description="Compare filterCache hit rate of q-only vs. fq based queries"
+    )
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    args = parse_args()
+    run_filter_cache_benchmark(
+        os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"), args.queries, args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
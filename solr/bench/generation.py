@@ -0,0 +1,74 @@
+import time
+from argparse import ArgumentParser, Namespace
+
+from solr.usage.document import (
+    VOCABULARY_SIZE,
+    generate_documents,
+    generate_documents_columnar,
+    pre_generate_vocabularies,
+)
+
+DEFAULT_CHUNK_SIZES = [5_000, 50_000, 500_000]
+
+
+def measure_docs_per_second(generator, chunk_size: int) -> float:
+    start_time = time.perf_counter()
+    documents = generator(1, chunk_size)
+    elapsed = time.perf_counter() - start_time
+    return len(documents) / elapsed
+
+
+def run_generation_benchmark(
+    chunk_sizes: list[int], vocabulary_size: int = VOCABULARY_SIZE
+) -> list[dict]:
+    start_time = time.perf_counter()
+    pre_generate_vocabularies(vocabulary_size)
+    print(
+        f"Pre-sampled vocabularies of size {vocabulary_size} in "
+        f"{time.perf_counter() - start_time:.2f} seconds."
+    )
+
+    results = []
+    for chunk_size in chunk_sizes:
+        per_row = measure_docs_per_second(generate_documents, chunk_size)
+        columnar = measure_docs_per_second(generate_documents_columnar, chunk_size)
+        results.append(
+            {
+                "chunk_size": chunk_size,
+                "per_row_docs_per_second": per_row,
+                "columnar_docs_per_second": columnar,
+                "speedup": columnar / per_row,
+            }
+        )
+        print(
+            f"chunk_size={chunk_size:>9,}  per-row={per_row:>12,.0f} docs/s  "
+            f"columnar={columnar:>12,.0f} docs/s  speedup={columnar / per_row:.1f}x"
+        )
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Compare document generation throughput")
+    parser.add_argument(
+        "--chunk-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CHUNK_SIZES,
+        help="Chunk sizes to benchmark",
+    )
+    parser.add_argument(
+        "--vocabulary-size",
+        type=int,
+        default=VOCABULARY_SIZE,
+        help="Size of the pre-sampled vocabularies",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_generation_benchmark(args.chunk_sizes, args.vocabulary_size)
+
+
+if __name__ == "__main__":
+    main()
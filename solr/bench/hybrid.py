@@ -0,0 +1,70 @@
+import json
+import os
+import time
+from argparse import ArgumentParser, Namespace
+
+import numpy as np
+
+from solr.ltr.hybrid import HYBRID_MODES, hybrid_search
+from solr.usage.document import get_solr_client
+from solr.util import with_env
+
+QUERIES = [
+    "looking for someone who likes hiking and outdoor activities",
+    "music lover from a big city",
+    "quiet person who enjoys books and coffee",
+    "sporty and adventurous, loves to travel",
+]
+
+
+def measure_mode(client, model, mode: str, queries: list, rounds: int) -> dict:
+    latencies = []
+    for _ in range(rounds):
+        for query in queries:
+            start_time = time.perf_counter()
+            hybrid_search(client, model, query, mode, 0.4, 0.6, top_k=10)
+            latencies.append(time.perf_counter() - start_time)
+
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, (50, 95))
+    print(f"mode={mode:<8} p50={p50:>8.1f} ms  p95={p95:>8.1f} ms")
+    return {"mode": mode, "p50_ms": float(p50), "p95_ms": float(p95)}
+
+
+def run_hybrid_benchmark(
+    solr_url: str, collection_name: str, modes: list[str], rounds: int
+) -> list[dict]:
+    from sentence_transformers import SentenceTransformer
+
+    client = get_solr_client(solr_url, collection_name)
+    model = SentenceTransformer(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    with open("json/sentences.json", "r") as file:
+        queries = QUERIES + [s["content"] for s in json.load(file)["sentences"]]
+
+    # Warm up the query embedding cache and Solr's caches, so all modes compare
+    # request latency only
+    for mode in modes:
+        for query in queries:
+            hybrid_search(client, model, query, mode, top_k=10)
+
+    return [measure_mode(client, model, mode, queries, rounds) for mode in modes]
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(
+        description="Latency of hybrid search modes vs. the single request filter mode"
+    )
+    parser.add_argument("--modes", nargs="+", default=list(HYBRID_MODES))
+    parser.add_argument("--rounds", type=int, default=20)
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    args = parse_args()
+    run_hybrid_benchmark(
+        os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"), args.modes, args.rounds
+    )
+
+
+if __name__ == "__main__":
+    main()
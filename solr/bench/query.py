@@ -0,0 +1,376 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from argparse import ArgumentParser, Namespace
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from faker import Faker
+
+from solr.bench.filter_cache import sample_facet_values
+from solr.session import get_http_session
+from solr.usage.cache import set_query_cache
+from solr.usage.document import get_solr_client
+from solr.usage.query import (
+    query_by_age_range,
+    query_by_gender_and_city,
+    query_document_count,
+    query_with_boosting,
+)
+from solr.util import with_env
+
+DEFAULT_MIX = {
+    "query_document_count": 1,
+    "query_by_age_range": 3,
+    "query_by_gender_and_city": 3,
+    "query_with_boosting": 2,
+}
+VECTOR_QUERIES = ("semantic_search", "hybrid_search")
+PERCENTILES = (50, 95, 99)
+
+QTIME_PATTERN = re.compile(rb'"QTime"\s*:\s*(\d+)')
+
+
+class QTimeRecorder:
+    """
+    Response hook that sums the ``QTime`` of every Solr response sent on the
+    current thread, so a query helper's server time can be compared with the
+    client time around it.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, response, *args, **kwargs):
+        match = QTIME_PATTERN.search(response.content[:512])
+        if match:
+            self._local.qtime = getattr(self._local, "qtime", 0) + int(match.group(1))
+            self._local.responded = True
+        return response
+
+    def reset(self) -> None:
+        self._local.qtime = 0
+        self._local.responded = False
+
+    @property
+    def qtime(self) -> Optional[float]:
+        """
+        Server time in seconds since ``reset``, ``None`` without a response.
+        Cached responses report ``QTime`` 0 and count as ``0.0``.
+        """
+        if not getattr(self._local, "responded", False):
+            return None
+        return self._local.qtime / 1000
+
+    @contextlib.contextmanager
+    def installed(self, session):
+        session.hooks["response"].append(self)
+        try:
+            yield self
+        finally:
+            session.hooks["response"].remove(self)
+
+
+def parse_mix(values: List[str]) -> Dict[str, float]:
+    """Parse ``name=weight`` pairs, e.g. ``query_by_age_range=3``."""
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_query_factories(
+    solr_url: str, collection_name: str, mix: Dict[str, float], seed: int
+) -> Dict[str, Callable[[random.Random], Callable[[], object]]]:
+    """
+    One factory per query in the mix. A factory returns a call of the query
+    helper with random but realistic arguments.
+    """
+    client = get_solr_client(solr_url, collection_name)
+    factories = {}
+
+    def document_count(rng: random.Random):
+        return partial(query_document_count, client)
+
+    def age_range(rng: random.Random):
+        low = rng.randint(18, 70)
+        return partial(query_by_age_range, client, low, low + rng.randint(1, 15))
+
+    factories["query_document_count"] = document_count
+    factories["query_by_age_range"] = age_range
+
+    if "query_with_boosting" in mix:
+        fake = Faker()
+        fake.seed_instance(seed)
+        names = [fake.last_name() for _ in range(1_000)]
+
+        def boosting(rng: random.Random):
+            return partial(query_with_boosting, client, rng.choice(names))
+
+        factories["query_with_boosting"] = boosting
+
+    if "query_by_gender_and_city" in mix:
+        genders = sample_facet_values(client, "gender", 10)
+        cities = sample_facet_values(client, "city", 1_000)
+
+        def gender_and_city(rng: random.Random):
+            return partial(
+                query_by_gender_and_city,
+                client,
+                rng.choice(genders),
+                rng.choice(cities),
+            )
+
+        factories["query_by_gender_and_city"] = gender_and_city
+
+    if any(name in mix for name in VECTOR_QUERIES):
+        from sentence_transformers import SentenceTransformer
+
+        ltr = importlib.import_module("solr.ltr.machine-learning")
+        model = SentenceTransformer(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+        with open("json/sentences.json", "r") as file:
+            sentences = [s["content"] for s in json.load(file)["sentences"]]
+        url = f"{solr_url}/{collection_name}"
+
+        def semantic(rng: random.Random):
+            return partial(
+                ltr.semantic_search, rng.choice(sentences), url, model, top_k=10
+            )
+
+        def hybrid(rng: random.Random):
+            return partial(
+                ltr.hybrid_search, rng.choice(sentences), url, model, top_k=10
+            )
+
+        factories["semantic_search"] = semantic
+        factories["hybrid_search"] = hybrid
+
+    unknown = set(mix) - set(factories)
+    if unknown:
+        raise ValueError(f"Unknown queries in mix: {sorted(unknown)}")
+    return {name: factories[name] for name in mix}
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    points = np.percentile(np.asarray(values) * 1000, PERCENTILES)
+    return {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, points)}
+
+
+def summarize(samples: List[tuple], wall_time: float) -> dict:
+    """Latency and QTime percentiles in milliseconds, overall and per query."""
+    by_query = defaultdict(list)
+    for sample in samples:
+        by_query[sample[0]].append(sample)
+    by_query["all"] = samples
+
+    summary = {}
+    for name, group in sorted(by_query.items()):
+        succeeded = [s for s in group if s[3] is None]
+        latencies = [s[1] for s in succeeded]
+        timed = [(s[1], s[2]) for s in succeeded if s[2] is not None]
+        qtimes = [qtime for _, qtime in timed]
+        summary[name] = {
+            "requests": len(group),
+            "errors": len(group) - len(succeeded),
+            "throughput": round(len(succeeded) / wall_time, 3) if wall_time else 0.0,
+            "latency_ms": _percentiles(latencies),
+            "qtime_ms": _percentiles(qtimes),
+            # Client time not spent in Solr: network, serialization, parsing
+            "overhead_ms": (
+                round(1000 * sum(lat - qtime for lat, qtime in timed) / len(timed), 3)
+                if qtimes
+                else None
+            ),
+        }
+    return summary
+
+
+def run_load(
+    factories: dict,
+    mix: Dict[str, float],
+    duration: float,
+    concurrency: int,
+    qps: Optional[float],
+    seed: int,
+) -> dict:
+    """
+    Replay the query mix for ``duration`` seconds.
+
+    Without ``qps`` each of the ``concurrency`` workers sends its next query as
+    soon as the previous one returns (closed loop). With ``qps`` queries start
+    on a fixed schedule (open loop) and latency is measured from the scheduled
+    start, so a saturated Solr shows up as queueing instead of a lower rate.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    recorder = QTimeRecorder()
+    samples: List[tuple] = []
+    samples_lock = threading.Lock()
+
+    def execute(rng: random.Random, scheduled_at: Optional[float] = None) -> None:
+        name = rng.choices(names, weights)[0]
+        call = factories[name](rng)
+        recorder.reset()
+        start_time = time.perf_counter() if scheduled_at is None else scheduled_at
+        error = None
+        try:
+            call()
+        except Exception as e:
+            error = repr(e)
+        sample = (name, time.perf_counter() - start_time, recorder.qtime, error)
+        with samples_lock:
+            samples.append(sample)
+
+    def closed_loop_worker(worker: int, deadline: float) -> None:
+        rng = random.Random(seed + worker)
+        while time.perf_counter() < deadline:
+            execute(rng)
+
+    # The helpers print their results, keep the report readable
+    with recorder.installed(get_http_session()), contextlib.redirect_stdout(
+        io.StringIO()
+    ):
+        start_time = time.perf_counter()
+        deadline = start_time + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if qps is None:
+                for worker in range(concurrency):
+                    executor.submit(closed_loop_worker, worker, deadline)
+            else:
+                rng = random.Random(seed)
+                interval = 1 / qps
+                scheduled_at = start_time
+                while scheduled_at < deadline:
+                    time.sleep(max(0.0, scheduled_at - time.perf_counter()))
+                    executor.submit(execute, random.Random(rng.random()), scheduled_at)
+                    scheduled_at += interval
+        wall_time = time.perf_counter() - start_time
+
+    return {
+        "config": {
+            "mix": mix,
+            "duration": duration,
+            "concurrency": concurrency,
+            "qps": qps,
+            "seed": seed,
+        },
+        "wall_time": round(wall_time, 3),
+        "results": summarize(samples, wall_time),
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Return regressions against a stored report: p95 latency more than
+    ``tolerance`` higher or throughput more than ``tolerance`` lower.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+
+        current_p95 = current["latency_ms"]["p95"]
+        previous_p95 = previous["latency_ms"]["p95"]
+        if (
+            current_p95
+            and previous_p95
+            and current_p95 > previous_p95 * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{name}: p95 {previous_p95:.1f}ms -> {current_p95:.1f}ms"
+            )
+
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput']:.1f}/s -> "
+                f"{current['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{'query':<26} {'req':>7} {'err':>5} {'req/s':>9} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'qtime p50':>10} {'qtime p95':>10}"
+    )
+    for name, result in report["results"].items():
+        latency, qtime = result["latency_ms"], result["qtime_ms"]
+        print(
+            f"{name:<26} {result['requests']:>7} {result['errors']:>5} "
+            f"{result['throughput']:>9.1f} "
+            + " ".join(f"{latency[f'p{p}'] or 0:>8.1f}" for p in PERCENTILES)
+            + f" {qtime['p50'] or 0:>10.1f} {qtime['p95'] or 0:>10.1f}"
+        )
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Replay a query mix against a collection")
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=[f"{name}={weight}" for name, weight in DEFAULT_MIX.items()],
+        help="name=weight pairs, also accepts semantic_search and hybrid_search",
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--qps", type=float, default=None, help="Target rate, open loop if set"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--query-cache",
+        action="store_true",
+        help="Keep the client side query cache, measures cache hits instead of Solr",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="Allowed regression ratio"
+    )
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    args = parse_args()
+    if not args.query_cache:
+        set_query_cache(None)
+
+    mix = parse_mix(args.mix)
+    factories = build_query_factories(
+        os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"), mix, args.seed
+    )
+    report = run_load(
+        factories, mix, args.duration, args.concurrency, args.qps, args.seed
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            regressions = compare_with_baseline(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import json
+import time
+from argparse import ArgumentParser, Namespace
+
+from solr.importer.rabbit import BatchingConsumer, callback
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import generate_documents_columnar
+from tests.stubs import StubChannel
+
+
+class LatencySolrClient:
+    """Fake Solr client that takes a fixed round-trip latency per add."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.documents = 0
+        self.requests = 0
+
+    def add(self, documents, **kwargs):
+        time.sleep(self.latency)
+        self.requests += 1
+        self.documents += len(documents)
+
+
+def run_single(bodies: list, latency_ms: float) -> float:
+    channel = StubChannel(bodies)
+    solr = LatencySolrClient(latency_ms)
+
+    start_time = time.perf_counter()
+    while True:
+        method, properties, body = channel.get()
+        if method is None:
+            break
+        callback(channel, method, properties, body, solr=solr)
+    return len(bodies) / (time.perf_counter() - start_time)
+
+
+def run_batching(bodies: list, latency_ms: float, batch_size: int) -> float:
+    channel = StubChannel(bodies)
+    solr = LatencySolrClient(latency_ms)
+
+    start_time = time.perf_counter()
+    BatchingConsumer(
+        channel, solr, batch_size=batch_size, policy=CommitPolicy("within")
+    ).start()
+    return len(bodies) / (time.perf_counter() - start_time)
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Queue drain rate of the RabbitMQ importer")
+    parser.add_argument("--messages", type=int, default=2_000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 500])
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    bodies = [
+        json.dumps(document).encode("utf-8")
+        for document in generate_documents_columnar(1, args.messages)
+    ]
+
+    print(f"single    {run_single(bodies, args.latency_ms):>10,.0f} msg/s")
+    for batch_size in args.batch_sizes:
+        rate = run_batching(bodies, args.latency_ms, batch_size)
+        print(f"batch={batch_size:<4}{rate:>10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import timeit
+from argparse import ArgumentParser, Namespace
+
+from faker.proxy import Faker
+
+from solr.usage.document import (
+    EmailValidator,
+    SolrDocument,
+    generate_documents,
+    generate_documents_columnar,
+    validate_documents,
+    validate_documents_json,
+)
+
+
+def run_case(name: str, func, number_of_items: int, repeat: int) -> dict:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    items_per_second = number_of_items / best
+    print(f"{name:<45} {best * 1000:>10.2f} ms  {items_per_second:>12,.0f} items/s")
+    return {"case": name, "seconds": best, "items_per_second": items_per_second}
+
+
+def run_validation_benchmark(number_of_documents: int, repeat: int) -> list[dict]:
+    documents = generate_documents_columnar(1, number_of_documents)
+    body = json.dumps(documents).encode("utf-8")
+    emails = [Faker().email() for _ in range(1_000)] * (number_of_documents // 1_000)
+
+    results = [
+        run_case(
+            "per object: SolrDocument(**doc).model_dump()",
+            lambda: [SolrDocument(**doc).model_dump() for doc in documents],
+            number_of_documents,
+            repeat,
+        ),
+        run_case(
+            "batch: TypeAdapter(list[SolrDocument])",
+            lambda: validate_documents(documents),
+            number_of_documents,
+            repeat,
+        ),
+        run_case(
+            "batch: validate_json on the request body",
+            lambda: validate_documents_json(body),
+            number_of_documents,
+            repeat,
+        ),
+        run_case(
+            "email: EmailValidator model per call",
+            lambda: [EmailValidator.model_validate({"email": e}) for e in emails],
+            len(emails),
+            repeat,
+        ),
+        run_case(
+            "email: cached cast_to_email_str",
+            lambda: [SolrDocument.cast_to_email_str(e) for e in emails],
+            len(emails),
+            repeat,
+        ),
+    ]
+
+    generator_size = min(number_of_documents, 2_000)
+    results += [
+        run_case(
+            "generator: validated",
+            lambda: generate_documents(1, generator_size),
+            generator_size,
+            1,
+        ),
+        run_case(
+            "generator: trusted source",
+            lambda: generate_documents(1, generator_size, trusted=True),
+            generator_size,
+            1,
+        ),
+    ]
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Microbenchmarks of document validation")
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_validation_benchmark(args.documents, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import timeit
+from argparse import ArgumentParser, Namespace
+from urllib.parse import quote_plus
+
+import numpy as np
+
+from solr.ltr.vector import VECTOR_ENCODINGS, format_vector
+
+
+def legacy_format_vector(vector: np.ndarray) -> str:
+    """How semantic_search and hybrid_search formatted vectors before."""
+    return "[" + ",".join(str(x) for x in vector.tolist()) + "]"
+
+
+def run_case(name: str, func, number_of_vectors: int, repeat: int) -> dict:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    sample = func()[0]
+    print(
+        f"{name:<20} {best / number_of_vectors * 1e6:>8.1f} us/vector  "
+        f"{len(sample):>6} chars  {len(quote_plus(sample)):>6} URL-encoded"
+    )
+    return {
+        "case": name,
+        "seconds_per_vector": best / number_of_vectors,
+        "chars": len(sample),
+        "url_encoded_chars": len(quote_plus(sample)),
+    }
+
+
+def run_vector_benchmark(
+    number_of_vectors: int, dimension: int, repeat: int
+) -> list[dict]:
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((number_of_vectors, dimension)).astype(np.float32)
+    # Normalized like all-MiniLM-L6-v2 embeddings
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    results = [
+        run_case(
+            "legacy str()",
+            lambda: [legacy_format_vector(vector) for vector in vectors],
+            number_of_vectors,
+            repeat,
+        )
+    ]
+    for encoding in VECTOR_ENCODINGS:
+        results.append(
+            run_case(
+                encoding,
+                lambda: [format_vector(vector, encoding) for vector in vectors],
+                number_of_vectors,
+                repeat,
+            )
+        )
+    return results
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(
+        description="Format time and size of KNN query vectors per encoding"
+    )
+    parser.add_argument("--vectors", type=int, default=10_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_vector_benchmark(args.vectors, args.dimension, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
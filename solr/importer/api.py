@@ -1,14 +1,25 @@
-import json
 import os
+import threading
+from argparse import ArgumentParser, Namespace
+from typing import Optional
 
 from flask import Flask, request
 from flask_restx import Api, Resource, fields
 from pydantic import ValidationError
-
-from solr.usage.document import SolrImportPayload, SolrDocument, get_solr_client
+from waitress import serve
+
+from solr.importer.buffer import BufferFullError, ImportBuffer
+from solr.importer.ndjson import DEFAULT_STREAM_BATCH_SIZE, import_ndjson
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import (
+    SolrDocumentList,
+    SolrImportPayload,
+    get_solr_client,
+)
 from solr.util import with_env
 
 app = Flask(__name__)
+commit_policy = CommitPolicy.from_env()
 api = Api(app, version="1.0", description="Solr Import API", doc="/swagger/")
 
 document_model = api.model(
@@ -28,51 +39,193 @@ response_model = api.model(
     "Response",
     {
         "status": fields.String(description="Status of the operation"),
+        "job_id": fields.String(description="Import job ID in buffered/async mode"),
         "error": fields.String(description="Error message if any"),
     },
 )
 
+stream_report_model = api.model(
+    "StreamImportReport",
+    {
+        "status": fields.String(description="OK or PARTIAL if lines were rejected"),
+        "accepted": fields.Integer(description="Number of imported documents"),
+        "rejected": fields.Integer(description="Number of rejected lines"),
+        "errors": fields.List(
+            fields.Raw, description="Line number and error per rejected line"
+        ),
+        "errors_truncated": fields.Boolean(
+            description="Whether more errors occurred than reported"
+        ),
+    },
+)
+
+IMPORT_MODES = ("direct", "buffered", "async")
+DEFAULT_WAIT_TIMEOUT = 30
+
+_import_buffer: Optional[ImportBuffer] = None
+_import_buffer_lock = threading.Lock()
+
+
+def get_import_buffer() -> ImportBuffer:
+    global _import_buffer
+    with _import_buffer_lock:
+        if _import_buffer is None:
+            _import_buffer = ImportBuffer(
+                lambda: get_solr_client(
+                    os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION")
+                ),
+                policy=commit_policy,
+                max_batch_size=int(os.getenv("IMPORT_BATCH_SIZE", 5_000)),
+                flush_interval_ms=int(os.getenv("IMPORT_FLUSH_INTERVAL_MS", 100)),
+                max_buffered_documents=int(
+                    os.getenv("IMPORT_MAX_BUFFERED_DOCUMENTS", 100_000)
+                ),
+            )
+        return _import_buffer
+
+
+class UnknownImportModeError(ValueError):
+    pass
+
+
+def get_import_mode() -> str:
+    mode = request.args.get("mode") or os.getenv("IMPORT_MODE", "direct")
+    if mode not in IMPORT_MODES:
+        raise UnknownImportModeError(
+            f"Unknown import mode '{mode}', expected one of {IMPORT_MODES}"
+        )
+    return mode
+
+
+class InvalidBatchSizeError(ValueError):
+    pass
+
+
+def get_stream_batch_size() -> int:
+    value = request.args.get("batch_size", DEFAULT_STREAM_BATCH_SIZE)
+    try:
+        batch_size = int(value)
+    except ValueError:
+        batch_size = 0
+    if batch_size < 1:
+        raise InvalidBatchSizeError(
+            f"Invalid batch_size '{value}', expected a positive integer"
+        )
+    return batch_size
+
 
 @api.route("/import")
 class ImportResource(Resource):
     @api.expect(import_payload)
+    @api.doc(params={"mode": "direct (default), buffered or async"})
     @api.response(200, "Success", response_model)
+    @api.response(202, "Accepted", response_model)
     @api.response(400, "Validation Error", response_model)
     @api.response(500, "Internal Server Error", response_model)
+    @api.response(503, "Import buffer full", response_model)
     def post(self):
-        client = get_solr_client(os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"))
-
         try:
             raw_data = request.get_json()
             payload = validate_payload(raw_data)
-
-            solr_documents = [doc.model_dump() for doc in payload.documents]
-            json_data = json.dumps(solr_documents).encode("utf-8")
-
-            client.add(json_data)
-            client.commit()
-            return {"status": "OK"}, 200
+            solr_documents = SolrDocumentList.dump_python(payload.documents)
+
+            mode = get_import_mode()
+            if mode == "direct":
+                client = get_solr_client(
+                    os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION")
+                )
+                commit_policy.add(client, solr_documents)
+                return {"status": "OK"}, 200
+
+            job = get_import_buffer().submit(solr_documents)
+            if mode == "async":
+                return {"status": "ACCEPTED", "job_id": job.id}, 202
+
+            wait_timeout = float(os.getenv("IMPORT_WAIT_TIMEOUT", DEFAULT_WAIT_TIMEOUT))
+            if not job.done.wait(wait_timeout):
+                return {"status": "PENDING", "job_id": job.id}, 202
+            if job.status == "failed":
+                return {"error": job.error, "job_id": job.id}, 500
+            return {"status": "OK", "job_id": job.id}, 200
 
         except ValidationError as e:
             return {"error": f"Validation Error: {str(e)}"}, 400
+        except UnknownImportModeError as e:
+            return {"error": str(e)}, 400
+        except BufferFullError as e:
+            return {"error": str(e)}, 503
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+
+@api.route("/import/status/<string:job_id>")
+class ImportStatusResource(Resource):
+    @api.response(200, "Success", response_model)
+    @api.response(404, "Unknown job", response_model)
+    def get(self, job_id: str):
+        job = get_import_buffer().get_job(job_id)
+        if job is None:
+            return {"error": f"Unknown job {job_id}"}, 404
+        return job.to_dict(), 200
+
+
+@api.route("/import/stream")
+class StreamImportResource(Resource):
+    @api.doc(
+        description="Import newline delimited JSON (one document per line), "
+        "optionally sent with chunked transfer encoding.",
+        params={"batch_size": "Documents per Solr add"},
+    )
+    @api.response(200, "Import finished, see report", stream_report_model)
+    @api.response(400, "Invalid batch_size", response_model)
+    @api.response(500, "Internal Server Error", response_model)
+    def post(self):
+        try:
+            batch_size = get_stream_batch_size()
+            client = get_solr_client(
+                os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION")
+            )
+
+            report = import_ndjson(request.stream, client, commit_policy, batch_size)
+            return report.to_dict(), 200
+        except InvalidBatchSizeError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             return {"error": str(e)}, 500
 
 
 def validate_payload(raw_data) -> SolrImportPayload:
     if isinstance(raw_data, list):
-        payload = SolrImportPayload(documents=raw_data)
+        documents = SolrDocumentList.validate_python(raw_data)
     elif isinstance(raw_data, dict):
-        document = SolrDocument(**raw_data)
-        payload = SolrImportPayload(documents=[document])
+        documents = SolrDocumentList.validate_python([raw_data])
     else:
         raise ValueError("Data must be a list or a dictionary")
-    return payload
+    # The documents are validated already, skip a second pass over the list
+    return SolrImportPayload.model_construct(documents=documents)
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Serve with the multi-threaded waitress WSGI server",
+    )
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument(
+        "--threads", type=int, default=32, help="Worker threads in production mode"
+    )
+    return parser.parse_args()
 
 
 @with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
 def main():
-    app.run(port=5000, debug=True)
+    args = parse_args()
+    if args.production:
+        serve(app, host="0.0.0.0", port=args.port, threads=args.threads)
+    else:
+        app.run(port=args.port, debug=True)
 
 
 if __name__ == "__main__":
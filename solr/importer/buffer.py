@@ -0,0 +1,171 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import pysolr
+
+from solr.usage.commit import CommitPolicy
+
+DEFAULT_MAX_BATCH_SIZE = 5_000
+DEFAULT_FLUSH_INTERVAL_MS = 100
+DEFAULT_MAX_BUFFERED_DOCUMENTS = 100_000
+DEFAULT_MAX_TRACKED_JOBS = 10_000
+
+
+class BufferFullError(Exception):
+    pass
+
+
+class ImportJob:
+    def __init__(self, documents: list):
+        self.id = uuid.uuid4().hex
+        self.documents = documents
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        # The documents are not needed any more once the job is settled
+        self.documents = []
+        self.done.set()
+
+    def to_dict(self) -> dict:
+        result = {"job_id": self.id, "status": self.status}
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class ImportBuffer:
+    """
+    Collects documents of concurrent import requests and flushes them to Solr
+    in coalesced batches from a single background thread.
+
+    A flush happens once ``max_batch_size`` documents are buffered or the
+    oldest job waited ``flush_interval_ms``. A batch takes whole jobs up to
+    ``max_batch_size`` documents, a single larger job is sent on its own. If a coalesced add fails, the jobs
+    are retried one by one so only the failing requests are marked as failed.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], pysolr.Solr],
+        policy: Optional[CommitPolicy] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_buffered_documents: int = DEFAULT_MAX_BUFFERED_DOCUMENTS,
+        max_tracked_jobs: int = DEFAULT_MAX_TRACKED_JOBS,
+    ):
+        self.client_factory = client_factory
+        self.policy = policy or CommitPolicy.from_env()
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffered_documents = max_buffered_documents
+        self.max_tracked_jobs = max_tracked_jobs
+
+        self._condition = threading.Condition()
+        self._pending: list = []
+        self._pending_documents = 0
+        self._oldest_pending = 0.0
+        self._jobs: OrderedDict = OrderedDict()
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, documents: list) -> ImportJob:
+        job = ImportJob(documents)
+        with self._condition:
+            if self._stopped:
+                raise BufferFullError("Import buffer is shut down")
+            if self._pending_documents + len(documents) > self.max_buffered_documents:
+                raise BufferFullError(
+                    f"Import buffer is full ({self._pending_documents} documents pending)"
+                )
+
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            self._pending.append(job)
+            self._pending_documents += len(documents)
+
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_tracked_jobs:
+                self._jobs.popitem(last=False)
+
+            self._condition.notify()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ImportJob]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def pending_documents(self) -> int:
+        with self._condition:
+            return self._pending_documents
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _take_batch(self) -> list:
+        with self._condition:
+            while True:
+                if self._pending:
+                    waited = time.monotonic() - self._oldest_pending
+                    if (
+                        self._stopped
+                        or self._pending_documents >= self.max_batch_size
+                        or waited >= self.flush_interval
+                    ):
+                        break
+                    self._condition.wait(self.flush_interval - waited)
+                elif self._stopped:
+                    return []
+                else:
+                    self._condition.wait()
+
+            count = 0
+            documents = 0
+            for job in self._pending:
+                if count and documents + len(job.documents) > self.max_batch_size:
+                    break
+                count += 1
+                documents += len(job.documents)
+
+            jobs, self._pending = self._pending[:count], self._pending[count:]
+            self._pending_documents -= documents
+            return jobs
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._take_batch()
+            if not jobs:
+                return
+            self._flush(jobs)
+
+    def _flush(self, jobs: list) -> None:
+        try:
+            client = self.client_factory()
+        except Exception as e:
+            for job in jobs:
+                job.finish("failed", str(e))
+            return
+
+        try:
+            self.policy.add(client, [doc for job in jobs for doc in job.documents])
+            for job in jobs:
+                job.finish("done")
+        except Exception as e:
+            print(f"Coalesced import failed, retrying jobs one by one: {e}")
+            for job in jobs:
+                try:
+                    self.policy.add(client, job.documents)
+                    job.finish("done")
+                except Exception as err:
+                    job.finish("failed", str(err))
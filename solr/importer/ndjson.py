@@ -0,0 +1,80 @@
+from typing import Iterable
+
+import pysolr
+from pydantic import ValidationError
+
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import SolrDocument
+
+DEFAULT_STREAM_BATCH_SIZE = 1_000
+DEFAULT_MAX_REPORTED_ERRORS = 1_000
+
+
+class StreamImportReport:
+    def __init__(self, max_reported_errors: int = DEFAULT_MAX_REPORTED_ERRORS):
+        self.max_reported_errors = max_reported_errors
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: list = []
+
+    def add_error(self, line_number: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"line": line_number, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "status": "OK" if not self.rejected else "PARTIAL",
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+def import_ndjson(
+    lines: Iterable[bytes],
+    client: pysolr.Solr,
+    policy: CommitPolicy,
+    batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    max_reported_errors: int = DEFAULT_MAX_REPORTED_ERRORS,
+) -> StreamImportReport:
+    """
+    Parse, validate and forward NDJSON documents line by line.
+
+    At most ``batch_size`` validated documents are held in memory before they
+    are sent to Solr. Invalid lines do not stop the import, they are reported
+    with their line number.
+    """
+    report = StreamImportReport(max_reported_errors)
+    batch, batch_lines = [], []
+
+    def flush(documents: list, document_lines: list) -> None:
+        try:
+            policy.add(client, documents)
+            report.accepted += len(documents)
+        except Exception as e:
+            for line_number in document_lines:
+                report.add_error(line_number, f"Solr Error: {e}")
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            # Parses the JSON inside pydantic-core, no intermediate dict
+            document = SolrDocument.model_validate_json(line)
+        except ValidationError as e:
+            report.add_error(line_number, f"Validation Error: {e}")
+            continue
+
+        batch.append(document.model_dump())
+        batch_lines.append(line_number)
+        if len(batch) >= batch_size:
+            flush(batch, batch_lines)
+            batch, batch_lines = [], []
+
+    if batch:
+        flush(batch, batch_lines)
+
+    return report
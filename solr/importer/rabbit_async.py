@@ -0,0 +1,292 @@
+import asyncio
+import os
+import signal
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Optional
+
+import aio_pika
+import aiohttp
+
+from solr.importer.rabbit import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BATCH_TIMEOUT_MS,
+    parse_documents,
+    queue_name,
+)
+from solr.metrics import observe_qtime, observe_stage
+from solr.usage.cache import invalidate_query_cache
+from solr.usage.commit import CommitPolicy
+from solr.usage.encoding import (
+    CONTENT_TYPES,
+    UPDATE_HANDLERS,
+    encode_documents,
+    update_params,
+)
+from solr.util import with_env
+
+DEFAULT_WRITERS = 4
+
+
+class AsyncSolrWriter:
+    """
+    Posts update requests to Solr over a shared aiohttp connection pool.
+
+    Soft commits of a ``soft`` policy are sent after the add that made them
+    due, ``finish`` sends the final commit of a ``soft`` or ``hard`` policy.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        policy: Optional[CommitPolicy] = None,
+        max_connections: int = DEFAULT_WRITERS,
+        timeout: float = 300,
+    ):
+        self.url = url.rstrip("/")
+        self.policy = policy or CommitPolicy.from_env()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    def update_params(self) -> dict:
+        return update_params(self.policy.update_kwargs())
+
+    async def _post(self, handler: str, body: bytes, params: dict, content_type: str):
+        with observe_stage("http"):
+            async with self.session.post(
+                f"{self.url}/{handler}",
+                data=body,
+                params=params,
+                headers={"Content-Type": content_type},
+            ) as response:
+                text = await response.text()
+        if response.status != 200:
+            raise Exception(
+                f"Solr responded with an error (HTTP {response.status}): {text}"
+            )
+        observe_qtime(text)
+
+    async def add(self, documents: list) -> None:
+        update_format = self.policy.update_format
+        await self._post(
+            UPDATE_HANDLERS[update_format],
+            encode_documents(documents, update_format),
+            self.update_params(),
+            CONTENT_TYPES[update_format],
+        )
+        self.policy.invalidate_after_add()
+        if self.policy.soft_commit_due(len(documents)):
+            await self.commit(softCommit=True)
+
+    async def commit(self, softCommit: bool = False) -> None:
+        params = {"softCommit": "true"} if softCommit else {"commit": "true"}
+        await self._post("update", b"[]", params, CONTENT_TYPES["json"])
+        invalidate_query_cache()
+
+    async def finish(self) -> None:
+        """Final commit of the policy, called once the writers are done."""
+        commit_kwargs = self.policy.final_commit()
+        if commit_kwargs is not None:
+            await self.commit(**commit_kwargs)
+
+
+class AsyncBatchingWorker:
+    """
+    Groups incoming messages into batches and fans them out to ``writers``
+    concurrent Solr writers.
+
+    Messages are only acknowledged after their documents were accepted by Solr
+    (at-least-once). Since batches finish out of order, every message is acked
+    on its own instead of with ``multiple=True``.
+    """
+
+    def __init__(
+        self,
+        writer,
+        writers: int = DEFAULT_WRITERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_timeout_ms: int = DEFAULT_BATCH_TIMEOUT_MS,
+    ):
+        self.writer = writer
+        self.writers = writers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout_ms / 1000
+
+        self.batches: asyncio.Queue = asyncio.Queue(maxsize=writers * 2)
+        self.pending: list = []
+        self.batch_started = 0.0
+        self.tasks: list = []
+
+    def start(self) -> None:
+        self.tasks = [
+            asyncio.create_task(self.write_batches()) for _ in range(self.writers)
+        ]
+        self.tasks.append(asyncio.create_task(self.flush_periodically()))
+
+    async def on_message(self, message) -> None:
+        if not self.pending:
+            self.batch_started = time.monotonic()
+        self.pending.append(message)
+
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        # Blocks the consumer while all writers are busy (backpressure)
+        await self.batches.put(batch)
+
+    async def flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.batch_timeout)
+            if (
+                self.pending
+                and time.monotonic() - self.batch_started >= self.batch_timeout
+            ):
+                await self.flush()
+
+    async def write_batches(self) -> None:
+        while True:
+            batch = await self.batches.get()
+            try:
+                if batch is None:
+                    return
+                await self.write_batch(batch)
+            finally:
+                self.batches.task_done()
+
+    @staticmethod
+    async def settle(message, action: str, **kwargs) -> None:
+        """
+        Ack, nack or reject a message. A failure (e.g. a closed channel) is only
+        logged, the broker redelivers the message and the writer keeps running.
+        """
+        try:
+            await getattr(message, action)(**kwargs)
+        except Exception as e:
+            print(f"Failed to {action} message {message.delivery_tag}: {e}")
+
+    async def write_batch(self, batch: list) -> None:
+        parsed = []
+        for message in batch:
+            try:
+                parsed.append((message, parse_documents(message.body)))
+            except (ValueError, TypeError) as e:
+                print(f"Dropping malformed message {message.delivery_tag}: {e}")
+                await self.settle(message, "reject", requeue=False)
+
+        try:
+            await self.writer.add([doc for _, documents in parsed for doc in documents])
+        except Exception as e:
+            print(f"Batch import failed, retrying messages one by one: {e}")
+            for message, documents in parsed:
+                try:
+                    await self.writer.add(documents)
+                except Exception as err:
+                    print(f"Error importing message {message.delivery_tag}: {err}")
+                    await self.settle(message, "nack", requeue=True)
+                else:
+                    await self.settle(message, "ack")
+            return
+
+        # Solr accepted the whole batch, a failed ack must not resend it
+        for message, _ in parsed:
+            await self.settle(message, "ack")
+
+    async def shutdown(self) -> None:
+        """Flush the pending batch and wait until every writer is done."""
+        await self.flush()
+        for _ in range(self.writers):
+            await self.batches.put(None)
+        await asyncio.gather(*self.tasks[: self.writers])
+        for task in self.tasks[self.writers :]:
+            task.cancel()
+        await asyncio.gather(*self.tasks[self.writers :], return_exceptions=True)
+
+
+async def run_worker(
+    rabbit_url: str,
+    solr_url: str,
+    writers: int = DEFAULT_WRITERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    batch_timeout_ms: int = DEFAULT_BATCH_TIMEOUT_MS,
+    prefetch_count: Optional[int] = None,
+) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    solr_writer = AsyncSolrWriter(solr_url, max_connections=writers)
+    await solr_writer.start()
+    worker = AsyncBatchingWorker(solr_writer, writers, batch_size, batch_timeout_ms)
+    worker.start()
+
+    connection = await aio_pika.connect_robust(rabbit_url)
+    try:
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=prefetch_count or batch_size * writers * 2)
+        queue = await channel.declare_queue(queue_name, durable=True)
+        consumer_tag = await queue.consume(worker.on_message)
+
+        print(f"Waiting for messages with {writers} Solr writers. To exit press CTRL+C")
+        await stop.wait()
+
+        print("Stopping consumer, flushing pending batches...")
+        await queue.cancel(consumer_tag)
+        await worker.shutdown()
+        await solr_writer.finish()
+    finally:
+        # Unacknowledged messages are redelivered once the connection is closed
+        await connection.close()
+        await solr_writer.close()
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=DEFAULT_WRITERS,
+        help="Number of concurrent Solr writers",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--batch-timeout-ms", type=int, default=DEFAULT_BATCH_TIMEOUT_MS
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=None, help="basic_qos prefetch count"
+    )
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION", "RABBITMQ_URL"])
+def main() -> None:
+    args = parse_args()
+    asyncio.run(
+        run_worker(
+            os.getenv("RABBITMQ_URL"),
+            f"{os.getenv('SOLR_URL')}/{os.getenv('SOLR_COLLECTION')}",
+            writers=args.writers,
+            batch_size=args.batch_size,
+            batch_timeout_ms=args.batch_timeout_ms,
+            prefetch_count=args.prefetch,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
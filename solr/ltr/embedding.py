@@ -0,0 +1,304 @@
+import functools
+import json
+import os
+from argparse import ArgumentParser, Namespace
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from solr.ltr.embedding_cache import EmbeddingCache, create_embedding_cache_from_env
+from solr.ltr.vector import encode_vectors, get_vector_encoding, get_vector_precision
+from solr.metrics import observe_stage, start_metrics_server
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import generate_documents_columnar, get_solr_client
+from solr.usage.query import iter_documents
+from solr.util import with_env
+
+if TYPE_CHECKING:
+    # Importing sentence_transformers takes seconds, only main needs it
+    from sentence_transformers import SentenceTransformer
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_ENCODE_BATCH_SIZE = 256
+DEFAULT_CHUNK_SIZE = 10_000
+VECTOR_FIELD = "vector_field"
+EMPTY_TEXT = "No text available for this document"
+# Stored fields Solr adds to every document, not part of a re-added document
+INTERNAL_FIELDS = ("_version_", "score")
+FIELDS_PATH = os.path.join(os.path.dirname(__file__), "../../json/fields.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_text_fields(path: str = FIELDS_PATH) -> tuple:
+    """Names of the schema fields that make up the text to embed, read once."""
+    with open(path, "r") as schema_file:
+        schema = json.load(schema_file)
+
+    vector_types = {
+        field_type["name"]
+        for field_type in schema.get("add-field-type", [])
+        if field_type["class"] == "solr.DenseVectorField"
+    }
+    fields = tuple(
+        field["name"]
+        for field in schema["add-field"]
+        if field["type"] not in vector_types
+    )
+    if not fields:
+        raise Exception("No fields in fields.json defined")
+    return fields
+
+
+def document_text(document: dict, fields: Sequence[str]) -> str:
+    text = " ".join(f"{document[field]}" for field in fields if field in document)
+    return text if text.strip() else EMPTY_TEXT
+
+
+class BatchEmbedder:
+    """
+    Encode documents in large batches instead of one ``model.encode`` call per
+    document.
+
+    With ``processes`` > 1 the batches are spread over a pool of CPU worker
+    processes, each holding its own copy of the model. Call ``close`` (or use
+    the embedder as a context manager) to stop the pool. With a ``cache`` only
+    texts without a cached embedding are encoded. Vectors are added to the
+    documents in ``vector_encoding`` (default ``SOLR_VECTOR_ENCODING``).
+    """
+
+    def __init__(
+        self,
+        model: "SentenceTransformer",
+        batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+        processes: int = 1,
+        fields: Optional[Sequence[str]] = None,
+        cache: Optional[EmbeddingCache] = None,
+        vector_encoding: Optional[str] = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = cache
+        self.vector_encoding = vector_encoding or get_vector_encoding()
+        self.vector_precision = get_vector_precision(self.vector_encoding)
+        self.fields = tuple(fields) if fields is not None else load_text_fields()
+        self.pool = None
+        if processes > 1:
+            self.pool = model.start_multi_process_pool(["cpu"] * processes)
+
+    def encode(self, texts: list) -> np.ndarray:
+        if self.cache is None:
+            return self._encode(texts)
+
+        embeddings, missing = self.cache.get_many(texts)
+        if missing:
+            missing_texts = [texts[index] for index in missing]
+            encoded = self._encode(missing_texts)
+            embeddings[missing] = encoded
+            self.cache.put_many(missing_texts, encoded)
+        return embeddings
+
+    def _encode(self, texts: list) -> np.ndarray:
+        with observe_stage("embed"):
+            # With a pool this is encode_multi_process, which is deprecated in
+            # favour of passing the pool to encode
+            return self.model.encode(
+                texts,
+                pool=self.pool,
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+
+    def embed(self, documents: list) -> list:
+        """Add ``vector_field`` to every document in place, returns the documents."""
+        if not documents:
+            return documents
+        embeddings = self.encode(
+            [document_text(document, self.fields) for document in documents]
+        )
+        vectors = encode_vectors(
+            embeddings, self.vector_encoding, self.vector_precision
+        )
+        for document, embedding in zip(documents, vectors):
+            document[VECTOR_FIELD] = embedding
+        return documents
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+    def __enter__(self) -> "BatchEmbedder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def embed_and_index(
+    solr_client,
+    chunks: Iterable[list],
+    embedder: BatchEmbedder,
+    commit_policy: Optional[CommitPolicy] = None,
+    indexing_threads: int = 2,
+    max_pending_chunks: int = 4,
+) -> int:
+    """
+    Embed chunks of documents and index them from ``indexing_threads``.
+
+    At most ``max_pending_chunks`` embedded chunks wait for Solr before
+    embedding blocks, so memory stays flat for any number of chunks. Returns
+    the number of indexed documents.
+    """
+    commit_policy = commit_policy or CommitPolicy.from_env(default_mode="hard")
+    count = 0
+    pending: deque = deque()
+    with ThreadPoolExecutor(max_workers=indexing_threads) as indexing:
+        for documents in chunks:
+            embedder.embed(documents)
+            pending.append(indexing.submit(commit_policy.add, solr_client, documents))
+            count += len(documents)
+            while len(pending) >= max_pending_chunks:
+                pending.popleft().result()
+
+        while pending:
+            pending.popleft().result()
+
+    commit_policy.finish(solr_client)
+    return count
+
+
+def generate_chunks(
+    number_of_documents: int,
+    chunk_size: int,
+    generator: Callable[[int, int], list] = generate_documents_columnar,
+) -> Iterator[list]:
+    """Yield generated chunks, the next one is generated in the background."""
+    starts = range(1, number_of_documents + 1, chunk_size)
+
+    def generate(start: int) -> list:
+        return generator(start, min(chunk_size, number_of_documents - start + 1))
+
+    with ThreadPoolExecutor(max_workers=1) as generation:
+        next_chunk = generation.submit(generate, starts[0]) if starts else None
+        for index in range(len(starts)):
+            documents = next_chunk.result()
+            if index + 1 < len(starts):
+                next_chunk = generation.submit(generate, starts[index + 1])
+            yield documents
+
+
+def stream_embedded_documents(
+    solr_client,
+    number_of_documents: int,
+    embedder: BatchEmbedder,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    generator: Callable[[int, int], list] = generate_documents_columnar,
+    commit_policy: Optional[CommitPolicy] = None,
+    indexing_threads: int = 2,
+    max_pending_chunks: int = 4,
+) -> int:
+    """Generate, embed and index documents as a bounded pipeline."""
+    return embed_and_index(
+        solr_client,
+        generate_chunks(number_of_documents, chunk_size, generator),
+        embedder,
+        commit_policy,
+        indexing_threads,
+        max_pending_chunks,
+    )
+
+
+def stored_chunks(
+    solr_client, chunk_size: int = DEFAULT_CHUNK_SIZE, query: str = "*:*"
+) -> Iterator[list]:
+    """Yield the stored documents matching ``query`` in chunks, ready to re-add."""
+    documents = iter_documents(solr_client, query, batch_size=chunk_size)
+    while True:
+        chunk = list(islice(documents, chunk_size))
+        if not chunk:
+            return
+        for document in chunk:
+            for field in INTERNAL_FIELDS:
+                document.pop(field, None)
+        yield chunk
+
+
+def reindex_embeddings(
+    solr_client,
+    embedder: BatchEmbedder,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    query: str = "*:*",
+    commit_policy: Optional[CommitPolicy] = None,
+) -> int:
+    """
+    Recompute ``vector_field`` for the stored documents matching ``query``.
+
+    With a cache on the embedder only documents whose text changed since they
+    were embedded are encoded again.
+    """
+    return embed_and_index(
+        solr_client,
+        stored_chunks(solr_client, chunk_size, query),
+        embedder,
+        commit_policy,
+    )
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Generate, embed and index documents")
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_ENCODE_BATCH_SIZE,
+        help="Texts per encode batch",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="CPU worker processes for encoding, each loads the model",
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Re-embed the documents stored in the collection instead of generating",
+    )
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    from sentence_transformers import SentenceTransformer
+
+    args = parse_args()
+    start_metrics_server(8000)
+
+    solr_client = get_solr_client(os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"))
+    model = SentenceTransformer(args.model, device="cpu")
+    cache = create_embedding_cache_from_env(
+        args.model, model.get_sentence_embedding_dimension()
+    )
+    try:
+        with BatchEmbedder(
+            model, args.batch_size, args.processes, cache=cache
+        ) as embedder:
+            if args.reindex:
+                count = reindex_embeddings(solr_client, embedder, args.chunk_size)
+            else:
+                count = stream_embedded_documents(
+                    solr_client, args.documents, embedder, args.chunk_size
+                )
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"Indexed {count} documents with embeddings.")
+
+
+if __name__ == "__main__":
+    main()
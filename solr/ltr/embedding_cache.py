@@ -0,0 +1,264 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from solr.util import get_or_create_metric
+
+DEFAULT_CACHE_DIR = "embedding-cache"
+DEFAULT_CACHE_ENTRIES = 1_000_000
+# Evict at least this share of the capacity at once, one scan per eviction
+EVICTION_FRACTION = 0.05
+
+EMBEDDING_CACHE_HITS = get_or_create_metric(
+    "solr_embedding_cache_hits",
+    Counter,
+    "Document embeddings read from the on-disk cache",
+    ["model"],
+)
+EMBEDDING_CACHE_MISSES = get_or_create_metric(
+    "solr_embedding_cache_misses",
+    Counter,
+    "Document embeddings that had to be encoded",
+    ["model"],
+)
+EMBEDDING_CACHE_EVICTIONS = get_or_create_metric(
+    "solr_embedding_cache_evictions",
+    Counter,
+    "Least recently used embeddings dropped from the on-disk cache",
+    ["model"],
+)
+EMBEDDING_CACHE_SIZE = get_or_create_metric(
+    "solr_embedding_cache_size",
+    Gauge,
+    "Embeddings stored in the on-disk cache",
+    ["model"],
+)
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of embeddings keyed by model name and text hash.
+
+    Vectors live in a memory-mapped float32 file with ``max_entries`` rows, a
+    SQLite index maps text hashes to rows and tracks their last use. When the
+    file is full the least recently used rows are reused. An existing cache is
+    resized to ``max_entries`` when it is opened. Each model gets its own
+    subdirectory. Only one process should write to a cache at a time.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        model_name: str,
+        dimension: int,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+    ):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]", "_", model_name))
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(self.path, "index.db"), check_same_thread=False
+        )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "hash BLOB PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, "
+                "last_used REAL NOT NULL)"
+            )
+            self._check_meta()
+
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        if os.path.exists(vectors_path):
+            self._resize(vectors_path)
+        self._vectors = np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="r+" if os.path.exists(vectors_path) else "w+",
+            shape=(max_entries, dimension),
+        )
+
+        used = {
+            slot for (slot,) in self._connection.execute("SELECT slot FROM entries")
+        }
+        self._free_slots = sorted(set(range(max_entries)) - used, reverse=True)
+        EMBEDDING_CACHE_SIZE.labels(model=model_name).set(len(used))
+
+    def _check_meta(self) -> None:
+        meta = {"model": self.model_name, "dimension": str(self.dimension)}
+        stored = {
+            key: value
+            for key, value in self._connection.execute("SELECT key, value FROM meta")
+            if key in meta
+        }
+        if stored and stored != meta:
+            raise ValueError(
+                f"Embedding cache {self.path} was created with {stored}, "
+                f"cannot open it with {meta}"
+            )
+        # The capacity is not part of the layout, see _resize
+        self._connection.execute("DELETE FROM meta")
+        self._connection.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)", meta.items()
+        )
+
+    def _resize(self, vectors_path: str) -> None:
+        """
+        Fit the vector file to ``max_entries`` rows. Shrinking evicts the least
+        recently used entries and moves the remaining ones into the kept rows.
+        """
+        row_size = self.dimension * np.dtype(np.float32).itemsize
+        rows = os.path.getsize(vectors_path) // row_size
+        if rows > self.max_entries:
+            entries = self._connection.execute(
+                "SELECT hash, slot FROM entries ORDER BY last_used DESC, rowid DESC"
+            ).fetchall()
+            kept, evicted = entries[: self.max_entries], entries[self.max_entries :]
+            free_slots = sorted(
+                set(range(self.max_entries)) - {slot for _, slot in kept},
+                reverse=True,
+            )
+            moved = [
+                (h, slot, free_slots.pop())
+                for h, slot in kept
+                if slot >= self.max_entries
+            ]
+
+            if moved:
+                vectors = np.memmap(
+                    vectors_path,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(rows, self.dimension),
+                )
+                vectors[[new for _, _, new in moved]] = vectors[
+                    [old for _, old, _ in moved]
+                ]
+                vectors.flush()
+                del vectors
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM entries WHERE hash = ?", [(h,) for h, _ in evicted]
+                )
+                self._connection.executemany(
+                    "UPDATE entries SET slot = ? WHERE hash = ?",
+                    [(new, h) for h, _, new in moved],
+                )
+            EMBEDDING_CACHE_EVICTIONS.labels(model=self.model_name).inc(len(evicted))
+        if rows != self.max_entries:
+            os.truncate(vectors_path, self.max_entries * row_size)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.max_entries - len(self._free_slots)
+
+    def _lookup(self, hashes) -> dict:
+        hashes = list(hashes)
+        slots = {}
+        # SQLite limits the number of host parameters per statement
+        for index in range(0, len(hashes), 500):
+            batch = hashes[index : index + 500]
+            slots.update(
+                self._connection.execute(
+                    "SELECT hash, slot FROM entries WHERE hash IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                )
+            )
+        return slots
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Return an array with one row per text and the indices of the texts
+        that were not cached, their rows are zero.
+        """
+        hashes = [text_hash(text) for text in texts]
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        with self._lock:
+            slots = self._lookup(set(hashes))
+            hits = [i for i, h in enumerate(hashes) if h in slots]
+            if hits:
+                embeddings[hits] = self._vectors[[slots[hashes[i]] for i in hits]]
+                with self._connection:
+                    now = time.time()
+                    self._connection.executemany(
+                        "UPDATE entries SET last_used = ? WHERE hash = ?",
+                        [(now, h) for h in slots],
+                    )
+
+        missing = [i for i, h in enumerate(hashes) if h not in slots]
+        EMBEDDING_CACHE_HITS.labels(model=self.model_name).inc(len(hits))
+        EMBEDDING_CACHE_MISSES.labels(model=self.model_name).inc(len(missing))
+        return embeddings, missing
+
+    def _evict(self, count: int) -> None:
+        count = max(count, int(self.max_entries * EVICTION_FRACTION))
+        evicted = self._connection.execute(
+            "SELECT hash, slot FROM entries ORDER BY last_used, rowid LIMIT ?", (count,)
+        ).fetchall()
+        self._connection.executemany(
+            "DELETE FROM entries WHERE hash = ?", [(h,) for h, _ in evicted]
+        )
+        self._free_slots.extend(slot for _, slot in evicted)
+        EMBEDDING_CACHE_EVICTIONS.labels(model=self.model_name).inc(len(evicted))
+
+    def put_many(self, texts: Sequence[str], embeddings: np.ndarray) -> None:
+        rows = {text_hash(text): row for row, text in enumerate(texts)}
+        with self._lock, self._connection:
+            for existing in self._lookup(rows):
+                del rows[existing]
+
+            # A batch larger than the cache only keeps its last rows
+            rows = dict(list(rows.items())[-self.max_entries :])
+            if len(rows) > len(self._free_slots):
+                self._evict(len(rows) - len(self._free_slots))
+
+            slots = [self._free_slots.pop() for _ in rows]
+            self._vectors[slots] = embeddings[list(rows.values())]
+            now = time.time()
+            self._connection.executemany(
+                "INSERT INTO entries (hash, slot, last_used) VALUES (?, ?, ?)",
+                [(hash_, slot, now) for hash_, slot in zip(rows, slots)],
+            )
+            EMBEDDING_CACHE_SIZE.labels(model=self.model_name).set(
+                self.max_entries - len(self._free_slots)
+            )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            self._connection.close()
+
+
+def create_embedding_cache_from_env(model_name: str, dimension: int):
+    """Cache in ``EMBEDDING_CACHE_DIR``, disabled when it is set to ``none``."""
+    directory = os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+    if directory.lower() == "none":
+        return None
+    return EmbeddingCache(
+        directory,
+        model_name,
+        dimension,
+        int(os.getenv("EMBEDDING_CACHE_SIZE", DEFAULT_CACHE_ENTRIES)),
+    )
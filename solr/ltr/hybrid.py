@@ -0,0 +1,185 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import pysolr
+
+from solr.ltr.query_embedding import get_query_embedding
+from solr.usage.query import search_with_post
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+HYBRID_MODES = ("rrf", "weighted", "solr", "filter")
+DEFAULT_TEXT_FIELDS = "name address city email"
+VECTOR_FIELD = "vector_field"
+# Rank constant from the original RRF paper, dampens the weight of the top ranks
+RRF_K = 60
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="hybrid-search")
+        return _executor
+
+
+def knn_clause(vector_str: str, top_k: int) -> str:
+    return f"{{!knn f={VECTOR_FIELD} topK={top_k}}}{vector_str}"
+
+
+def text_search(
+    client: pysolr.Solr, query: str, top_k: int, qf: str = DEFAULT_TEXT_FIELDS
+) -> list:
+    return search_with_post(
+        client, q=query, defType="edismax", qf=qf, fl="*,score", rows=top_k
+    ).docs
+
+
+def vector_search(client: pysolr.Solr, vector_str: str, top_k: int) -> list:
+    return search_with_post(
+        client, q=knn_clause(vector_str, top_k), fl="*,score", rows=top_k
+    ).docs
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[list], weights: Optional[Sequence[float]] = None, k: int = RRF_K
+) -> Dict[str, float]:
+    """Sum of ``weight / (k + rank)`` per document id over all rankings."""
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc in enumerate(ranking, start=1):
+            scores[doc["id"]] += weight / (k + rank)
+    return scores
+
+
+def _min_max(ranking: list) -> Dict[str, float]:
+    if not ranking:
+        return {}
+    scores = [doc["score"] for doc in ranking]
+    low, high = min(scores), max(scores)
+    span = high - low
+    return {doc["id"]: (doc["score"] - low) / span if span else 1.0 for doc in ranking}
+
+
+def weighted_score_fusion(
+    rankings: Sequence[list], weights: Sequence[float]
+) -> Dict[str, float]:
+    """
+    Weighted sum of min-max normalized scores, BM25 and cosine scores are not
+    on the same scale otherwise. A document missing from a ranking gets 0 there.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for doc_id, score in _min_max(ranking).items():
+            scores[doc_id] += weight * score
+    return scores
+
+
+def _fused_documents(
+    rankings: Sequence[list], scores: Dict[str, float], top_k: int
+) -> list:
+    documents = {}
+    for ranking in rankings:
+        for doc in ranking:
+            documents.setdefault(doc["id"], doc)
+
+    fused = []
+    for doc_id in sorted(scores, key=scores.get, reverse=True)[:top_k]:
+        fused.append(dict(documents[doc_id], score=scores[doc_id]))
+    return fused
+
+
+def solr_hybrid_search(
+    client: pysolr.Solr,
+    query: str,
+    vector_str: str,
+    text_weight: float,
+    vector_weight: float,
+    top_k: int,
+    qf: str = DEFAULT_TEXT_FIELDS,
+) -> list:
+    """
+    One request: the union of text matches and the top-K vectors
+    (``{!bool should=...}``) scored by Solr with the weighted sum of the text
+    score scaled to 0..1 and the cosine score. ``scale`` reads the text score
+    of every document in the index, so this mode gets slower with index size.
+    """
+    return search_with_post(
+        client,
+        q=(
+            "{!func}sum(product($text_weight,scale(query($lexical_query),0,1)),"
+            "product($vector_weight,query($vector_query)))"
+        ),
+        # Unique per query vector, caching it would only churn the filterCache
+        fq="{!bool cache=false should=$lexical_query should=$vector_query}",
+        lexical_query="{!edismax qf=$qf v=$user_query}",
+        vector_query=knn_clause(vector_str, top_k),
+        user_query=query,
+        qf=qf,
+        text_weight=text_weight,
+        vector_weight=vector_weight,
+        fl="*,score",
+        rows=top_k,
+    ).docs
+
+
+def hybrid_search(
+    client: pysolr.Solr,
+    model: "SentenceTransformer",
+    query: str,
+    mode: str = "rrf",
+    text_weight: float = 0.5,
+    vector_weight: float = 0.5,
+    top_k: int = 100,
+    qf: str = DEFAULT_TEXT_FIELDS,
+) -> List[dict]:
+    """
+    Combine edismax text search and KNN vector search.
+
+    - ``rrf``: reciprocal rank fusion of a text and a KNN request, weighted
+    - ``weighted``: weighted sum of the min-max normalized scores of both
+    - ``solr``: one request, Solr adds the weighted scores (``{!bool}``)
+    - ``filter``: text scored documents restricted to the top-K vectors, the
+      previous single request behaviour
+
+    For ``rrf`` and ``weighted`` the text request is sent while the query is
+    embedded and both requests run concurrently.
+    """
+    if mode not in HYBRID_MODES:
+        raise ValueError(
+            f"Unknown hybrid mode '{mode}', expected one of {HYBRID_MODES}"
+        )
+
+    if mode in ("rrf", "weighted"):
+        text_future = _get_executor().submit(text_search, client, query, top_k, qf)
+        vector_str = get_query_embedding(model, query).vector_str
+        vector_docs = vector_search(client, vector_str, top_k)
+        rankings = [text_future.result(), vector_docs]
+        weights = [text_weight, vector_weight]
+        if mode == "rrf":
+            scores = reciprocal_rank_fusion(rankings, weights)
+        else:
+            scores = weighted_score_fusion(rankings, weights)
+        return _fused_documents(rankings, scores, top_k)
+
+    vector_str = get_query_embedding(model, query).vector_str
+    if mode == "solr":
+        return solr_hybrid_search(
+            client, query, vector_str, text_weight, vector_weight, top_k, qf
+        )
+    return search_with_post(
+        client,
+        q=query,
+        fq=knn_clause(vector_str, top_k),
+        fl="*,score",
+        rows=top_k,
+        defType="edismax",
+        qf=qf,
+    ).docs
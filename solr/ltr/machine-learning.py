@@ -1,10 +1,17 @@
 import json
 import os
 from argparse import ArgumentParser, Namespace
+from typing import Optional
 
 from sentence_transformers import SentenceTransformer
 
+from solr.ltr import hybrid
+from solr.ltr.embedding import BatchEmbedder
+from solr.ltr.embedding_cache import EmbeddingCache, create_embedding_cache_from_env
+from solr.ltr.query_embedding import get_query_embedding
+from solr.usage.commit import CommitPolicy
 from solr.usage.document import generate_documents, get_solr_client
+from solr.usage.query import search_with_post
 from solr.util import with_env
 
 SEMANTIC_WITH_PRETRAINED_MODEL = False
@@ -17,28 +24,17 @@ def load_queries_from_json(file_path: str) -> dict:
     return queries
 
 
-def index_document_with_embeddings(doc: dict, model: SentenceTransformer) -> dict:
-    # Create a meaningful text representation from document fields
-    fields = load_solr_fields()
-    text_to_embedding = " ".join(
-        [f"{doc.get(field, '')}" for field in fields if field in doc]
-    )
-
-    if not text_to_embedding.strip():
-        text_to_embedding = "No text available for this document"
-
-    # Generate vector embedding
-    embedding = model.encode(text_to_embedding)
-    doc["vector_field"] = embedding.tolist()
-    return doc
+def index_document_with_embeddings(
+    doc: dict, model: SentenceTransformer, cache: Optional[EmbeddingCache] = None
+) -> dict:
+    # Single document variant, use BatchEmbedder for more than a handful
+    return BatchEmbedder(model, cache=cache).embed([doc])[0]
 
 
 def semantic_search(
     query: str, solr_url: str, model: SentenceTransformer, top_k: int = 100
 ) -> list:
-    query_embedding = model.encode(query)
-
-    vector_str = "[" + ",".join(str(x) for x in query_embedding.tolist()) + "]"
+    vector_str = get_query_embedding(model, query).vector_str
 
     # Use the proper KNN query syntax
     params = {
@@ -49,7 +45,7 @@ def semantic_search(
     }
 
     solr = get_solr_client(solr_url, "")
-    results = solr.search(**params)
+    results = search_with_post(solr, **params)
 
     print(
         f"Found {len(results.docs)} results with KNN search, lasted for {results.qtime}ms"
@@ -57,19 +53,6 @@ def semantic_search(
     return results.docs
 
 
-def load_solr_fields() -> list[str]:
-    results = []
-    with open("../../json/fields.json", "r") as schema_file:
-        schema = json.load(schema_file)
-        for field in schema["add-field"]:
-            results.append(field["name"])
-
-    if results is None or len(results) == 0:
-        raise Exception("No fields in fields.json defined")
-
-    return results
-
-
 def hybrid_search(
     query: str,
     solr_url: str,
@@ -77,25 +60,16 @@ def hybrid_search(
     text_weight: float = 0.5,
     vector_weight: float = 0.5,
     top_k: int = 100,
+    mode: str = "rrf",
 ) -> list:
-    query_embedding = model.encode(query)
-    vector_str = "[" + ",".join(str(x) for x in query_embedding.tolist()) + "]"
-
-    # Proper hybrid search parameters using fq for vector search
-    params = {
-        "q": query,  # Text search using standard query
-        "fq": f"{{!knn f=vector_field topK={top_k}}}{vector_str}",  # Vector search as filter
-        "fl": "*,score",
-        "rows": top_k,
-        "defType": "edismax",  # Use edismax for better text search
-        "qf": "name address city email",  # Specify which fields to search in
-    }
-
+    # See solr.ltr.hybrid for the fusion modes
     solr = get_solr_client(solr_url, "")
-    results = solr.search(**params)
-    print(f"Found {len(results.docs)} results with hybrid search")
+    results = hybrid.hybrid_search(
+        solr, model, query, mode, text_weight, vector_weight, top_k
+    )
+    print(f"Found {len(results)} results with hybrid search ({mode})")
 
-    return results.docs
+    return results
 
 
 @with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
@@ -105,22 +79,26 @@ def main() -> None:
 
     solr_url_with_collection = f"{solr_url}/{collection_name}"
     solr = get_solr_client(solr_url, collection_name)
+    commit_policy = CommitPolicy.from_env(default_mode="hard")
+    # Only documents whose text changed since the last run are encoded again
+    cache = None
 
     if SEMANTIC_WITH_PRETRAINED_MODEL:
         # Choosen ML-Models from https://huggingface.co/models
         # Good model for our dating app case: https://huggingface.co/sentence-transformers/all-MiniLM-L6-v2
         model = SentenceTransformer("all-MiniLM-L6-v2")
+        cache = create_embedding_cache_from_env(
+            "all-MiniLM-L6-v2", model.get_sentence_embedding_dimension()
+        )
         # This model needs a high performance GPU: https://huggingface.co/deepseek-ai/DeepSeek-R1/discussions & maybe is not the best choice for our case
         # (ML-Model catgory: Text-Gereration)
         # model = AutoModelForCausalLM.from_pretrained("deepseek-ai/DeepSeek-R1", trust_remote_code=True)
 
         documents = generate_documents(0, 1000)
-        documents_with_embeddings = [
-            index_document_with_embeddings(doc, model) for doc in documents
-        ]
+        documents_with_embeddings = BatchEmbedder(model, cache=cache).embed(documents)
 
-        solr.add(documents_with_embeddings)
-        solr.commit()
+        commit_policy.add(solr, documents_with_embeddings)
+        commit_policy.finish(solr)
 
         response = solr.search("*:*", rows=5)
         print(f"Total documents in Solr: {response.hits}")
@@ -143,17 +121,21 @@ def main() -> None:
 
     if HYBRID_SEARCH_WITH_SOLR_LTR:
         model = SentenceTransformer("all-MiniLM-L6-v2")
+        if cache is None:
+            cache = create_embedding_cache_from_env(
+                "all-MiniLM-L6-v2", model.get_sentence_embedding_dimension()
+            )
 
         # Generate and index documents if none exist
         response = solr.search("*:*", rows=1)
         if response.hits == 0:
             print("No documents found in index. Generating and indexing documents...")
             documents = generate_documents(0, 1000)
-            documents_with_embeddings = [
-                index_document_with_embeddings(doc, model) for doc in documents
-            ]
-            solr.add(documents_with_embeddings)
-            solr.commit()
+            documents_with_embeddings = BatchEmbedder(model, cache=cache).embed(
+                documents
+            )
+            commit_policy.add(solr, documents_with_embeddings)
+            commit_policy.finish(solr)
             print(f"Indexed {len(documents)} documents with embeddings")
 
         # Perform hybrid search
@@ -171,6 +153,9 @@ def main() -> None:
         for i, doc in enumerate(results[:3], 1):
             print(f"{i}. {doc.get('title', 'No title')} - Score: {doc.get('score', 0)}")
 
+    if cache is not None:
+        cache.close()
+
 
 def parse_args() -> Namespace:
     parser = ArgumentParser()
@@ -0,0 +1,148 @@
+import os
+import re
+import threading
+import unicodedata
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from solr.ltr.vector import format_vector, get_vector_encoding, get_vector_precision
+from solr.util import get_or_create_metric
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+DEFAULT_QUERY_EMBEDDING_CACHE_SIZE = 1_024
+
+QUERY_EMBEDDING_HITS = get_or_create_metric(
+    "solr_query_embedding_cache_hits",
+    Counter,
+    "Query embeddings served from the in-process cache",
+)
+QUERY_EMBEDDING_MISSES = get_or_create_metric(
+    "solr_query_embedding_cache_misses",
+    Counter,
+    "Query embeddings that had to be encoded",
+)
+QUERY_EMBEDDING_SIZE = get_or_create_metric(
+    "solr_query_embedding_cache_size",
+    Gauge,
+    "Entries in the query embedding caches",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str, casefold: bool = True) -> str:
+    """
+    Map spellings of the same query onto one cache key. Case only belongs to
+    the key if the model's tokenizer keeps it.
+    """
+    key = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip()
+    return key.casefold() if casefold else key
+
+
+def tokenizer_lowercases(model: "SentenceTransformer") -> bool:
+    """True for uncased models like all-MiniLM-L6-v2."""
+    tokenizer = getattr(model, "tokenizer", None)
+    return bool(getattr(tokenizer, "do_lower_case", False))
+
+
+class QueryEmbedding(NamedTuple):
+    vector: np.ndarray
+    # Formatted for the {!knn} query parser
+    vector_str: str
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings and their formatted KNN vector for one model.
+
+    Popular search phrases repeat, so most requests skip ``model.encode``.
+    Queries are normalized for the key only, a miss encodes the query as
+    given. The model is passed to ``get`` rather than stored, so the per-model
+    registry below does not keep models alive.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_QUERY_EMBEDDING_CACHE_SIZE,
+        encoding: str = "float32",
+        precision: Optional[int] = None,
+        casefold: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.encoding = encoding
+        self.precision = precision
+        self.casefold = casefold
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, model: "SentenceTransformer", query: str) -> QueryEmbedding:
+        key = normalize_query(query, self.casefold)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                QUERY_EMBEDDING_HITS.inc()
+                return entry
+
+        QUERY_EMBEDDING_MISSES.inc()
+        vector = model.encode(query)
+        # Callers share the cached array
+        vector.flags.writeable = False
+        entry = QueryEmbedding(
+            vector, format_vector(vector, self.encoding, self.precision)
+        )
+
+        with self._lock:
+            previous_size = len(self._entries)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            QUERY_EMBEDDING_SIZE.inc(len(self._entries) - previous_size)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            QUERY_EMBEDDING_SIZE.dec(len(self._entries))
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_caches_lock = threading.Lock()
+_caches: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_query_embedding_cache(model: "SentenceTransformer") -> QueryEmbeddingCache:
+    """
+    The cache for ``model``, sized by ``QUERY_EMBEDDING_CACHE_SIZE`` and
+    formatting vectors with ``SOLR_VECTOR_ENCODING``/``SOLR_VECTOR_PRECISION``.
+    """
+    with _caches_lock:
+        cache = _caches.get(model)
+        if cache is None:
+            encoding = get_vector_encoding()
+            cache = QueryEmbeddingCache(
+                int(
+                    os.getenv(
+                        "QUERY_EMBEDDING_CACHE_SIZE", DEFAULT_QUERY_EMBEDDING_CACHE_SIZE
+                    )
+                ),
+                encoding,
+                get_vector_precision(encoding),
+                tokenizer_lowercases(model),
+            )
+            _caches[model] = cache
+        return cache
+
+
+def get_query_embedding(model: "SentenceTransformer", query: str) -> QueryEmbedding:
+    return get_query_embedding_cache(model).get(model, query)
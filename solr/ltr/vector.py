@@ -0,0 +1,97 @@
+import functools
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+VECTOR_ENCODINGS = ("float32", "float16", "int8")
+# vectorEncoding of the DenseVectorField each encoding needs, Solr has no float16
+SOLR_VECTOR_ENCODINGS = {"float32": "FLOAT32", "float16": "FLOAT32", "int8": "BYTE"}
+# Decimal places, float16 only carries about 3 significant digits
+DEFAULT_PRECISION = {"float32": 6, "float16": 4, "int8": 0}
+FIELDS_PATH = os.path.join(os.path.dirname(__file__), "../../json/fields.json")
+
+_JSON_SEPARATORS = (",", ":")
+
+
+def check_vector_encoding(encoding: str) -> str:
+    if encoding not in VECTOR_ENCODINGS:
+        raise ValueError(
+            f"Unknown vector encoding '{encoding}', expected one of {VECTOR_ENCODINGS}"
+        )
+    return encoding
+
+
+@functools.lru_cache(maxsize=None)
+def load_schema_vector_encoding(path: str = FIELDS_PATH) -> str:
+    """vectorEncoding of the first DenseVectorField type in fields.json."""
+    with open(path, "r") as schema_file:
+        schema = json.load(schema_file)
+    for field_type in schema.get("add-field-type", []):
+        if field_type["class"] == "solr.DenseVectorField":
+            return field_type.get("vectorEncoding", "FLOAT32")
+    return "FLOAT32"
+
+
+def get_vector_encoding() -> str:
+    """
+    ``SOLR_VECTOR_ENCODING``, by default ``int8`` for a ``BYTE`` field and
+    ``float32`` otherwise.
+    """
+    schema_encoding = load_schema_vector_encoding()
+    encoding = check_vector_encoding(
+        os.getenv(
+            "SOLR_VECTOR_ENCODING", "int8" if schema_encoding == "BYTE" else "float32"
+        )
+    )
+    if schema_encoding == "BYTE" and encoding != "int8":
+        raise ValueError(
+            f"Vector encoding '{encoding}' needs vectorEncoding "
+            f"{SOLR_VECTOR_ENCODINGS[encoding]}, fields.json uses BYTE"
+        )
+    return encoding
+
+
+def get_vector_precision(encoding: str) -> int:
+    return int(os.getenv("SOLR_VECTOR_PRECISION", DEFAULT_PRECISION[encoding]))
+
+
+def quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each vector so its largest component is +-127. Only the direction is
+    kept, which is all cosine similarity looks at.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scale = np.abs(vectors).max(axis=-1, keepdims=True)
+    scale[scale == 0] = 1
+    return np.rint(vectors * (127 / scale)).astype(np.int8)
+
+
+def encode_vectors(
+    vectors: np.ndarray, encoding: str = "float32", precision: Optional[int] = None
+) -> list:
+    """
+    Vectors as (nested) lists for JSON update bodies. Floats are rounded to
+    ``precision`` decimal places, which keeps the serialized body short.
+    """
+    check_vector_encoding(encoding)
+    if encoding == "int8":
+        return quantize_int8(vectors).tolist()
+
+    vectors = np.asarray(vectors)
+    if encoding == "float16":
+        vectors = vectors.astype(np.float16)
+    if precision is None:
+        precision = DEFAULT_PRECISION[encoding]
+    # Round in float64, float32 values would print their binary noise again
+    return np.round(vectors.astype(np.float64), precision).tolist()
+
+
+def format_vector(
+    vector: np.ndarray, encoding: str = "float32", precision: Optional[int] = None
+) -> str:
+    """Format one vector for the ``{!knn}`` query parser, e.g. ``[0.0126,-0.0132]``."""
+    return json.dumps(
+        encode_vectors(vector, encoding, precision), separators=_JSON_SEPARATORS
+    )
@@ -0,0 +1,99 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Union
+
+from prometheus_client import (
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+
+from solr.util import get_or_create_metric
+
+INGEST_STAGES = ("generate", "validate", "embed", "serialize", "add", "http")
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+INGEST_STAGE_SECONDS = get_or_create_metric(
+    "solr_ingest_stage_seconds",
+    Histogram,
+    "Duration of one ingest stage per chunk or request "
+    "(generate includes validate, add includes serialize and http)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+SOLR_QTIME_SECONDS = get_or_create_metric(
+    "solr_update_qtime_seconds",
+    Histogram,
+    "QTime reported by Solr for update requests",
+    buckets=LATENCY_BUCKETS,
+)
+INGEST_QUEUE_DEPTH = get_or_create_metric(
+    "solr_ingest_queue_depth",
+    Gauge,
+    "Chunks waiting in the generation process pool or for an indexing thread",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+HTTP_IN_FLIGHT = get_or_create_metric(
+    "solr_http_in_flight_requests",
+    Gauge,
+    "Requests currently sent to a Solr host over the shared session",
+    ["host"],
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def observe_stage(stage: str):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGEST_STAGE_SECONDS.labels(stage=stage).observe(
+            time.perf_counter() - start_time
+        )
+
+
+def observe_qtime(response: Union[str, bytes, None]) -> None:
+    """Record ``responseHeader.QTime`` of a JSON update response, if present."""
+    if not response:
+        return
+    try:
+        qtime = json.loads(response)["responseHeader"]["QTime"]
+    except (ValueError, KeyError, TypeError):
+        return
+    SOLR_QTIME_SECONDS.observe(qtime / 1000)
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Expose the metrics on ``port``.
+
+    Worker processes of the process pools only show up if
+    ``PROMETHEUS_MULTIPROC_DIR`` points to an empty directory before start.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
@@ -0,0 +1,232 @@
+import os
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import pysolr
+import requests
+from prometheus_client import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from solr.metrics import HTTP_IN_FLIGHT, observe_stage
+from solr.util import get_or_create_metric
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 100
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_TIMEOUT = 300
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_clients: dict = {}
+
+_pool_stats_lock = threading.Lock()
+_pool_stats = {"checkouts": 0, "new_connections": 0}
+
+POOL_CHECKOUTS = get_or_create_metric(
+    "solr_http_pool_checkouts",
+    Counter,
+    "Number of connections checked out of the Solr HTTP pool",
+)
+POOL_NEW_CONNECTIONS = get_or_create_metric(
+    "solr_http_pool_new_connections",
+    Counter,
+    "Number of new sockets opened by the Solr HTTP pool",
+)
+
+
+def _record_pool_event(event: str) -> None:
+    with _pool_stats_lock:
+        _pool_stats[event] += 1
+
+
+class MeteredHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        POOL_NEW_CONNECTIONS.inc()
+        _record_pool_event("new_connections")
+        super().connect()
+
+
+class MeteredHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        POOL_NEW_CONNECTIONS.inc()
+        _record_pool_event("new_connections")
+        super().connect()
+
+
+class MeteredHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = MeteredHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        POOL_CHECKOUTS.inc()
+        _record_pool_event("checkouts")
+        return super()._get_conn(timeout)
+
+
+class MeteredHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = MeteredHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        POOL_CHECKOUTS.inc()
+        _record_pool_event("checkouts")
+        return super()._get_conn(timeout)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose urllib3 pools report checkouts and new connections. The
+    requests in flight per Solr host are measured as well, the round trip only
+    for update requests, which is what the ingest ``http`` stage covers.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": MeteredHTTPConnectionPool,
+            "https": MeteredHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        url = urlsplit(request.url)
+        in_flight = HTTP_IN_FLIGHT.labels(host=url.netloc)
+        in_flight.inc()
+        try:
+            if "/update" not in url.path:
+                return super().send(request, *args, **kwargs)
+            with observe_stage("http"):
+                return super().send(request, *args, **kwargs)
+        finally:
+            in_flight.dec()
+
+
+def create_http_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+) -> requests.Session:
+    """
+    Create a keep-alive session backed by a metered urllib3 pool.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep.
+        pool_maxsize (int): Connections kept alive per host, should cover the indexing threads.
+        max_retries (int): Retries on connection errors and, for idempotent methods,
+            502/503/504 responses. Update POSTs are retried by the indexer itself.
+        backoff_factor (float): Backoff factor between retries.
+    """
+    retries = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = PooledHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retries,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(
+        {"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"}
+    )
+    session.stream = False
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the process wide session, configured from SOLR_POOL_* variables."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_http_session(
+                pool_connections=int(
+                    os.getenv("SOLR_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)
+                ),
+                pool_maxsize=int(os.getenv("SOLR_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)),
+                max_retries=int(os.getenv("SOLR_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+                backoff_factor=float(
+                    os.getenv("SOLR_BACKOFF_FACTOR", DEFAULT_BACKOFF_FACTOR)
+                ),
+            )
+        return _session
+
+
+def get_shared_solr_client(url: str, always_commit: bool = False) -> pysolr.Solr:
+    """Return one pysolr client per URL, all sharing the pooled session."""
+    key = (url, always_commit)
+    with _session_lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    client = pysolr.Solr(
+        url,
+        always_commit=always_commit,
+        timeout=int(os.getenv("SOLR_TIMEOUT", DEFAULT_TIMEOUT)),
+        session=get_http_session(),
+    )
+    with _session_lock:
+        return _clients.setdefault(key, client)
+
+
+def post_to_solr(
+    client: pysolr.Solr,
+    handler: str,
+    body: bytes,
+    content_type: str,
+    params: Optional[dict] = None,
+) -> str:
+    """
+    POST a body to a request handler of the client's core over the pooled
+    session and return the response text. Errors raise ``pysolr.SolrError``,
+    as they do for the pysolr client methods.
+    """
+    url = f"{client.url.rstrip('/')}/{handler}"
+    try:
+        response = get_http_session().post(
+            url,
+            data=body,
+            params=params,
+            headers={"Content-Type": content_type},
+            timeout=getattr(client, "timeout", DEFAULT_TIMEOUT),
+        )
+    except requests.RequestException as e:
+        raise pysolr.SolrError(f"Failed to connect to {url}: {e}") from e
+    if response.status_code != 200:
+        raise pysolr.SolrError(
+            f"Solr responded with an error (HTTP {response.status_code}): "
+            f"{response.text}"
+        )
+    return response.text
+
+
+def get_pool_stats() -> dict:
+    with _pool_stats_lock:
+        checkouts = _pool_stats["checkouts"]
+        new_connections = _pool_stats["new_connections"]
+
+    hits = max(checkouts - new_connections, 0)
+    return {
+        "checkouts": checkouts,
+        "new_connections": new_connections,
+        "hits": hits,
+        "hit_ratio": hits / checkouts if checkouts else 0.0,
+    }
+
+
+def reset_http_session() -> None:
+    """Close the shared session and drop cached clients, e.g. after a fork."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _clients.clear()
@@ -1,8 +1,7 @@
 import os
 
-import requests
-
 from solr.setup.schema import reload_solr_collection
+from solr.session import get_http_session
 from solr.util import with_env
 
 
@@ -34,7 +33,7 @@ def configure_ltr_plugin(solr_url: str, collection_name: str) -> None:
     }
 
     for config in [query_parser_config, cache_config, features_transformer_config]:
-        response = requests.post(url, json=config)
+        response = get_http_session().post(url, json=config)
         if response.status_code == 200:
             print(f"Configured LTR plugin successfully: {config}")
         else:
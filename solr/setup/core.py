@@ -1,7 +1,6 @@
 import os
 
-import requests
-
+from solr.session import get_http_session
 from solr.util import with_env
 
 
@@ -12,7 +11,7 @@ def create_solr_collection(
     replication_factor: int = 2,
 ) -> None:
     create_collection_url = f"{temp_solr_url}/admin/collections?action=CREATE&name={temp_collection_name}&numShards={number_of_shards}&replicationFactor={replication_factor}"
-    response = requests.get(create_collection_url)
+    response = get_http_session().get(create_collection_url)
     if response.status_code == 200:
         print(f"Collection {temp_collection_name} created successfully.")
     else:
@@ -1,8 +1,8 @@
 import json
 import os
 
-import requests
-
+from solr.session import get_http_session
+from solr.usage.cache import invalidate_query_cache
 from solr.util import with_env
 
 
@@ -10,7 +10,7 @@ def update_solr_schema(
     temp_solr_url: str, temp_collection_name: str, temp_schema: dict
 ) -> None:
     schema_url = f"{temp_solr_url}/{temp_collection_name}/schema"
-    response = requests.get(schema_url)
+    response = get_http_session().get(schema_url)
 
     if response.status_code != 200:
         print(f"Failed to retrieve current schema: {response.text}")
@@ -75,13 +75,14 @@ def update_solr_schema(
         print(f"No changes to the schema with version: {current_version}")
         return
 
-    response = requests.post(schema_url, json=update_payload)
+    response = get_http_session().post(schema_url, json=update_payload)
     if response.status_code == 200:
         print("Schema updated successfully.")
         commit_url = f"{temp_solr_url}/{temp_collection_name}/update?commit=true"
-        commit_response = requests.get(commit_url)
+        commit_response = get_http_session().get(commit_url)
         if commit_response.status_code == 200:
             print("Changes committed successfully.")
+            invalidate_query_cache()
         else:
             print(f"Failed to commit changes: {commit_response.text}")
     else:
@@ -92,7 +93,7 @@ def reload_solr_collection(temp_solr_url: str, temp_collection_name: str) -> Non
     reload_url = (
         f"{temp_solr_url}/admin/collections?action=RELOAD&name={temp_collection_name}"
     )
-    response = requests.get(reload_url)
+    response = get_http_session().get(reload_url)
     if response.status_code == 200:
         print(f"Collection {temp_collection_name} reloaded successfully.")
     else:
@@ -7,10 +7,10 @@ import time
 from typing import cast, Protocol
 
 import pyfiglet
-import requests
 from kazoo.client import KazooClient
 from requests.auth import HTTPBasicAuth
 
+from solr.session import get_http_session
 from solr.util import with_env
 
 
@@ -117,7 +117,7 @@ def solr_auth(solr_url: str, username: str = "solr", password: str = "") -> None
         return print("Password is empty.")
 
     try:
-        response = requests.get(
+        response = get_http_session().get(
             f"{solr_url}/admin/authentication", auth=HTTPBasicAuth(username, password)
         )
         if response.status_code == 200:
@@ -0,0 +1,256 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import redis
+from prometheus_client import Counter, Gauge
+
+from solr.util import get_or_create_metric
+
+DEFAULT_CACHE_SIZE = 1_024
+DEFAULT_CACHE_TTL_SECONDS = 30.0
+CACHE_BACKENDS = ("none", "memory", "redis")
+
+CACHE_HITS = get_or_create_metric(
+    "solr_query_cache_hits", Counter, "Query results served from the cache", ["query"]
+)
+CACHE_MISSES = get_or_create_metric(
+    "solr_query_cache_misses",
+    Counter,
+    "Queries sent to Solr on a cache miss",
+    ["query"],
+)
+CACHE_EVICTIONS = get_or_create_metric(
+    "solr_query_cache_evictions",
+    Counter,
+    "Cached query results dropped before use",
+    ["reason"],
+)
+CACHE_SIZE = get_or_create_metric(
+    "solr_query_cache_size", Gauge, "Entries in the in-memory query cache"
+)
+
+_MISSING = object()
+
+
+class MemoryQueryCache:
+    """
+    Process local LRU cache with a TTL per entry.
+
+    ``invalidate`` drops every entry, it is called after commits and deletes
+    because they can change the result of any cached query.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                CACHE_EVICTIONS.labels(reason="expired").inc()
+                CACHE_SIZE.set(len(self._entries))
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels(reason="size").inc()
+            CACHE_SIZE.set(len(self._entries))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            CACHE_EVICTIONS.labels(reason="commit").inc(len(self._entries))
+            self._entries.clear()
+            CACHE_SIZE.set(0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisQueryCache:
+    """
+    Query cache shared by all API workers through Redis.
+
+    Redis enforces the TTL, the size bound comes from its ``maxmemory-policy``
+    (e.g. ``allkeys-lru``). Keys contain a generation number that ``invalidate``
+    increments, so one commit in any process invalidates the cache for all.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        prefix: str = "solr:query",
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _generation(self) -> int:
+        return int(self.client.get(f"{self.prefix}:generation") or 0)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{self._generation()}:{key}"
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(self._key(key))
+        return _MISSING if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        self.client.set(
+            self._key(key), json.dumps(value), px=int(self.ttl_seconds * 1000)
+        )
+
+    def invalidate(self) -> None:
+        self.client.incr(f"{self.prefix}:generation")
+
+
+_cache_lock = threading.Lock()
+_cache: Any = None
+_cache_loaded = False
+
+_invalidation_lock = threading.Lock()
+_invalidation_timer: Optional[threading.Timer] = None
+_invalidation_deadline = 0.0
+
+
+def create_query_cache_from_env():
+    backend = os.getenv("QUERY_CACHE_BACKEND", "none")
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(
+            f"Unknown query cache backend '{backend}', expected one of {CACHE_BACKENDS}"
+        )
+
+    ttl_seconds = float(os.getenv("QUERY_CACHE_TTL_SECONDS", DEFAULT_CACHE_TTL_SECONDS))
+    if backend == "memory":
+        return MemoryQueryCache(
+            int(os.getenv("QUERY_CACHE_SIZE", DEFAULT_CACHE_SIZE)), ttl_seconds
+        )
+    if backend == "redis":
+        return RedisQueryCache(
+            redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")),
+            ttl_seconds,
+        )
+    return None
+
+
+def get_query_cache():
+    """The process wide query cache, configured from QUERY_CACHE_* variables."""
+    global _cache, _cache_loaded
+    with _cache_lock:
+        if not _cache_loaded:
+            _cache = create_query_cache_from_env()
+            _cache_loaded = True
+        return _cache
+
+
+def set_query_cache(cache) -> None:
+    global _cache, _cache_loaded
+    with _cache_lock:
+        _cache = cache
+        _cache_loaded = True
+
+
+def invalidate_query_cache() -> None:
+    cache = get_query_cache()
+    if cache is None:
+        return
+    try:
+        cache.invalidate()
+    except redis.RedisError as e:
+        print(f"Failed to invalidate the query cache: {e}")
+
+
+def _run_delayed_invalidation() -> None:
+    global _invalidation_timer
+    invalidate_query_cache()
+    with _invalidation_lock:
+        remaining = _invalidation_deadline - time.monotonic()
+        if remaining > 0:
+            # Adds arrived while the timer was pending, cover their commit too
+            _invalidation_timer = threading.Timer(remaining, _run_delayed_invalidation)
+            _invalidation_timer.daemon = True
+            _invalidation_timer.start()
+        else:
+            _invalidation_timer = None
+
+
+def invalidate_query_cache_after(delay_seconds: float) -> None:
+    """
+    Invalidate the cache once ``delay_seconds`` passed, e.g. when Solr commits
+    an add sent with ``commitWithin``. Calls while a timer is pending only
+    move its deadline, so continuous indexing keeps a single timer.
+    """
+    global _invalidation_timer, _invalidation_deadline
+    if get_query_cache() is None:
+        return
+    with _invalidation_lock:
+        _invalidation_deadline = max(
+            _invalidation_deadline, time.monotonic() + delay_seconds
+        )
+        if _invalidation_timer is None:
+            _invalidation_timer = threading.Timer(
+                delay_seconds, _run_delayed_invalidation
+            )
+            _invalidation_timer.daemon = True
+            _invalidation_timer.start()
+
+
+def cached_query(func: Callable) -> Callable:
+    """
+    Cache the JSON serializable result of a query helper per Solr URL and
+    arguments. Cache errors fall back to querying Solr.
+    """
+
+    @functools.wraps(func)
+    def wrapper(client, *args, **kwargs):
+        cache = get_query_cache()
+        if cache is None:
+            return func(client, *args, **kwargs)
+
+        key = json.dumps(
+            [func.__name__, client.url, args, sorted(kwargs.items())], default=str
+        )
+        try:
+            value = cache.get(key)
+        except redis.RedisError as e:
+            print(f"Query cache unavailable: {e}")
+            return func(client, *args, **kwargs)
+
+        if value is not _MISSING:
+            CACHE_HITS.labels(query=func.__name__).inc()
+            return value
+
+        CACHE_MISSES.labels(query=func.__name__).inc()
+        value = func(client, *args, **kwargs)
+        try:
+            cache.set(key, value)
+        except redis.RedisError as e:
+            print(f"Query cache unavailable: {e}")
+        return value
+
+    return wrapper
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+import time
+from typing import Iterable, List
+
+
+class CheckpointLedger:
+    """
+    SQLite ledger of the chunks a bulk load has indexed.
+
+    A chunk is recorded once all of its documents were accepted by Solr, so a
+    resumed run only has to generate and index the chunks that are missing.
+    The run parameters are stored as well, because the chunk start IDs are
+    only comparable between runs with the same ``chunk_size``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Chunks are recorded from the indexing threads
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "start_id INTEGER PRIMARY KEY, size INTEGER NOT NULL, "
+                "completed_at REAL NOT NULL)"
+            )
+
+    def start_run(self, collection: str, chunk_size: int, resume: bool) -> None:
+        """Forget finished chunks unless resuming a run with the same parameters."""
+        run = {"collection": collection, "chunk_size": str(chunk_size)}
+        with self._lock, self._connection:
+            stored = dict(self._connection.execute("SELECT key, value FROM run"))
+            if resume and stored and stored != run:
+                raise ValueError(
+                    f"Checkpoint {self.path} belongs to a different run {stored}, "
+                    f"cannot resume with {run}"
+                )
+            if not resume:
+                self._connection.execute("DELETE FROM chunks")
+            self._connection.execute("DELETE FROM run")
+            self._connection.executemany(
+                "INSERT INTO run (key, value) VALUES (?, ?)", run.items()
+            )
+
+    def completed_chunks(self) -> set:
+        with self._lock:
+            return {
+                start_id
+                for (start_id,) in self._connection.execute(
+                    "SELECT start_id FROM chunks"
+                )
+            }
+
+    def mark_completed(self, start_id: int, size: int) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO chunks (start_id, size, completed_at) "
+                "VALUES (?, ?, ?)",
+                (start_id, size, time.time()),
+            )
+
+    def pending_chunks(self, start_ids: Iterable[int]) -> List[int]:
+        completed = self.completed_chunks()
+        return [start_id for start_id in start_ids if start_id not in completed]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
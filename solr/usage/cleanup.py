@@ -1,5 +1,6 @@
 import os
 
+from solr.usage.cache import invalidate_query_cache
 from solr.usage.document import get_solr_client
 from solr.util import with_env
 
@@ -7,7 +8,8 @@ from solr.util import with_env
 def delete_all_documents(solr_url: str, collection_name: str) -> None:
     try:
         client = get_solr_client(solr_url, collection_name)
-        client.delete(q="*:*")
+        client.delete(q="*:*", commit=True)
+        invalidate_query_cache()
 
         print(f"All Documents from collection '{collection_name}' were deleted.")
 
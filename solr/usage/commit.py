@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import pysolr
+
+from solr.metrics import observe_qtime, observe_stage
+from solr.usage.cache import invalidate_query_cache, invalidate_query_cache_after
+from solr.usage.encoding import (
+    DEFAULT_UPDATE_FORMAT,
+    check_update_format,
+    encode_documents,
+    get_update_format,
+    post_update_body,
+)
+
+COMMIT_MODES = ("none", "within", "soft", "hard", "always")
+DEFAULT_COMMIT_WITHIN_MS = 1_000
+DEFAULT_SOFT_COMMIT_DOCS = 100_000
+DEFAULT_SOFT_COMMIT_SECONDS = 5.0
+
+
+class CommitPolicy:
+    """
+    Decides when documents sent to Solr become visible.
+
+    Modes:
+        none:   never commit, rely on the autoCommit settings of the collection.
+        within: pass ``commitWithin`` with every add and let Solr batch commits.
+        soft:   soft commit once ``soft_commit_docs`` documents or ``soft_commit_seconds`` passed.
+        hard:   no commit per add, a single hard commit in ``finish`` (bulk loads).
+        always: hard commit with every add (the previous behaviour, for comparison).
+
+    ``update_format`` selects how ``add`` encodes documents (``json`` or ``cbor``).
+    Every commit invalidates the query cache. With ``within`` Solr commits on its
+    own, so the cache is invalidated again ``commit_within_ms`` after each add.
+    """
+
+    def __init__(
+        self,
+        mode: str = "within",
+        commit_within_ms: int = DEFAULT_COMMIT_WITHIN_MS,
+        soft_commit_docs: Optional[int] = DEFAULT_SOFT_COMMIT_DOCS,
+        soft_commit_seconds: Optional[float] = DEFAULT_SOFT_COMMIT_SECONDS,
+        update_format: str = DEFAULT_UPDATE_FORMAT,
+    ):
+        if mode not in COMMIT_MODES:
+            raise ValueError(
+                f"Unknown commit mode '{mode}', expected one of {COMMIT_MODES}"
+            )
+
+        self.mode = mode
+        self.commit_within_ms = commit_within_ms
+        self.soft_commit_docs = soft_commit_docs
+        self.soft_commit_seconds = soft_commit_seconds
+        self.update_format = check_update_format(update_format)
+
+        self._lock = threading.Lock()
+        self._docs_since_commit = 0
+        self._last_commit = time.monotonic()
+
+    @classmethod
+    def from_env(cls, default_mode: str = "within") -> "CommitPolicy":
+        soft_commit_docs = os.getenv("SOLR_SOFT_COMMIT_DOCS")
+        soft_commit_seconds = os.getenv("SOLR_SOFT_COMMIT_SECONDS")
+        return cls(
+            mode=os.getenv("SOLR_COMMIT_POLICY", default_mode),
+            commit_within_ms=int(
+                os.getenv("SOLR_COMMIT_WITHIN_MS", DEFAULT_COMMIT_WITHIN_MS)
+            ),
+            soft_commit_docs=(
+                int(soft_commit_docs) if soft_commit_docs else DEFAULT_SOFT_COMMIT_DOCS
+            ),
+            soft_commit_seconds=(
+                float(soft_commit_seconds)
+                if soft_commit_seconds
+                else DEFAULT_SOFT_COMMIT_SECONDS
+            ),
+            update_format=get_update_format(),
+        )
+
+    def update_kwargs(self) -> dict:
+        """Keyword arguments for ``pysolr.Solr.add`` / ``_update`` under this policy."""
+        if self.mode == "always":
+            return {"commit": True}
+        if self.mode == "within":
+            return {"commit": False, "commitWithin": self.commit_within_ms}
+        return {"commit": False}
+
+    def add(self, client: pysolr.Solr, documents: list) -> str:
+        if self.update_format != "json":
+            return self.add_update_body(
+                client,
+                encode_documents(documents, self.update_format),
+                len(documents),
+                self.update_format,
+            )
+
+        with observe_stage("add"):
+            response = client.add(documents, **self.update_kwargs())
+        observe_qtime(response)
+        self.record(client, len(documents))
+        self.invalidate_after_add()
+        return response
+
+    def add_update_body(
+        self,
+        client: pysolr.Solr,
+        body: bytes,
+        document_count: int,
+        update_format: str = "json",
+    ) -> str:
+        with observe_stage("add"):
+            response = post_update_body(
+                client, body, update_format, **self.update_kwargs()
+            )
+        observe_qtime(response)
+        self.record(client, document_count)
+        self.invalidate_after_add()
+        return response
+
+    def invalidate_after_add(self) -> None:
+        if self.mode == "always":
+            invalidate_query_cache()
+        elif self.mode == "within":
+            invalidate_query_cache()
+            invalidate_query_cache_after(self.commit_within_ms / 1000)
+
+    def soft_commit_due(self, document_count: int) -> bool:
+        """Count added documents, True if a soft commit is due now."""
+        if self.mode != "soft":
+            return False
+
+        with self._lock:
+            self._docs_since_commit += document_count
+            due = (
+                self.soft_commit_docs is not None
+                and self._docs_since_commit >= self.soft_commit_docs
+            ) or (
+                self.soft_commit_seconds is not None
+                and time.monotonic() - self._last_commit >= self.soft_commit_seconds
+            )
+            if due:
+                self._docs_since_commit = 0
+                self._last_commit = time.monotonic()
+        return due
+
+    def record(self, client: pysolr.Solr, document_count: int) -> None:
+        if self.soft_commit_due(document_count):
+            client.commit(softCommit=True)
+            invalidate_query_cache()
+
+    def final_commit(self) -> Optional[dict]:
+        """
+        Keyword arguments for ``pysolr.Solr.commit`` at the end of a load, or
+        None if nothing has to be committed.
+        """
+        if self.mode == "hard":
+            return {}
+        if self.mode == "soft":
+            with self._lock:
+                pending = self._docs_since_commit
+                self._docs_since_commit = 0
+                self._last_commit = time.monotonic()
+            if pending:
+                return {"softCommit": True}
+        return None
+
+    def finish(self, client: pysolr.Solr) -> None:
+        """Called once at the end of a bulk load."""
+        commit_kwargs = self.final_commit()
+        if commit_kwargs is not None:
+            client.commit(**commit_kwargs)
+            invalidate_query_cache()
@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from prometheus_client import Gauge
+
+from solr.util import get_or_create_metric
+
+BATCH_SIZE = get_or_create_metric(
+    "solr_indexer_batch_size", Gauge, "Batch size chosen by the adaptive controller"
+)
+CONCURRENCY_LIMIT = get_or_create_metric(
+    "solr_indexer_concurrency_limit",
+    Gauge,
+    "In-flight request limit chosen by the adaptive controller",
+)
+IN_FLIGHT = get_or_create_metric(
+    "solr_indexer_in_flight", Gauge, "Update requests currently sent to Solr"
+)
+OBSERVED_LATENCY = get_or_create_metric(
+    "solr_indexer_observed_latency_seconds",
+    Gauge,
+    "Smoothed latency of update requests seen by the adaptive controller",
+)
+ERROR_RATE = get_or_create_metric(
+    "solr_indexer_error_rate",
+    Gauge,
+    "Smoothed error rate of update requests seen by the adaptive controller",
+)
+
+
+class AdaptiveController:
+    """
+    AIMD controller for the batch size and the number of in-flight update requests.
+
+    After ``increase_after`` consecutive requests faster than ``target_latency``
+    both limits grow additively. A failed request or one slower than the
+    target shrinks both by ``decrease_factor``, at most once per ``cooldown``
+    seconds so a burst of failures from requests that were already in flight
+    only counts once.
+    """
+
+    def __init__(
+        self,
+        initial_batch_size: int = 5_000,
+        min_batch_size: int = 500,
+        max_batch_size: int = 50_000,
+        batch_size_step: int = 1_000,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        target_latency: float = 2.0,
+        decrease_factor: float = 0.5,
+        increase_after: int = 5,
+        cooldown: float = 1.0,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size_step = batch_size_step
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.increase_after = increase_after
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.clock = clock
+
+        self._condition = threading.Condition()
+        self._batch_size = initial_batch_size
+        self._concurrency = initial_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self.latency = 0.0
+        self.error_rate = 0.0
+
+        self._export()
+
+    @property
+    def batch_size(self) -> int:
+        with self._condition:
+            return self._batch_size
+
+    @property
+    def concurrency(self) -> int:
+        with self._condition:
+            return self._concurrency
+
+    @contextmanager
+    def slot(self):
+        """Block until the current in-flight limit allows another request."""
+        with self._condition:
+            while self._in_flight >= self._concurrency:
+                self._condition.wait()
+            self._in_flight += 1
+            IN_FLIGHT.set(self._in_flight)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                IN_FLIGHT.set(self._in_flight)
+                self._condition.notify_all()
+
+    def run(self, send: Callable[[], object]) -> object:
+        """Send one request within a slot and feed its outcome back."""
+        with self.slot():
+            start_time = time.perf_counter()
+            try:
+                result = send()
+            except Exception:
+                self.record(time.perf_counter() - start_time, success=False)
+                raise
+            self.record(time.perf_counter() - start_time, success=True)
+            return result
+
+    def record(self, latency: float, success: bool) -> None:
+        with self._condition:
+            self.latency += self.smoothing * (latency - self.latency)
+            self.error_rate += self.smoothing * (
+                (0.0 if success else 1.0) - self.error_rate
+            )
+
+            if not success or latency > self.target_latency:
+                self._successes = 0
+                now = self.clock()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self._batch_size = max(
+                        self.min_batch_size,
+                        int(self._batch_size * self.decrease_factor),
+                    )
+                    self._concurrency = max(
+                        self.min_concurrency,
+                        int(self._concurrency * self.decrease_factor),
+                    )
+            else:
+                self._successes += 1
+                if self._successes >= self.increase_after:
+                    self._successes = 0
+                    self._batch_size = min(
+                        self.max_batch_size, self._batch_size + self.batch_size_step
+                    )
+                    self._concurrency = min(self.max_concurrency, self._concurrency + 1)
+                    self._condition.notify_all()
+
+            self._export()
+
+    def backoff(self, attempt: int) -> float:
+        """Retry delay that grows with the attempt and the observed latency, with jitter."""
+        base = max(self.latency, 0.1) * (2**attempt)
+        return min(base, 30.0) * random.uniform(0.5, 1.5)
+
+    def _export(self) -> None:
+        BATCH_SIZE.set(self._batch_size)
+        CONCURRENCY_LIMIT.set(self._concurrency)
+        OBSERVED_LATENCY.set(self.latency)
+        ERROR_RATE.set(self.error_rate)
@@ -1,21 +1,54 @@
 import os
+import queue
 import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
-from typing import List
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import lru_cache, partial
+from multiprocessing import resource_tracker, shared_memory
+from typing import Annotated, Callable, List, NamedTuple, Optional, Union
 
 import numpy as np
 import pysolr
 from faker.proxy import Faker
-from prometheus_client import Counter, Gauge, start_http_server
-from pydantic import BaseModel, EmailStr, Field, ValidationError, ConfigDict
-
+from prometheus_client import Counter, Gauge
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    EmailStr,
+    Field,
+    ValidationError,
+    ConfigDict,
+    TypeAdapter,
+)
+from pydantic.networks import validate_email
+
+from solr.metrics import INGEST_QUEUE_DEPTH, observe_stage, start_metrics_server
+from solr.session import get_shared_solr_client
+from solr.usage.checkpoint import CheckpointLedger
+from solr.usage.commit import CommitPolicy
+from solr.usage.controller import AdaptiveController
+from solr.usage.encoding import decode_documents, encode_documents
+from solr.usage.routing import ShardRouter, get_shard_router
 from solr.util import with_env, get_or_create_metric
 
-_client_counter = threading.Lock()
-_current_client_index = 0
 turn_on_document_print = False
 
+GENDERS = ["Male", "Female", "Diverse"]
+MIN_AGE = 18
+MAX_AGE = 80
+VOCABULARY_SIZE = 10_000
+EMAIL_CACHE_SIZE = 65_536
+_vocabularies: dict = {}
+_validated_emails: set = set()
+
 # Define Prometheus metrics
 DOCUMENTS_PROCESSED = get_or_create_metric(
     "documents_processed", Counter, "Number of documents processed", ["status"]
@@ -28,6 +61,15 @@ PROCESS_TIME = get_or_create_metric(
 )
 
 
+@lru_cache(maxsize=EMAIL_CACHE_SIZE)
+def _validate_email(value: str) -> str:
+    # Same check as EmailStr, but repeated addresses are only validated once
+    return validate_email(value)[1]
+
+
+CachedEmailStr = Annotated[str, AfterValidator(_validate_email)]
+
+
 class EmailValidator(BaseModel):
     email: EmailStr
 
@@ -37,7 +79,7 @@ class SolrDocument(BaseModel):
     gender: str
     age: int = Field(..., ge=18, le=80)
     name: str
-    email: EmailStr
+    email: CachedEmailStr
     address: str
     city: str
     state: str
@@ -47,9 +89,8 @@ class SolrDocument(BaseModel):
     @staticmethod
     def cast_to_email_str(value: str) -> EmailStr:
         try:
-            validated = EmailValidator.model_validate({"email": value})
-            return validated.email
-        except ValidationError as e:
+            return _validate_email(value)
+        except ValueError as e:
             raise ValueError(f"Invalid email: {value}") from e
 
 
@@ -57,88 +98,562 @@ class SolrImportPayload(BaseModel):
     documents: List[SolrDocument]
 
 
+SolrDocumentList = TypeAdapter(List[SolrDocument])
+
+
+def validate_documents(raw_documents: list) -> list[dict]:
+    """Validate a whole list of documents in one pass and return plain dicts."""
+    with observe_stage("validate"):
+        return SolrDocumentList.dump_python(
+            SolrDocumentList.validate_python(raw_documents)
+        )
+
+
+def validate_documents_json(body: bytes) -> list[dict]:
+    """Like validate_documents, but parses the JSON array inside pydantic-core."""
+    with observe_stage("validate"):
+        return SolrDocumentList.dump_python(SolrDocumentList.validate_json(body))
+
+
+class UpdateBody(NamedTuple):
+    """A ready-to-send JSON or CBOR update body produced by a worker process."""
+
+    body: bytes
+    document_count: int
+    update_format: str = "json"
+
+
+class SharedUpdateBody(NamedTuple):
+    """An update body a worker process left in a shared memory block."""
+
+    name: str
+    size: int
+    document_count: int
+    update_format: str = "json"
+
+
+_email_column_adapter = TypeAdapter(List[EmailStr])
+
+
 """
  Here methods to create Solr documents, add them to Solr, and manage Solr clients.
 """
 
 
-def get_next_client_index(num_clients: int) -> int:
-    global _current_client_index
-    with _client_counter:
-        index = _current_client_index
-        _current_client_index = (_current_client_index + 1) % num_clients
-        return index
-
-
 def pre_generate_random_data(chunk_size: int) -> tuple:
-    genders = np.random.choice(["Male", "Female", "Diverse"], size=chunk_size)
-    ages = np.random.randint(18, 80, size=chunk_size)
+    genders = np.random.choice(GENDERS, size=chunk_size)
+    ages = np.random.randint(MIN_AGE, MAX_AGE, size=chunk_size)
     return genders, ages
 
 
-def add_documents_to_solr(
-    solr_clients: list, documents: list, start_doc_id: int, batch_size: int = 10_000
+def pre_generate_vocabularies(vocabulary_size: int = VOCABULARY_SIZE) -> dict:
+    """
+    Sample the Faker backed vocabularies once per process and cache them.
+
+    Emails are validated as a column here, invalid entries are dropped and the
+    valid ones remembered so later column checks only validate unseen values.
+    """
+    if vocabulary_size in _vocabularies:
+        return _vocabularies[vocabulary_size]
+
+    fake = Faker()
+    emails = [fake.email() for _ in range(vocabulary_size)]
+    try:
+        _email_column_adapter.validate_python(emails)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors()}
+        emails = [email for index, email in enumerate(emails) if index not in invalid]
+    _validated_emails.update(emails)
+
+    vocabularies = {
+        "name": np.array([fake.name() for _ in range(vocabulary_size)], dtype=object),
+        "email": np.array(emails, dtype=object),
+        "address": np.array(
+            [fake.address() for _ in range(vocabulary_size)], dtype=object
+        ),
+        "city": np.array([fake.city() for _ in range(vocabulary_size)], dtype=object),
+        "state": np.array([fake.state() for _ in range(vocabulary_size)], dtype=object),
+    }
+    _vocabularies[vocabulary_size] = vocabularies
+    return vocabularies
+
+
+def pre_generate_columns(
+    chunk_size: int,
+    vocabulary_size: int = VOCABULARY_SIZE,
+    rng: Optional[np.random.Generator] = None,
+) -> dict:
+    rng = rng or np.random.default_rng()
+    vocabularies = pre_generate_vocabularies(vocabulary_size)
+
+    columns = {
+        "gender": rng.choice(np.array(GENDERS, dtype=object), size=chunk_size),
+        "age": rng.integers(MIN_AGE, MAX_AGE, size=chunk_size),
+    }
+    for field, vocabulary in vocabularies.items():
+        columns[field] = vocabulary[rng.integers(0, len(vocabulary), size=chunk_size)]
+    return columns
+
+
+def validate_document_columns(columns: dict) -> None:
+    ages = columns["age"]
+    if ages.size and (ages.min() < MIN_AGE or ages.max() > MAX_AGE):
+        raise ValueError(f"Age column out of bounds [{MIN_AGE}, {MAX_AGE}]")
+
+    unknown_genders = set(np.unique(columns["gender"]).tolist()) - set(GENDERS)
+    if unknown_genders:
+        raise ValueError(f"Unknown genders in column: {unknown_genders}")
+
+    unvalidated_emails = set(columns["email"].tolist()) - _validated_emails
+    if unvalidated_emails:
+        try:
+            _email_column_adapter.validate_python(list(unvalidated_emails))
+        except ValidationError as e:
+            raise ValueError(f"Invalid email column: {e}") from e
+        _validated_emails.update(unvalidated_emails)
+
+
+def _add_with_retries(
+    add: Callable[[], object],
+    max_retries: int = 3,
+    controller: Optional[AdaptiveController] = None,
 ) -> None:
-    num_clients = len(solr_clients)
+    for attempt in range(max_retries):
+        try:
+            if controller is None:
+                add()
+            else:
+                controller.run(add)
+            return
+        except (pysolr.SolrError, ConnectionError) as e:
+            if attempt == max_retries - 1:  # Letzter Versuch
+                print(f"Failed to add documents after {max_retries} attempts: {e}")
+                raise
+            else:
+                print(f"Timeout attempt {attempt + 1}, retrying...")
+                time.sleep(
+                    controller.backoff(attempt)
+                    if controller is not None
+                    else 2**attempt
+                )
 
-    for index in range(0, len(documents), batch_size):
-        client_index = get_next_client_index(num_clients)
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                solr_clients[client_index].add(documents[index : index + batch_size])
-                DOCUMENTS_ADDED.labels(status="added").inc(
-                    len(documents[index : index + batch_size])
+def add_documents_to_solr(
+    solr_client: pysolr.Solr,
+    documents: list,
+    start_doc_id: int,
+    batch_size: int = 10_000,
+    commit_policy: Optional[CommitPolicy] = None,
+    controller: Optional[AdaptiveController] = None,
+    router: Optional[ShardRouter] = None,
+) -> None:
+    """
+    Add documents in batches.
+
+    With a ``controller`` the batch size and the number of in-flight requests
+    follow its AIMD decisions instead of the fixed ``batch_size``. With a
+    ``router`` every batch is split by shard and the sub-batches are sent
+    straight to the shard leaders instead of ``solr_client``.
+    """
+    commit_policy = commit_policy or CommitPolicy("none")
+
+    index = 0
+    while index < len(documents):
+        current_batch_size = controller.batch_size if controller else batch_size
+        batch = documents[index : index + current_batch_size]
+
+        if router is not None:
+            for shard_name, shard_batch in router.partition(batch).items():
+                _add_with_retries(
+                    lambda: router.add(
+                        lambda client: commit_policy.add(client, shard_batch),
+                        shard_name,
+                    ),
+                    controller=controller,
                 )
-                break
-            except (pysolr.SolrError, ConnectionError) as e:
-                if attempt == max_retries - 1:  # Letzter Versuch
-                    print(f"Failed to add documents after {max_retries} attempts: {e}")
-                    raise
-                else:
-                    print(f"Timeout attempt {attempt + 1}, retrying...")
-                    time.sleep(2**attempt)
+            target = f" using {len(router.shards)} shard leaders"
+        else:
+            _add_with_retries(
+                lambda: commit_policy.add(solr_client, batch),
+                controller=controller,
+            )
+            target = ""
+        DOCUMENTS_ADDED.labels(status="added").inc(len(batch))
 
         global_start = start_doc_id + index
-        global_end = start_doc_id + min(index + batch_size, len(documents))
-        print(
-            f"Added documents {global_start} to {global_end} to Solr using client {client_index}"
+        global_end = start_doc_id + index + len(batch)
+        print(f"Added documents {global_start} to {global_end} to Solr{target}")
+        index += len(batch)
+
+
+def add_update_body_to_solr(
+    solr_client: pysolr.Solr,
+    update_body: UpdateBody,
+    start_doc_id: int,
+    commit_policy: Optional[CommitPolicy] = None,
+    controller: Optional[AdaptiveController] = None,
+) -> None:
+    """Forward a pre-serialized update body without decoding it again."""
+    commit_policy = commit_policy or CommitPolicy("none")
+
+    _add_with_retries(
+        lambda: commit_policy.add_update_body(
+            solr_client,
+            update_body.body,
+            update_body.document_count,
+            update_body.update_format,
+        ),
+        controller=controller,
+    )
+    DOCUMENTS_ADDED.labels(status="added").inc(update_body.document_count)
+
+    print(
+        f"Added documents {start_doc_id} to "
+        f"{start_doc_id + update_body.document_count} to Solr"
+    )
+
+
+def read_shared_update_body(shared_body: SharedUpdateBody) -> UpdateBody:
+    shm = shared_memory.SharedMemory(name=shared_body.name)
+    try:
+        body = bytes(shm.buf[: shared_body.size])
+    finally:
+        shm.close()
+        shm.unlink()
+    return UpdateBody(body, shared_body.document_count, shared_body.update_format)
+
+
+def discard_payload(payload) -> None:
+    """Free the shared memory block of a payload that will not be indexed."""
+    if not isinstance(payload, SharedUpdateBody):
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=payload.name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _discard_futures(futures) -> None:
+    """Cancel generation futures and free the payloads of those already running."""
+    for future in futures:
+        if future.cancel():
+            continue
+        try:
+            discard_payload(future.result())
+        except Exception:
+            pass
+
+
+def add_payload_to_solr(
+    solr_client: pysolr.Solr,
+    payload: Union[list, UpdateBody, SharedUpdateBody],
+    start_doc_id: int,
+    batch_size: int = 10_000,
+    commit_policy: Optional[CommitPolicy] = None,
+    controller: Optional[AdaptiveController] = None,
+    router: Optional[ShardRouter] = None,
+) -> None:
+    if isinstance(payload, SharedUpdateBody):
+        payload = read_shared_update_body(payload)
+
+    if isinstance(payload, UpdateBody) and router is not None:
+        # Routing needs the document IDs, so the body has to be decoded again
+        payload = decode_documents(payload.body, payload.update_format)
+
+    if isinstance(payload, UpdateBody):
+        add_update_body_to_solr(
+            solr_client, payload, start_doc_id, commit_policy, controller
         )
+    else:
+        add_documents_to_solr(
+            solr_client,
+            payload,
+            start_doc_id,
+            batch_size,
+            commit_policy,
+            controller,
+            router,
+        )
+
 
+@observe_stage("generate")
+def generate_documents(
+    start_index: int, chunk_size: int, trusted: bool = False
+) -> list:
+    """
+    Generate documents row by row with Faker.
 
-def generate_documents(start_index: int, chunk_size: int) -> list:
+    With ``trusted`` the documents are built as plain dicts and not validated
+    through SolrDocument, the generator is trusted to produce valid values.
+    """
     fake = Faker()
     documents = []
     genders, ages = pre_generate_random_data(chunk_size)
 
     for index in range(chunk_size):
         id_ = index + start_index
+        gender = str(genders[index])
         try:
-            document = SolrDocument(
-                id=id_,
-                gender=str(genders[index]),
-                age=int(ages[index]),
-                name=fake.name(),
-                email=SolrDocument.cast_to_email_str(fake.email()),
-                address=fake.address(),
-                city=fake.city(),
-                state=fake.state(),
-                search_for=str(genders[index]),
-            )
-            documents.append(document.model_dump())
-            DOCUMENTS_PROCESSED.labels(status="processed").inc()
+            if trusted:
+                document = {
+                    "id": id_,
+                    "gender": gender,
+                    "age": int(ages[index]),
+                    "name": fake.name(),
+                    "email": fake.email(),
+                    "address": fake.address(),
+                    "city": fake.city(),
+                    "state": fake.state(),
+                    "search_for": gender,
+                }
+            else:
+                # SolrDocument validates the email, no need to cast it upfront
+                document = SolrDocument(
+                    id=id_,
+                    gender=gender,
+                    age=int(ages[index]),
+                    name=fake.name(),
+                    email=fake.email(),
+                    address=fake.address(),
+                    city=fake.city(),
+                    state=fake.state(),
+                    search_for=gender,
+                ).model_dump()
+            documents.append(document)
 
             if turn_on_document_print:
                 print(f"Generated document {id_}:{documents[-1]}")
         except ValidationError as e:
             print(f"Validation error for document {id_}: {e}")
 
+    DOCUMENTS_PROCESSED.labels(status="processed").inc(len(documents))
+    return documents
+
+
+@observe_stage("generate")
+def generate_documents_columnar(
+    start_index: int,
+    chunk_size: int,
+    vocabulary_size: int = VOCABULARY_SIZE,
+    rng: Optional[np.random.Generator] = None,
+    trusted: bool = False,
+) -> list:
+    """
+    Batch variant of generate_documents: builds whole columns from pre-sampled
+    vocabularies and validates per column instead of per document. With
+    ``trusted`` the column validation is skipped.
+    """
+    columns = pre_generate_columns(chunk_size, vocabulary_size, rng)
+    if not trusted:
+        with observe_stage("validate"):
+            validate_document_columns(columns)
+
+    genders = columns["gender"].tolist()
+    documents = [
+        {
+            "id": id_,
+            "gender": gender,
+            "age": age,
+            "name": name,
+            "email": email,
+            "address": address,
+            "city": city,
+            "state": state,
+            "search_for": gender,
+        }
+        for id_, gender, age, name, email, address, city, state in zip(
+            range(start_index, start_index + chunk_size),
+            genders,
+            columns["age"].tolist(),
+            columns["name"].tolist(),
+            columns["email"].tolist(),
+            columns["address"].tolist(),
+            columns["city"].tolist(),
+            columns["state"].tolist(),
+        )
+    ]
+    DOCUMENTS_PROCESSED.labels(status="processed").inc(len(documents))
+
+    if turn_on_document_print:
+        for document in documents:
+            print(f"Generated document {document['id']}:{document}")
+
     return documents
 
 
+def generate_update_body(
+    start_index: int,
+    chunk_size: int,
+    generator: Callable[[int, int], list] = generate_documents_columnar,
+    update_format: str = "json",
+) -> UpdateBody:
+    """Generate a chunk and serialize it to the final Solr update body."""
+    documents = generator(start_index, chunk_size)
+    body = encode_documents(documents, update_format)
+    return UpdateBody(body, len(documents), update_format)
+
+
+def generate_shared_update_body(
+    start_index: int,
+    chunk_size: int,
+    generator: Callable[[int, int], list] = generate_documents_columnar,
+    update_format: str = "json",
+) -> SharedUpdateBody:
+    """Like generate_update_body, but hands the body over via shared memory."""
+    update_body = generate_update_body(
+        start_index, chunk_size, generator, update_format
+    )
+    size = len(update_body.body)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shm.buf[:size] = update_body.body
+    shm.close()
+    # Ownership moves to the parent, which unlinks the block after indexing
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return SharedUpdateBody(shm.name, size, update_body.document_count, update_format)
+
+
+def get_worker_function(
+    generator: Callable[[int, int], list],
+    transport: str,
+    update_format: str = "json",
+    trusted: bool = False,
+) -> Callable[[int, int], object]:
+    """
+    Pick what worker processes send back to the parent.
+
+    ``documents`` returns lists of dicts, ``json`` returns the serialized update
+    body (encoded as ``update_format``) through the process pool pipe and
+    ``shm`` through shared memory. ``trusted`` is passed on to the generator.
+    """
+    if trusted:
+        generator = partial(generator, trusted=True)
+    if transport == "documents":
+        return generator
+    if transport == "json":
+        return partial(
+            generate_update_body, generator=generator, update_format=update_format
+        )
+    if transport == "shm":
+        return partial(
+            generate_shared_update_body,
+            generator=generator,
+            update_format=update_format,
+        )
+    raise ValueError(f"Unknown transport: {transport}")
+
+
 def get_solr_client(url: str, collection_name: str) -> pysolr.Solr:
-    return pysolr.Solr(url + "/" + collection_name, always_commit=True, timeout=300)
+    return get_shared_solr_client(url + "/" + collection_name)
+
+
+def _track_queue_depth(future: Future, pool: str) -> None:
+    """Count a submitted chunk in the queue depth gauge until it is done."""
+    INGEST_QUEUE_DEPTH.labels(pool=pool).inc()
+    future.add_done_callback(lambda _: INGEST_QUEUE_DEPTH.labels(pool=pool).dec())
+
+
+def stream_documents(
+    solr_client: pysolr.Solr,
+    number_of_documents: int,
+    chunk_size: int,
+    generator: Callable[[int, int], object] = generate_documents_columnar,
+    max_processes: Optional[int] = None,
+    indexing_threads: int = 10,
+    max_pending_batches: int = 10,
+    batch_size: int = 25_000,
+    commit_policy: Optional[CommitPolicy] = None,
+    controller: Optional[AdaptiveController] = None,
+    router: Optional[ShardRouter] = None,
+    checkpoint: Optional[CheckpointLedger] = None,
+) -> None:
+    """
+    Generate and index documents as a bounded pipeline.
+
+    At most ``max_processes`` chunks are being generated and ``max_pending_batches``
+    generated chunks wait for an indexing thread at any time. When the queue is
+    full the generation stage blocks, so memory stays flat regardless of
+    ``number_of_documents``. Chunks recorded in ``checkpoint`` are skipped and
+    newly indexed chunks are recorded there.
+    """
+    max_processes = max_processes or os.cpu_count() or 16
+    batch_queue: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+    errors: list = []
+
+    def index_batches() -> None:
+        while True:
+            item = batch_queue.get()
+            try:
+                if item is None:
+                    return
+                INGEST_QUEUE_DEPTH.labels(pool="index").dec()
+                start_doc_id, payload = item
+                if errors:
+                    discard_payload(payload)
+                    continue
+                add_payload_to_solr(
+                    solr_client,
+                    payload,
+                    start_doc_id,
+                    batch_size,
+                    commit_policy,
+                    controller,
+                    router,
+                )
+                if checkpoint is not None:
+                    checkpoint.mark_completed(start_doc_id, chunk_size)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                batch_queue.task_done()
+
+    indexers = [
+        threading.Thread(target=index_batches, daemon=True)
+        for _ in range(indexing_threads)
+    ]
+    for indexer in indexers:
+        indexer.start()
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_processes) as process_executors:
+            start_indexes = range(1, number_of_documents + 1, chunk_size)
+            if checkpoint is not None:
+                start_indexes = checkpoint.pending_chunks(start_indexes)
+            start_indexes = iter(start_indexes)
+            pending = {}
+
+            def submit_next() -> None:
+                index = next(start_indexes, None)
+                if index is not None:
+                    future = process_executors.submit(generator, index, chunk_size)
+                    _track_queue_depth(future, "generate")
+                    pending[future] = index
+
+            for _ in range(max_processes):
+                submit_next()
+
+            try:
+                while pending and not errors:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        start_doc_id = pending.pop(future)
+                        # Blocks while the indexing stage is behind (backpressure)
+                        batch_queue.put((start_doc_id, future.result()))
+                        INGEST_QUEUE_DEPTH.labels(pool="index").inc()
+                        submit_next()
+            finally:
+                # Also after a failed chunk, whose result() raised above
+                _discard_futures(pending)
+    finally:
+        for _ in indexers:
+            batch_queue.put(None)
+        for indexer in indexers:
+            indexer.join()
+
+    if errors:
+        raise errors[0]
 
 
 def create_documents(
@@ -146,50 +661,180 @@ def create_documents(
     temp_collection_name: str,
     number_of_documents: int,
     chunk_size: int,
+    columnar: bool = True,
+    streaming: bool = False,
+    transport: str = "documents",
+    commit_policy: Optional[CommitPolicy] = None,
+    adaptive: bool = False,
+    routing: bool = False,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    trusted: bool = False,
 ) -> None:
-    clients = [get_solr_client(temp_solr_url, temp_collection_name) for _ in range(10)]
+    """
+    Bulk load ``number_of_documents`` generated documents.
+
+    ``trusted`` skips the validation of the generated documents.
+
+    With ``checkpoint_path`` every indexed chunk is recorded in a SQLite ledger.
+    ``resume`` skips the chunks a previous, failed run already indexed, which
+    works because the document IDs only depend on the chunk start.
+    """
+    commit_policy = commit_policy or CommitPolicy.from_env(default_mode="hard")
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = CheckpointLedger(checkpoint_path)
+        checkpoint.start_run(temp_collection_name, chunk_size, resume)
+    elif resume:
+        raise ValueError("resume requires a checkpoint_path")
+    # Bounds in-flight requests and batch sizes by the observed Solr latency
+    controller = AdaptiveController() if adaptive else None
+    # Falls back to the collection client if the cluster state is unavailable
+    router = get_shard_router(temp_solr_url, temp_collection_name) if routing else None
+    generator = get_worker_function(
+        generate_documents_columnar if columnar else generate_documents,
+        transport,
+        commit_policy.update_format,
+        trusted,
+    )
+    # Thread safe and pooled, one client serves every indexing thread
+    client = get_solr_client(temp_solr_url, temp_collection_name)
     start_time = time.time()
     max_processes = os.cpu_count() or 16
     number_of_threads = 100
 
-    with ProcessPoolExecutor(
-        max_workers=max_processes
-    ) as process_executors, ThreadPoolExecutor(
-        max_workers=number_of_threads
-    ) as threads_executors:
-
-        tasks = []
-        futures = []
-        futures_to_start_index = {}
-        for index in range(1, number_of_documents + 1, chunk_size):
-            future = process_executors.submit(generate_documents, index, chunk_size)
-            futures_to_start_index[future] = index
-            futures.append(future)
-
-        for future in as_completed(futures):
-            documents = future.result()
-            start_doc_id = futures_to_start_index[future]
-            tasks.append(
-                threads_executors.submit(
-                    add_documents_to_solr, clients, documents, start_doc_id, 25_000
-                )
+    try:
+        if streaming:
+            stream_documents(
+                client,
+                number_of_documents,
+                chunk_size,
+                generator,
+                max_processes,
+                commit_policy=commit_policy,
+                controller=controller,
+                router=router,
+                checkpoint=checkpoint,
             )
+        else:
+            start_indexes = range(1, number_of_documents + 1, chunk_size)
+            if checkpoint is not None:
+                start_indexes = checkpoint.pending_chunks(start_indexes)
+                print(f"{len(start_indexes)} chunks left to index.")
+
+            with ProcessPoolExecutor(
+                max_workers=max_processes
+            ) as process_executors, ThreadPoolExecutor(
+                max_workers=number_of_threads
+            ) as threads_executors:
+
+                tasks = {}
+                futures = []
+                futures_to_start_index = {}
+                for index in start_indexes:
+                    future = process_executors.submit(generator, index, chunk_size)
+                    _track_queue_depth(future, "generate")
+                    futures_to_start_index[future] = index
+                    futures.append(future)
+
+                try:
+                    for future in as_completed(futures):
+                        start_doc_id = futures_to_start_index.pop(future)
+                        payload = future.result()
+                        task = threads_executors.submit(
+                            add_payload_to_solr,
+                            client,
+                            payload,
+                            start_doc_id,
+                            25_000,
+                            commit_policy,
+                            controller,
+                            router,
+                        )
+                        _track_queue_depth(task, "index")
+                        tasks[task] = start_doc_id
+                except Exception:
+                    # Chunks never handed to an indexing thread
+                    _discard_futures(futures_to_start_index)
+                    raise
 
-        for task in as_completed(tasks):
-            task.result()
+                # Record every chunk that made it, even if others failed
+                errors = []
+                for task in as_completed(tasks):
+                    try:
+                        task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    if checkpoint is not None:
+                        checkpoint.mark_completed(tasks[task], chunk_size)
+                if errors:
+                    raise errors[0]
+
+        commit_policy.finish(client)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
 
     end_time = time.time()
     PROCESS_TIME.set(end_time - start_time)
     print(f"Documents added successfully in {end_time - start_time} seconds.")
 
 
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument(
+        "--streaming", action="store_true", help="Use the bounded streaming pipeline"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=os.getenv("SOLR_CHECKPOINT_PATH", "create_documents.checkpoint.db"),
+        help="SQLite ledger of indexed chunks",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the chunks a previous run recorded in the checkpoint",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune batch size and concurrency from Solr's response times",
+    )
+    parser.add_argument(
+        "--routing",
+        action="store_true",
+        help="Send each batch straight to the leaders of its shards",
+    )
+    parser.add_argument(
+        "--trusted",
+        action="store_true",
+        help="Skip the validation of the generated documents",
+    )
+    return parser.parse_args()
+
+
 @with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
 def main() -> None:
+    args = parse_args()
     solr_url = os.getenv("SOLR_URL")
     collection_name = os.getenv("SOLR_COLLECTION")
     # start monitoring
-    start_http_server(8000)
-    create_documents(solr_url, collection_name, 1000000, 5000)
+    start_metrics_server(8000)
+    create_documents(
+        solr_url,
+        collection_name,
+        args.documents,
+        args.chunk_size,
+        streaming=args.streaming,
+        adaptive=args.adaptive,
+        routing=args.routing,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        trusted=args.trusted,
+    )
 
 
 if __name__ == "__main__":
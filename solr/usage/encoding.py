@@ -0,0 +1,73 @@
+import json
+import os
+
+import cbor2
+import pysolr
+
+from solr.metrics import observe_stage
+from solr.session import post_to_solr
+
+UPDATE_FORMATS = ("json", "cbor")
+DEFAULT_UPDATE_FORMAT = "json"
+
+UPDATE_HANDLERS = {"json": "update", "cbor": "update/cbor"}
+CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "cbor": "application/cbor",
+}
+
+
+def check_update_format(update_format: str) -> str:
+    if update_format not in UPDATE_FORMATS:
+        raise ValueError(
+            f"Unknown update format '{update_format}', expected one of {UPDATE_FORMATS}"
+        )
+    return update_format
+
+
+def get_update_format() -> str:
+    return check_update_format(
+        os.getenv("SOLR_UPDATE_FORMAT", DEFAULT_UPDATE_FORMAT).lower()
+    )
+
+
+def encode_documents(documents: list, update_format: str) -> bytes:
+    """Serialize documents to the body of a Solr update request."""
+    with observe_stage("serialize"):
+        if update_format == "cbor":
+            return cbor2.dumps(documents)
+        return json.dumps(documents, separators=(",", ":")).encode("utf-8")
+
+
+def decode_documents(body: bytes, update_format: str) -> list:
+    if update_format == "cbor":
+        return cbor2.loads(body)
+    return json.loads(body)
+
+
+def update_params(update_kwargs: dict) -> dict:
+    """Query parameters of an update request for ``CommitPolicy.update_kwargs``."""
+    params = {}
+    for key, value in update_kwargs.items():
+        if key == "commit":
+            if value:
+                params["commit"] = "true"
+        else:
+            params[key] = str(value)
+    return params
+
+
+def post_update_body(
+    client: pysolr.Solr, body: bytes, update_format: str, **update_kwargs
+) -> str:
+    """
+    Post an encoded update body. Solr 9.3+ reads CBOR from ``/update/cbor``,
+    which skips the JSON parsing on the Solr side.
+    """
+    return post_to_solr(
+        client,
+        UPDATE_HANDLERS[update_format],
+        body,
+        CONTENT_TYPES[update_format],
+        update_params(update_kwargs),
+    )
@@ -0,0 +1,179 @@
+import json
+import os
+from argparse import ArgumentParser, Namespace
+from itertools import islice
+from typing import Iterable, Optional, Sequence, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from solr.session import get_http_session
+from solr.usage.document import get_solr_client
+from solr.usage.query import DEFAULT_CURSOR_BATCH_SIZE, iter_documents
+from solr.util import with_env
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+# Arrow types of the values Solr returns, dates come back as ISO-8601 strings
+ARROW_TYPES = {
+    "solr.StrField": pa.string(),
+    "solr.TextField": pa.string(),
+    "solr.SortableTextField": pa.string(),
+    "solr.UUIDField": pa.string(),
+    "solr.DatePointField": pa.string(),
+    "solr.BoolField": pa.bool_(),
+    "solr.IntPointField": pa.int32(),
+    "solr.LongPointField": pa.int64(),
+    "solr.FloatPointField": pa.float32(),
+    "solr.DoublePointField": pa.float64(),
+    "solr.DenseVectorField": pa.list_(pa.float32()),
+}
+
+
+def _is_true(value) -> bool:
+    return str(value).lower() == "true"
+
+
+def load_arrow_schema(
+    client, fl: Optional[Union[str, Sequence[str]]] = None
+) -> pa.Schema:
+    """
+    Arrow schema for the stored fields of the collection (or the fields in
+    ``fl``) from the Schema API. Fields of unknown types are left out.
+    """
+    response = get_http_session().get(f"{client.url}/schema", params={"wt": "json"})
+    response.raise_for_status()
+    schema = response.json()["schema"]
+    field_types = {
+        field_type["name"]: field_type for field_type in schema["fieldTypes"]
+    }
+    if isinstance(fl, str):
+        fl = fl.split(",")
+
+    fields = []
+    for field in schema["fields"]:
+        field_type = field_types.get(field["type"], {})
+        arrow_type = ARROW_TYPES.get(field_type.get("class"))
+        if arrow_type is None:
+            continue
+        if fl is not None:
+            if field["name"] not in fl:
+                continue
+        elif not _is_true(field.get("stored", field_type.get("stored", True))):
+            continue
+        if _is_true(field.get("multiValued", field_type.get("multiValued", False))):
+            arrow_type = pa.list_(arrow_type)
+        fields.append(pa.field(field["name"], arrow_type))
+    return pa.schema(fields)
+
+
+def _infer_schema(rows: list) -> pa.Schema:
+    # Table.from_pylist only looks at the keys of the first row
+    names = dict.fromkeys(name for row in rows for name in row)
+    return pa.Table.from_pydict(
+        {name: [row.get(name) for row in rows] for name in names}
+    ).schema
+
+
+def export_ndjson(documents: Iterable[dict], path: str) -> int:
+    """Write one JSON document per line, returns the number of documents."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for document in documents:
+            file.write(json.dumps(document, ensure_ascii=False))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def export_parquet(
+    documents: Iterable[dict],
+    path: str,
+    row_group_size: int = DEFAULT_CURSOR_BATCH_SIZE,
+    schema: Optional[pa.Schema] = None,
+) -> int:
+    """
+    Write documents to a Parquet file, one row group per ``row_group_size``
+    documents.
+
+    Fields missing from ``schema`` are inferred from the first row group. A
+    Parquet file has a single schema, so a field that first shows up in a
+    later row group raises ``ValueError`` instead of being dropped.
+    """
+    documents = iter(documents)
+    writer = None
+    count = 0
+    try:
+        while True:
+            rows = list(islice(documents, row_group_size))
+            if not rows:
+                break
+            if writer is None:
+                inferred = _infer_schema(rows)
+                if schema is None:
+                    schema = inferred
+                for field in inferred:
+                    if field.name not in schema.names:
+                        schema = schema.append(field)
+                writer = pq.ParquetWriter(path, schema)
+            else:
+                new_fields = set().union(*rows).difference(schema.names)
+                if new_fields:
+                    raise ValueError(
+                        f"Fields {sorted(new_fields)} first appear after document "
+                        f"{count} and are not in the collection schema"
+                    )
+            # Fields missing in a row become nulls
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def export_documents(
+    client,
+    path: str,
+    export_format: str = "ndjson",
+    query: str = "*:*",
+    fl=None,
+    batch_size: int = DEFAULT_CURSOR_BATCH_SIZE,
+) -> int:
+    documents = iter_documents(client, query, fl, batch_size)
+    if export_format == "parquet":
+        try:
+            schema = load_arrow_schema(client, fl)
+        except Exception as e:
+            print(f"Could not load the collection schema, inferring it: {e}")
+            schema = None
+        return export_parquet(documents, path, batch_size, schema)
+    if export_format == "ndjson":
+        return export_ndjson(documents, path)
+    raise ValueError(
+        f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}"
+    )
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description="Export a Solr collection with cursorMark")
+    parser.add_argument("output", help="Target file")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--query", default="*:*")
+    parser.add_argument("--fl", default=None, help="Comma separated field list")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_CURSOR_BATCH_SIZE)
+    return parser.parse_args()
+
+
+@with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
+def main() -> None:
+    args = parse_args()
+    client = get_solr_client(os.getenv("SOLR_URL"), os.getenv("SOLR_COLLECTION"))
+    count = export_documents(
+        client, args.output, args.format, args.query, args.fl, args.batch_size
+    )
+    print(f"Exported {count} documents to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+import pysolr
+from prometheus_client import Histogram
+
+from solr.util import get_or_create_metric
+
+DEFAULT_MAX_WORKERS = 16
+
+QUERY_LATENCY = get_or_create_metric(
+    "solr_query_latency_seconds",
+    Histogram,
+    "Latency of queries run through run_queries",
+    ["query"],
+)
+
+
+class QuerySpec(NamedTuple):
+    """A query helper from ``solr.usage.query`` and its arguments after the client."""
+
+    query: Callable[..., Any]
+    args: tuple = ()
+    kwargs: Optional[dict] = None
+    timeout: Optional[float] = None
+
+
+class QueryResult(NamedTuple):
+    value: Any
+    error: Optional[BaseException]
+    latency: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(percentile * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+class QueryBatch:
+    def __init__(self, results: List[QueryResult], wall_time: float):
+        self.results = results
+        self.wall_time = wall_time
+
+    @property
+    def values(self) -> list:
+        """Values in input order, ``None`` for failed or timed out queries."""
+        return [result.value for result in self.results]
+
+    def latency_summary(self) -> dict:
+        latencies = sorted(result.latency for result in self.results)
+        return {
+            "queries": len(self.results),
+            "failed": sum(1 for result in self.results if not result.ok),
+            "wall_time": self.wall_time,
+            "total_latency": sum(latencies),
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+
+
+class _QueryRun:
+    """When a worker picked up a query, time spent queued does not count."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.started_at: Optional[float] = None
+
+
+def _run_timed(spec: QuerySpec, client: pysolr.Solr, run: _QueryRun) -> tuple:
+    run.started_at = time.perf_counter()
+    run.started.set()
+    value = spec.query(client, *spec.args, **(spec.kwargs or {}))
+    return value, time.perf_counter() - run.started_at
+
+
+def run_queries(
+    client: pysolr.Solr,
+    specs: Sequence[QuerySpec],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[float] = None,
+) -> QueryBatch:
+    """
+    Run query helpers concurrently over the pooled client.
+
+    Results keep the input order. A query that fails or exceeds its timeout
+    (``spec.timeout``, else ``timeout``, counted from when a worker starts it,
+    not while it waits for one) is reported with its error instead of failing
+    the batch. A timed out request keeps its worker until Solr answers or
+    ``SOLR_TIMEOUT``.
+    """
+    start_time = time.perf_counter()
+    results: List[QueryResult] = []
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        submitted = []
+        for spec in specs:
+            run = _QueryRun()
+            future = executor.submit(_run_timed, spec, client, run)
+            # Also wakes up the wait below if the query never starts
+            future.add_done_callback(lambda _, run=run: run.started.set())
+            submitted.append((spec, run, future))
+
+        for spec, run, future in submitted:
+            query_timeout = spec.timeout if spec.timeout is not None else timeout
+            remaining = None
+            if query_timeout is not None:
+                run.started.wait()
+                started_at = run.started_at or time.perf_counter()
+                remaining = max(0.0, started_at + query_timeout - time.perf_counter())
+
+            name = getattr(spec.query, "__name__", "query")
+            try:
+                value, latency = future.result(timeout=remaining)
+                # Finished late, but before this loop got to it
+                if query_timeout is not None and latency > query_timeout:
+                    raise FutureTimeoutError()
+                QUERY_LATENCY.labels(query=name).observe(latency)
+                results.append(QueryResult(value, None, latency))
+            except (FutureTimeoutError, CancelledError):
+                future.cancel()
+                results.append(
+                    QueryResult(
+                        None,
+                        TimeoutError(f"{name} timed out after {query_timeout}s"),
+                        time.perf_counter() - (run.started_at or start_time),
+                    )
+                )
+            except Exception as e:
+                results.append(
+                    QueryResult(
+                        None, e, time.perf_counter() - (run.started_at or start_time)
+                    )
+                )
+    finally:
+        # Do not wait for timed out requests that are still running
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return QueryBatch(results, time.perf_counter() - start_time)
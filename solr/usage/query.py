@@ -1,11 +1,19 @@
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Sequence, Union
 
 import pysolr
 
+from solr.session import post_to_solr
 from solr.setup.security import print_ascii_title
+from solr.usage.cache import cached_query
 from solr.usage.document import get_solr_client
+from solr.usage.query_builder import SolrQuery
 from solr.util import with_env
 
+DEFAULT_CURSOR_BATCH_SIZE = 1_000
+
 
 def query_solr_collection(client: pysolr.Solr) -> str:
     results = client.search("*:*", **{"q.op": "OR", "indent": "true", "useParams": ""})
@@ -26,32 +34,27 @@ def query_solr_with_filter(client: pysolr.Solr, name: str) -> str:
     return results
 
 
+@cached_query
 def query_document_count(client: pysolr.Solr) -> int:
     results = client.search("*:*", rows=0)
     return results.hits
 
 
+@cached_query
 def query_by_age_range(client: pysolr.Solr, min_age: int, max_age: int) -> list[str]:
-    results = client.search(
-        f"age:[{min_age} TO {max_age}]", **{"q.op": "AND", "indent": "true"}
-    )
+    results = SolrQuery().range("age", min_age, max_age).search(client)
 
     return [str(result) for result in results]
 
 
+@cached_query
 def query_by_gender_and_city(client: pysolr.Solr, gender: str, city: str) -> list[str]:
-    results = client.search(
-        f"gender:{gender} AND city:{city}",
-        **{"q.op": "AND"},
-        **{
-            "indent": "true",
-            "q.op": "AND",
-        },
-    )
+    results = SolrQuery().filter("gender", gender).filter("city", city).search(client)
 
     return [str(result) for result in results]
 
 
+@cached_query
 def query_with_boosting(client: pysolr.Solr, search_term: str) -> list[str]:
     results = client.search(
         f"name:{search_term}^2 OR email:{search_term}",
@@ -60,6 +63,67 @@ def query_with_boosting(client: pysolr.Solr, search_term: str) -> list[str]:
     return [str(result) for result in results]
 
 
+def search_with_post(client: pysolr.Solr, **params) -> pysolr.Results:
+    """
+    Search with the parameters in a JSON request body instead of the URL.
+
+    Long values such as KNN vectors are neither URL-encoded (which triples
+    brackets and commas) nor limited by the maximum URL length.
+    """
+    response = post_to_solr(
+        client,
+        "select",
+        json.dumps({"params": dict(params, wt="json")}).encode("utf-8"),
+        "application/json",
+    )
+    return client.results_cls(client.decoder.decode(response))
+
+
+def iter_documents(
+    client: pysolr.Solr,
+    query: str = "*:*",
+    fl: Optional[Union[str, Sequence[str]]] = None,
+    batch_size: int = DEFAULT_CURSOR_BATCH_SIZE,
+    prefetch: bool = True,
+    **params,
+) -> Iterator[dict]:
+    """
+    Lazily yield every document matching ``query`` using ``cursorMark``.
+
+    Unlike ``start``/``rows`` paging the cost per page stays constant, so this
+    can walk the whole collection. With ``prefetch`` the next page is requested
+    in the background while the current one is consumed.
+    """
+    search_params = dict(params, rows=batch_size, sort="id asc")
+    if fl:
+        search_params["fl"] = fl if isinstance(fl, str) else ",".join(fl)
+
+    def fetch(cursor_mark: str) -> pysolr.Results:
+        return client.search(query, cursorMark=cursor_mark, **search_params)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        cursor_mark = "*"
+        page = fetch(cursor_mark)
+        while True:
+            next_cursor_mark = page.nextCursorMark
+            done = next_cursor_mark is None or next_cursor_mark == cursor_mark
+            next_page = None
+            if not done and executor is not None:
+                next_page = executor.submit(fetch, next_cursor_mark)
+
+            # Iterating Results itself would follow the cursor on its own
+            yield from page.docs
+
+            if done:
+                return
+            cursor_mark = next_cursor_mark
+            page = next_page.result() if next_page is not None else fetch(cursor_mark)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
 @with_env(required_variables=["SOLR_URL", "SOLR_COLLECTION"])
 def main() -> None:
     print_ascii_title("SOLR QUERY")
@@ -0,0 +1,68 @@
+from typing import List, Optional
+
+import pysolr
+
+# Characters with a meaning in the standard query parser, whitespace included
+SPECIAL_CHARACTERS = set('\\+-!():^[]"{}~*?|&/ \t\n')
+
+# Filters on these fields rarely repeat, caching them only evicts useful entries
+HIGH_CARDINALITY_FIELDS = {"id", "name", "email", "address", "city"}
+
+
+def escape_query_value(value) -> str:
+    """Escape a value for use in ``field:value`` clauses."""
+    return "".join(
+        f"\\{character}" if character in SPECIAL_CHARACTERS else character
+        for character in str(value)
+    )
+
+
+def _range_bound(value) -> str:
+    return "*" if value is None else escape_query_value(value)
+
+
+def _local_params(cache: bool) -> str:
+    return "" if cache else "{!cache=false}"
+
+
+class SolrQuery:
+    """
+    Builder that keeps the scoring query in ``q`` and every non-scoring
+    constraint in its own ``fq`` clause.
+
+    Each ``fq`` is cached separately in Solr's filterCache and reused across
+    queries with different ``q`` or other filters. Filters on
+    ``HIGH_CARDINALITY_FIELDS`` default to ``cache=false``.
+    """
+
+    def __init__(self, q: str = "*:*"):
+        self.q = q
+        self.filters: List[str] = []
+        self.params: dict = {}
+
+    def filter(self, field: str, value, cache: Optional[bool] = None) -> "SolrQuery":
+        if cache is None:
+            cache = field not in HIGH_CARDINALITY_FIELDS
+        self.filters.append(
+            f"{_local_params(cache)}{field}:{escape_query_value(value)}"
+        )
+        return self
+
+    def range(self, field: str, low=None, high=None, cache: bool = True) -> "SolrQuery":
+        self.filters.append(
+            f"{_local_params(cache)}{field}:[{_range_bound(low)} TO {_range_bound(high)}]"
+        )
+        return self
+
+    def param(self, name: str, value) -> "SolrQuery":
+        self.params[name] = value
+        return self
+
+    def to_params(self) -> dict:
+        params = dict(self.params)
+        if self.filters:
+            params["fq"] = list(self.filters)
+        return params
+
+    def search(self, client: pysolr.Solr, **params) -> pysolr.Results:
+        return client.search(self.q, **self.to_params(), **params)
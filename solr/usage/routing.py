@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import unquote
+
+import pysolr
+from kazoo.client import KazooClient
+
+from solr.session import get_http_session, get_shared_solr_client
+
+_C1 = 0xCC9E2D51
+_C2 = 0x1B873593
+_MASK_32 = 0xFFFFFFFF
+
+
+def _to_signed(value: int) -> int:
+    value &= _MASK_32
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _rotl32(value: int, count: int) -> int:
+    return ((value << count) | (value >> (32 - count))) & _MASK_32
+
+
+def murmurhash3_x86_32(data: bytes, seed: int = 0) -> int:
+    """MurmurHash3 x86 32 bit, returned as a signed int like Solr's ``Hash``."""
+    h1 = seed & _MASK_32
+    rounded_end = len(data) & ~3
+
+    for offset in range(0, rounded_end, 4):
+        k1 = int.from_bytes(data[offset : offset + 4], "little")
+        k1 = (k1 * _C1) & _MASK_32
+        k1 = _rotl32(k1, 15)
+        k1 = (k1 * _C2) & _MASK_32
+
+        h1 ^= k1
+        h1 = _rotl32(h1, 13)
+        h1 = (h1 * 5 + 0xE6546B64) & _MASK_32
+
+    k1 = 0
+    tail = len(data) & 3
+    if tail == 3:
+        k1 ^= data[rounded_end + 2] << 16
+    if tail >= 2:
+        k1 ^= data[rounded_end + 1] << 8
+    if tail >= 1:
+        k1 ^= data[rounded_end]
+        k1 = (k1 * _C1) & _MASK_32
+        k1 = _rotl32(k1, 15)
+        k1 = (k1 * _C2) & _MASK_32
+        h1 ^= k1
+
+    h1 ^= len(data)
+    h1 ^= h1 >> 16
+    h1 = (h1 * 0x85EBCA6B) & _MASK_32
+    h1 ^= h1 >> 13
+    h1 = (h1 * 0xC2B2AE35) & _MASK_32
+    h1 ^= h1 >> 16
+    return _to_signed(h1)
+
+
+def _hash_piece(piece: str) -> int:
+    return murmurhash3_x86_32(piece.encode("utf-8")) & _MASK_32
+
+
+def _split_bits(piece: str, default_bits: int, max_bits: int) -> tuple:
+    key, separator, bits = piece.rpartition("/")
+    if separator and bits.isdigit():
+        return key, min(int(bits), max_bits)
+    return piece, default_bits
+
+
+def composite_id_hash(doc_id: str) -> int:
+    """
+    Hash of a document ID as computed by Solr's ``compositeId`` router.
+
+    ``tenant!id`` takes the upper 16 bits from the tenant and the lower 16 bits
+    from the ID, ``a!b!id`` uses 8/8/16 bits. ``tenant/N!id`` overrides the
+    number of bits taken from the tenant.
+    """
+    pieces = doc_id.split("!")
+    if len(pieces) == 1 or len(pieces) > 3:
+        return murmurhash3_x86_32(doc_id.encode("utf-8"))
+
+    if len(pieces) == 2:
+        shard_key, bits = _split_bits(pieces[0], 16, 16)
+        mask = (_MASK_32 << (32 - bits)) & _MASK_32 if bits else 0
+        return _to_signed(
+            (_hash_piece(shard_key) & mask) | (_hash_piece(pieces[1]) & ~mask)
+        )
+
+    first_key, first_bits = _split_bits(pieces[0], 8, 8)
+    second_key, second_bits = _split_bits(pieces[1], 8, 8)
+    first_mask = (_MASK_32 << (32 - first_bits)) & _MASK_32 if first_bits else 0
+    upper_mask = (_MASK_32 << (32 - first_bits - second_bits)) & _MASK_32
+    if not first_bits + second_bits:
+        upper_mask = 0
+    second_mask = upper_mask & ~first_mask
+    return _to_signed(
+        (_hash_piece(first_key) & first_mask)
+        | (_hash_piece(second_key) & second_mask)
+        | (_hash_piece(pieces[2]) & ~upper_mask & _MASK_32)
+    )
+
+
+class Shard(NamedTuple):
+    name: str
+    range_min: int
+    range_max: int
+    leader_url: str
+
+
+def _parse_range(hash_range: str) -> tuple:
+    range_min, range_max = hash_range.split("-")
+    return _to_signed(int(range_min, 16)), _to_signed(int(range_max, 16))
+
+
+def base_url_for_node_name(node_name: str, url_scheme: str = "http") -> str:
+    """``solr1:8983_solr`` -> ``http://solr1:8983/solr``, as Solr builds it."""
+    host_and_port, _, context = node_name.partition("_")
+    return f"{url_scheme}://{host_and_port}/{unquote(context).strip('/')}"
+
+
+def _replica_base_url(replica: dict, url_scheme: str) -> str:
+    # CLUSTERSTATUS adds base_url, Solr 9 state.json only has node_name
+    if "base_url" in replica:
+        return replica["base_url"].rstrip("/")
+    return base_url_for_node_name(replica["node_name"], url_scheme)
+
+
+def parse_shards(collection_state: dict, url_scheme: str = "http") -> List[Shard]:
+    """Active shards and their leader core URLs from a collection's state."""
+    shards = []
+    for name, shard in collection_state["shards"].items():
+        if shard.get("state", "active") != "active" or not shard.get("range"):
+            continue
+        leader = next(
+            (
+                replica
+                for replica in shard["replicas"].values()
+                if replica.get("leader") == "true"
+                and replica.get("state", "active") == "active"
+            ),
+            None,
+        )
+        if leader is None:
+            raise ValueError(f"Shard {name} has no active leader")
+
+        range_min, range_max = _parse_range(shard["range"])
+        leader_url = f"{_replica_base_url(leader, url_scheme)}/{leader['core']}"
+        shards.append(Shard(name, range_min, range_max, leader_url))
+
+    if not shards:
+        raise ValueError("Collection has no active shards")
+    return shards
+
+
+def load_shards_from_cluster_status(solr_url: str, collection: str) -> List[Shard]:
+    response = get_http_session().get(
+        f"{solr_url}/admin/collections",
+        params={"action": "CLUSTERSTATUS", "collection": collection, "wt": "json"},
+    )
+    response.raise_for_status()
+    return parse_shards(response.json()["cluster"]["collections"][collection])
+
+
+def load_shards_from_zookeeper(zk_host: str, collection: str) -> List[Shard]:
+    zk = KazooClient(hosts=zk_host)
+    zk.start()
+    try:
+        data, _ = zk.get(f"/collections/{collection}/state.json")
+        url_scheme = "http"
+        if zk.exists("/clusterprops.json"):
+            cluster_properties, _ = zk.get("/clusterprops.json")
+            if cluster_properties:
+                url_scheme = json.loads(cluster_properties).get("urlScheme", "http")
+    finally:
+        zk.stop()
+    return parse_shards(json.loads(data)[collection], url_scheme)
+
+
+class ShardRouter:
+    """
+    Routes documents to the leader of the shard owning their ``compositeId``
+    hash, so Solr does not have to forward them to another node.
+
+    The cluster state is loaded once and reloaded with ``refresh`` after a
+    failed request, e.g. when a leader moved.
+    """
+
+    def __init__(self, load_shards: Callable[[], List[Shard]]):
+        self.load_shards = load_shards
+        self._lock = threading.Lock()
+        self.shards: List[Shard] = []
+        self.refresh()
+
+    @classmethod
+    def from_env(cls, solr_url: str, collection: str) -> "ShardRouter":
+        """Reads the cluster state from ZooKeeper if ``ZK_HOST`` is set."""
+        zk_host = os.getenv("ZK_HOST")
+        if zk_host:
+            return cls(lambda: load_shards_from_zookeeper(zk_host, collection))
+        return cls(lambda: load_shards_from_cluster_status(solr_url, collection))
+
+    def refresh(self) -> None:
+        shards = self.load_shards()
+        with self._lock:
+            self.shards = sorted(shards, key=lambda shard: shard.range_min)
+
+    def shard_for(self, doc_id) -> Shard:
+        doc_hash = composite_id_hash(str(doc_id))
+        with self._lock:
+            for shard in self.shards:
+                if shard.range_min <= doc_hash <= shard.range_max:
+                    return shard
+        raise ValueError(f"No shard found for document {doc_id} (hash {doc_hash})")
+
+    def partition(self, documents: list) -> Dict[str, list]:
+        """Split a batch into one sub-batch per shard."""
+        batches = defaultdict(list)
+        for document in documents:
+            batches[self.shard_for(document["id"]).name].append(document)
+        return batches
+
+    def client(self, shard_name: str) -> pysolr.Solr:
+        with self._lock:
+            leader_url = next(
+                shard.leader_url for shard in self.shards if shard.name == shard_name
+            )
+        return get_shared_solr_client(leader_url)
+
+    def add(self, add: Callable[[pysolr.Solr], object], shard_name: str) -> None:
+        try:
+            add(self.client(shard_name))
+        except (pysolr.SolrError, ConnectionError):
+            self.refresh()
+            raise
+
+
+def get_shard_router(solr_url: str, collection: str) -> Optional[ShardRouter]:
+    try:
+        return ShardRouter.from_env(solr_url, collection)
+    except Exception as e:
+        print(f"Shard routing disabled, could not load cluster state: {e}")
+        return None
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+
+class StubChannel:
+    """In-memory stand-in for a pika channel with pre-published messages."""
+
+    def __init__(self, bodies: list):
+        self.bodies = list(bodies)
+        self.acked = set()
+        self.nacked = set()
+        self.prefetch_count = None
+        self._next_tag = 1
+
+    def basic_qos(self, prefetch_count: int) -> None:
+        self.prefetch_count = prefetch_count
+
+    def consume(self, queue: str, inactivity_timeout: float = None):
+        while self.bodies:
+            yield self._deliver()
+
+    def get(self):
+        return self._deliver() if self.bodies else (None, None, None)
+
+    def basic_ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        if multiple:
+            self.acked.update(
+                tag
+                for tag in range(1, delivery_tag + 1)
+                if tag not in self.nacked and tag not in self.acked
+            )
+        else:
+            self.acked.add(delivery_tag)
+
+    def basic_nack(self, delivery_tag: int, requeue: bool = True) -> None:
+        self.nacked.add(delivery_tag)
+
+    def cancel(self) -> None:
+        self.bodies.clear()
+
+    def _deliver(self):
+        method = SimpleNamespace(delivery_tag=self._next_tag)
+        self._next_tag += 1
+        return method, None, self.bodies.pop(0)
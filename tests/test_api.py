@@ -3,7 +3,10 @@ import unittest
 from unittest.mock import patch, MagicMock
 import os
 
+import solr.importer.api as import_api
 from solr.importer.api import app
+from solr.importer.buffer import ImportBuffer
+from solr.usage.commit import CommitPolicy
 
 
 class TestImportEndpoint(unittest.TestCase):
@@ -38,7 +41,9 @@ class TestImportEndpoint(unittest.TestCase):
 
         mock_get_solr_client.assert_called_once_with("http://localhost:8983/solr", "test_collection")
         mock_solr_client.add.assert_called_once()
-        mock_solr_client.commit.assert_called_once()
+        self.assertEqual(mock_solr_client.add.call_args.kwargs["commit"], False)
+        self.assertIn("commitWithin", mock_solr_client.add.call_args.kwargs)
+        mock_solr_client.commit.assert_not_called()
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(json.loads(response.data), {"status": "OK"})
@@ -73,5 +78,110 @@ class TestImportEndpoint(unittest.TestCase):
         self.assertIn("Solr connection failed", json.loads(response.data)["error"])
 
 
+    @patch.dict(os.environ, {"SOLR_URL": "http://localhost:8983/solr", "SOLR_COLLECTION": "test_collection"})
+    def test_import_endpoint_async_mode_returns_job_status(self):
+        mock_solr_client = MagicMock()
+        import_buffer = ImportBuffer(
+            lambda: mock_solr_client, CommitPolicy("within"), flush_interval_ms=10
+        )
+
+        with patch.object(import_api, "_import_buffer", import_buffer):
+            response = self.client.post(
+                "/import?mode=async",
+                data=json.dumps(self.test_data),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 202)
+            job_id = json.loads(response.data)["job_id"]
+
+            import_buffer.get_job(job_id).done.wait(5)
+            status = self.client.get(f"/import/status/{job_id}")
+            self.assertEqual(status.status_code, 200)
+            self.assertEqual(json.loads(status.data)["status"], "done")
+
+            unknown = self.client.get("/import/status/unknown")
+            self.assertEqual(unknown.status_code, 404)
+
+        import_buffer.shutdown()
+        mock_solr_client.add.assert_called_once()
+
+    @patch.dict(os.environ, {"SOLR_URL": "http://localhost:8983/solr", "SOLR_COLLECTION": "test_collection"})
+    def test_import_endpoint_buffered_mode_waits_for_flush(self):
+        mock_solr_client = MagicMock()
+        import_buffer = ImportBuffer(
+            lambda: mock_solr_client, CommitPolicy("within"), flush_interval_ms=10
+        )
+
+        with patch.object(import_api, "_import_buffer", import_buffer):
+            response = self.client.post(
+                "/import?mode=buffered",
+                data=json.dumps(self.test_data),
+                content_type="application/json",
+            )
+
+        import_buffer.shutdown()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)["status"], "OK")
+        mock_solr_client.add.assert_called_once()
+
+    @patch("solr.importer.api.get_solr_client")
+    @patch.dict(os.environ, {"SOLR_URL": "http://localhost:8983/solr", "SOLR_COLLECTION": "test_collection"})
+    def test_import_endpoint_rejects_unknown_mode(self, mock_get_solr_client):
+        response = self.client.post(
+            "/import?mode=later",
+            data=json.dumps(self.test_data),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown import mode", json.loads(response.data)["error"])
+        mock_get_solr_client.assert_not_called()
+
+
+    @patch("solr.importer.api.get_solr_client")
+    @patch.dict(os.environ, {"SOLR_URL": "http://localhost:8983/solr", "SOLR_COLLECTION": "test_collection"})
+    def test_stream_import_endpoint_reports_errors_per_line(self, mock_get_solr_client):
+        mock_solr_client = MagicMock()
+        mock_get_solr_client.return_value = mock_solr_client
+
+        documents = [dict(self.test_data[0], id=index) for index in range(5)]
+        lines = [json.dumps(document) for document in documents]
+        lines.insert(2, json.dumps({"id": 99, "name": "Missing fields"}))
+        lines.insert(4, "{not json")
+        lines.append("")
+
+        response = self.client.post(
+            "/import/stream?batch_size=2",
+            data="\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        report = json.loads(response.data)
+        self.assertEqual(report["status"], "PARTIAL")
+        self.assertEqual(report["accepted"], 5)
+        self.assertEqual(report["rejected"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 5])
+        self.assertEqual(
+            [len(call.args[0]) for call in mock_solr_client.add.call_args_list],
+            [2, 2, 1],
+        )
+
+    @patch("solr.importer.api.get_solr_client")
+    @patch.dict(os.environ, {"SOLR_URL": "http://localhost:8983/solr", "SOLR_COLLECTION": "test_collection"})
+    def test_stream_import_endpoint_rejects_invalid_batch_size(self, mock_get_solr_client):
+        for batch_size in ["abc", "0", "-5"]:
+            with self.subTest(batch_size=batch_size):
+                response = self.client.post(
+                    f"/import/stream?batch_size={batch_size}",
+                    data=json.dumps(self.test_data[0]),
+                    content_type="application/x-ndjson",
+                )
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("Invalid batch_size", json.loads(response.data)["error"])
+        mock_get_solr_client.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import time
+import unittest
+from functools import partial
+from types import SimpleNamespace
+
+import requests
+
+from solr.bench.query import (
+    QTimeRecorder,
+    compare_with_baseline,
+    parse_mix,
+    run_load,
+    summarize,
+)
+
+
+def report(p95: float, throughput: float) -> dict:
+    return {
+        "results": {
+            "all": {"latency_ms": {"p95": p95}, "throughput": throughput},
+        }
+    }
+
+
+class TestQTimeRecorder(unittest.TestCase):
+    def test_sums_qtime_of_responses_on_this_thread(self):
+        recorder = QTimeRecorder()
+        session = requests.Session()
+        with recorder.installed(session):
+            self.assertIn(recorder, session.hooks["response"])
+            recorder.reset()
+            recorder(SimpleNamespace(content=b'{"responseHeader":{"QTime":12}}'))
+            recorder(SimpleNamespace(content=b'{"responseHeader":{"QTime": 3}}'))
+
+        self.assertAlmostEqual(recorder.qtime, 0.015)
+        self.assertNotIn(recorder, session.hooks["response"])
+
+    def test_no_response_has_no_qtime(self):
+        recorder = QTimeRecorder()
+        recorder.reset()
+        recorder(SimpleNamespace(content=b"<html>"))
+        self.assertIsNone(recorder.qtime)
+
+    def test_cached_response_has_zero_qtime(self):
+        recorder = QTimeRecorder()
+        recorder.reset()
+        recorder(SimpleNamespace(content=b'{"responseHeader":{"QTime":0}}'))
+        self.assertEqual(recorder.qtime, 0.0)
+
+        recorder.reset()
+        self.assertIsNone(recorder.qtime)
+
+
+class TestQueryBenchmark(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(
+            parse_mix(["query_by_age_range=3", "semantic_search"]),
+            {"query_by_age_range": 3.0, "semantic_search": 1.0},
+        )
+
+    def test_summarize_reports_percentiles_and_overhead(self):
+        samples = [("a", 0.010 * i, 0.002 * i, None) for i in range(1, 101)]
+        samples.append(("b", 1.0, None, "ValueError()"))
+
+        summary = summarize(samples, wall_time=2.0)
+
+        self.assertEqual(summary["a"]["requests"], 100)
+        self.assertEqual(summary["a"]["throughput"], 50.0)
+        self.assertAlmostEqual(summary["a"]["latency_ms"]["p50"], 505.0)
+        self.assertAlmostEqual(summary["a"]["latency_ms"]["p99"], 990.1)
+        self.assertAlmostEqual(summary["a"]["qtime_ms"]["p50"], 101.0)
+        self.assertAlmostEqual(summary["a"]["overhead_ms"], 404.0)
+        self.assertEqual(summary["b"]["errors"], 1)
+        self.assertIsNone(summary["b"]["latency_ms"]["p95"])
+        self.assertEqual(summary["all"]["requests"], 101)
+
+    def test_closed_loop_runs_the_mix(self):
+        calls = []
+        factories = {
+            "fast": lambda rng: partial(calls.append, "fast"),
+            "failing": lambda rng: partial(int, "not a number"),
+        }
+
+        result = run_load(
+            factories, {"fast": 1, "failing": 1}, 0.05, 2, qps=None, seed=1
+        )
+
+        self.assertGreater(result["results"]["fast"]["requests"], 0)
+        self.assertEqual(result["results"]["fast"]["errors"], 0)
+        self.assertEqual(
+            result["results"]["failing"]["errors"],
+            result["results"]["failing"]["requests"],
+        )
+
+    def test_open_loop_keeps_the_target_rate(self):
+        factories = {"sleep": lambda rng: partial(time.sleep, 0.001)}
+
+        result = run_load(factories, {"sleep": 1}, 0.5, 4, qps=100, seed=1)
+
+        self.assertAlmostEqual(result["results"]["sleep"]["requests"], 50, delta=2)
+
+    def test_compare_with_baseline(self):
+        baseline = report(p95=100.0, throughput=200.0)
+
+        self.assertEqual(compare_with_baseline(report(105.0, 190.0), baseline, 0.1), [])
+        self.assertEqual(
+            len(compare_with_baseline(report(130.0, 150.0), baseline, 0.1)), 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from solr.importer.buffer import BufferFullError, ImportBuffer
+from solr.usage.commit import CommitPolicy
+
+
+class RejectingSolrClient:
+    def __init__(self, rejected_ids: set):
+        self.rejected_ids = rejected_ids
+        self.requests = []
+
+    def add(self, documents, **kwargs):
+        self.requests.append(documents)
+        if any(document["id"] in self.rejected_ids for document in documents):
+            raise Exception("Solr rejected the batch")
+
+
+class TestImportBuffer(unittest.TestCase):
+    def test_concurrent_submissions_are_coalesced(self):
+        client = MagicMock()
+        buffer = ImportBuffer(
+            lambda: client, CommitPolicy("within"), flush_interval_ms=200
+        )
+
+        jobs = []
+        threads = [
+            threading.Thread(target=lambda i=i: jobs.append(buffer.submit([{"id": i}])))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for job in jobs:
+            self.assertTrue(job.done.wait(5))
+        buffer.shutdown()
+
+        client.add.assert_called_once()
+        self.assertEqual(len(client.add.call_args.args[0]), 20)
+        self.assertTrue(all(job.status == "done" for job in jobs))
+
+    def test_flushes_when_batch_size_is_reached(self):
+        client = MagicMock()
+        buffer = ImportBuffer(
+            lambda: client,
+            CommitPolicy("within"),
+            max_batch_size=5,
+            flush_interval_ms=60_000,
+        )
+
+        job = buffer.submit([{"id": index} for index in range(5)])
+
+        self.assertTrue(job.done.wait(5))
+        buffer.shutdown()
+
+    def test_batches_stop_at_max_batch_size(self):
+        client = MagicMock()
+        buffer = ImportBuffer(
+            lambda: client,
+            CommitPolicy("within"),
+            max_batch_size=5,
+            flush_interval_ms=60_000,
+        )
+
+        jobs = [buffer.submit([{"id": index}, {"id": -index}]) for index in range(4)]
+        buffer.shutdown(5)
+
+        self.assertTrue(all(job.status == "done" for job in jobs))
+        self.assertEqual(
+            [len(call.args[0]) for call in client.add.call_args_list], [4, 4]
+        )
+        self.assertEqual(buffer.pending_documents(), 0)
+
+    def test_client_errors_fail_the_jobs(self):
+        def broken_client_factory():
+            raise ConnectionError("Solr unreachable")
+
+        buffer = ImportBuffer(
+            broken_client_factory, CommitPolicy("within"), flush_interval_ms=10
+        )
+
+        first = buffer.submit([{"id": 1}])
+        self.assertTrue(first.done.wait(5))
+        second = buffer.submit([{"id": 2}])
+        self.assertTrue(second.done.wait(5))
+        buffer.shutdown()
+
+        self.assertEqual([first.status, second.status], ["failed", "failed"])
+        self.assertIn("unreachable", first.error)
+
+    def test_only_failing_jobs_are_marked_failed(self):
+        client = RejectingSolrClient({3})
+        buffer = ImportBuffer(
+            lambda: client, CommitPolicy("within"), flush_interval_ms=50
+        )
+
+        jobs = [buffer.submit([{"id": index}]) for index in range(5)]
+        for job in jobs:
+            self.assertTrue(job.done.wait(5))
+        buffer.shutdown()
+
+        self.assertEqual(
+            [job.status for job in jobs], ["done", "done", "done", "failed", "done"]
+        )
+        self.assertIn("rejected", jobs[3].error)
+
+    def test_rejects_submissions_when_full(self):
+        buffer = ImportBuffer(
+            MagicMock,
+            CommitPolicy("within"),
+            flush_interval_ms=60_000,
+            max_buffered_documents=2,
+        )
+
+        buffer.submit([{"id": 1}])
+        with self.assertRaises(BufferFullError):
+            buffer.submit([{"id": 2}, {"id": 3}])
+        buffer.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import redis
+from prometheus_client import REGISTRY
+
+from solr.usage.cache import (
+    MemoryQueryCache,
+    RedisQueryCache,
+    cached_query,
+    create_query_cache_from_env,
+    set_query_cache,
+)
+from solr.usage.cleanup import delete_all_documents
+from solr.usage.commit import CommitPolicy
+from solr.usage.query import query_by_age_range, query_document_count
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """Enough of redis.Redis for the cache, TTLs are ignored."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, px=None):
+        self.values[key] = value.encode("utf-8")
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode("utf-8")
+
+
+def make_client(hits: int = 42) -> MagicMock:
+    client = MagicMock()
+    client.url = "http://solr/people"
+    client.search.return_value.hits = hits
+    return client
+
+
+class TestMemoryQueryCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = MemoryQueryCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(cache.get("b"), 2)
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = MemoryQueryCache(ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 5.0
+        self.assertIsNot(cache.get("a"), 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestCachedQueries(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryQueryCache()
+        set_query_cache(self.cache)
+        self.addCleanup(set_query_cache, None)
+
+    def test_identical_queries_hit_the_cache(self):
+        client = make_client()
+        before = (
+            REGISTRY.get_sample_value(
+                "solr_query_cache_hits_total", {"query": "query_document_count"}
+            )
+            or 0
+        )
+
+        self.assertEqual(query_document_count(client), 42)
+        self.assertEqual(query_document_count(client), 42)
+
+        client.search.assert_called_once()
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "solr_query_cache_hits_total", {"query": "query_document_count"}
+            ),
+            before + 1,
+        )
+
+    def test_arguments_are_part_of_the_key(self):
+        client = make_client()
+        client.search.return_value = [{"id": 1}]
+
+        query_by_age_range(client, 18, 30)
+        query_by_age_range(client, 18, 40)
+        query_by_age_range(client, 18, 30)
+
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_commit_invalidates_cached_results(self):
+        client = make_client()
+        query_document_count(client)
+
+        policy = CommitPolicy("hard")
+        policy.add(client, [{"id": 1}])
+        self.assertEqual(len(self.cache), 1)
+        policy.finish(client)
+
+        self.assertEqual(len(self.cache), 0)
+        query_document_count(client)
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_commit_within_invalidates_again_after_solr_committed(self):
+        client = make_client()
+        policy = CommitPolicy("within", commit_within_ms=50)
+        policy.add(client, [{"id": 1}])
+
+        # Cached before Solr made the add visible
+        query_document_count(client)
+        self.assertEqual(len(self.cache), 1)
+
+        deadline = time.monotonic() + 2
+        while len(self.cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.cache), 0)
+
+    @patch("solr.usage.cleanup.get_solr_client")
+    def test_delete_all_documents_invalidates_cached_results(self, get_client):
+        client = make_client()
+        get_client.return_value = client
+        query_document_count(client)
+
+        delete_all_documents("http://solr", "people")
+
+        client.delete.assert_called_once_with(q="*:*", commit=True)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_disabled_cache_always_queries(self):
+        set_query_cache(None)
+        client = make_client()
+
+        query_document_count(client)
+        query_document_count(client)
+
+        self.assertEqual(client.search.call_count, 2)
+
+
+class TestQueryCacheFromEnv(unittest.TestCase):
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ):
+            os.environ.pop("QUERY_CACHE_BACKEND", None)
+            self.assertIsNone(create_query_cache_from_env())
+
+        with patch.dict(os.environ, {"QUERY_CACHE_BACKEND": "memory"}):
+            self.assertIsInstance(create_query_cache_from_env(), MemoryQueryCache)
+
+
+class TestRedisQueryCache(unittest.TestCase):
+    def test_invalidation_is_shared_between_workers(self):
+        shared = FakeRedis()
+        first_worker = RedisQueryCache(shared)
+        second_worker = RedisQueryCache(shared)
+
+        first_worker.set("count", 42)
+        self.assertEqual(second_worker.get("count"), 42)
+
+        second_worker.invalidate()
+        self.assertIsNot(first_worker.get("count"), 42)
+
+    def test_cached_query_falls_back_without_redis(self):
+        broken = MagicMock()
+        broken.get.side_effect = redis.ConnectionError("down")
+        set_query_cache(RedisQueryCache(broken))
+        self.addCleanup(set_query_cache, None)
+        query = cached_query(lambda client: client.search("*:*").hits)
+
+        self.assertEqual(query(make_client(7)), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
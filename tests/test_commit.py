@@ -0,0 +1,139 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import cbor2
+import pysolr
+import requests
+
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import create_documents, generate_update_body
+
+
+def sequential_documents(start: int, size: int) -> list:
+    return [{"id": i} for i in range(start, start + size)]
+
+
+def fake_session() -> MagicMock:
+    session = MagicMock(spec=requests.Session)
+    session.post.return_value.status_code = 200
+    session.post.return_value.text = "{}"
+    return session
+
+
+class TestCommitPolicy(unittest.TestCase):
+    def test_within_passes_commit_within_and_never_commits(self):
+        client = MagicMock()
+        policy = CommitPolicy("within", commit_within_ms=500)
+
+        policy.add(client, [{"id": 1}])
+        policy.finish(client)
+
+        client.add.assert_called_once_with([{"id": 1}], commit=False, commitWithin=500)
+        client.commit.assert_not_called()
+
+    def test_hard_commits_once_at_the_end(self):
+        client = MagicMock()
+        policy = CommitPolicy("hard")
+
+        for index in range(5):
+            policy.add(client, [{"id": index}])
+        client.commit.assert_not_called()
+
+        policy.finish(client)
+        client.commit.assert_called_once_with()
+
+    def test_soft_commits_every_n_documents(self):
+        client = MagicMock()
+        policy = CommitPolicy("soft", soft_commit_docs=10, soft_commit_seconds=None)
+
+        for index in range(25):
+            policy.add(client, [{"id": index}])
+        self.assertEqual(client.commit.call_count, 2)
+
+        policy.finish(client)
+        self.assertEqual(client.commit.call_count, 3)
+        client.commit.assert_called_with(softCommit=True)
+
+    def test_always_commits_with_every_add(self):
+        client = MagicMock()
+        CommitPolicy("always").add(client, [{"id": 1}])
+
+        client.add.assert_called_once_with([{"id": 1}], commit=True)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CommitPolicy("sometimes")
+
+
+class TestUpdateFormat(unittest.TestCase):
+    def setUp(self):
+        self.session = fake_session()
+        patcher = patch("solr.session.get_http_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cbor_posts_binary_body_to_cbor_handler(self):
+        client = MagicMock(url="http://solr/people", timeout=60)
+        policy = CommitPolicy("within", commit_within_ms=500, update_format="cbor")
+
+        policy.add(client, [{"id": 1, "name": "Müller"}])
+
+        client.add.assert_not_called()
+        (url,) = self.session.post.call_args.args
+        kwargs = self.session.post.call_args.kwargs
+        self.assertEqual(url, "http://solr/people/update/cbor")
+        self.assertEqual(kwargs["params"], {"commitWithin": "500"})
+        self.assertEqual(kwargs["headers"], {"Content-Type": "application/cbor"})
+        self.assertEqual(kwargs["timeout"], 60)
+        self.assertEqual(cbor2.loads(kwargs["data"]), [{"id": 1, "name": "Müller"}])
+
+    def test_error_response_raises_solr_error(self):
+        self.session.post.return_value.status_code = 400
+        client = MagicMock(url="http://solr/people")
+
+        with self.assertRaises(pysolr.SolrError):
+            CommitPolicy("none", update_format="cbor").add(client, [{"id": 1}])
+
+    def test_worker_update_body_in_cbor(self):
+        client = MagicMock(url="http://solr/people")
+        update_body = generate_update_body(
+            1,
+            10,
+            generator=sequential_documents,
+            update_format="cbor",
+        )
+
+        CommitPolicy("none").add_update_body(
+            client, update_body.body, update_body.document_count, "cbor"
+        )
+
+        body = self.session.post.call_args.kwargs["data"]
+        self.assertEqual([doc["id"] for doc in cbor2.loads(body)], list(range(1, 11)))
+
+    @patch("solr.usage.document.get_solr_client", return_value=MagicMock())
+    @patch("solr.usage.document.stream_documents")
+    def test_create_documents_reads_policy_from_env(self, stream, _):
+        with patch.dict(os.environ, {"SOLR_UPDATE_FORMAT": "cbor"}):
+            os.environ.pop("SOLR_COMMIT_POLICY", None)
+            create_documents("http://solr", "people", 10, 10, streaming=True)
+
+        policy = stream.call_args.kwargs["commit_policy"]
+        self.assertEqual(policy.mode, "hard")
+        self.assertEqual(policy.update_format, "cbor")
+
+    @patch("solr.usage.document.get_solr_client", return_value=MagicMock())
+    @patch("solr.usage.document.stream_documents")
+    def test_create_documents_passes_trusted_to_the_generator(self, stream, _):
+        create_documents("http://solr", "people", 10, 10, streaming=True, trusted=True)
+
+        generator = stream.call_args.args[3]
+        self.assertEqual(generator.keywords, {"trusted": True})
+
+    def test_unknown_update_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CommitPolicy(update_format="javabin")
+
+
+if __name__ == "__main__":
+    unittest.main()
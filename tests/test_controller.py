@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+
+from solr.usage.controller import AdaptiveController
+from solr.usage.document import add_documents_to_solr
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulated_latency(batch_size: int, concurrency: int, capacity: int) -> float:
+    """Solr with a fixed throughput: requests queue up once it is saturated."""
+    load = batch_size * concurrency
+    return 0.1 + load / capacity
+
+
+class ThreadSafeSolrClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add(self, documents, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+            self.batches.append(list(documents))
+
+
+class TestAdaptiveController(unittest.TestCase):
+    def simulate(self, controller, clock, capacity, steps=500):
+        for _ in range(steps):
+            latency = simulated_latency(
+                controller.batch_size, controller.concurrency, capacity
+            )
+            clock.now += latency
+            controller.record(latency, success=latency < 5.0)
+
+    def test_grows_while_solr_is_fast(self):
+        clock = FakeClock()
+        controller = AdaptiveController(
+            initial_batch_size=1_000, initial_concurrency=1, clock=clock
+        )
+
+        self.simulate(controller, clock, capacity=10**9, steps=400)
+
+        self.assertEqual(controller.batch_size, controller.max_batch_size)
+        self.assertEqual(controller.concurrency, controller.max_concurrency)
+
+    def test_halves_on_error_once_per_cooldown(self):
+        clock = FakeClock()
+        controller = AdaptiveController(
+            initial_batch_size=8_000, initial_concurrency=8, cooldown=1.0, clock=clock
+        )
+
+        controller.record(0.1, success=False)
+        # Failures of requests that were already in flight count only once
+        controller.record(0.1, success=False)
+        self.assertEqual((controller.batch_size, controller.concurrency), (4_000, 4))
+
+        clock.now += 1.0
+        controller.record(3.0, success=True)
+        self.assertEqual((controller.batch_size, controller.concurrency), (2_000, 2))
+
+    def test_respects_lower_bounds(self):
+        clock = FakeClock()
+        controller = AdaptiveController(
+            initial_batch_size=1_000, initial_concurrency=2, cooldown=0, clock=clock
+        )
+
+        for _ in range(10):
+            controller.record(10.0, success=False)
+
+        self.assertEqual(controller.batch_size, controller.min_batch_size)
+        self.assertEqual(controller.concurrency, controller.min_concurrency)
+
+    def test_converges_near_target_latency(self):
+        clock = FakeClock()
+        controller = AdaptiveController(target_latency=2.0, cooldown=1.0, clock=clock)
+        capacity = 100_000  # documents per second
+
+        self.simulate(controller, clock, capacity, steps=500)
+
+        latencies = []
+        for _ in range(200):
+            latency = simulated_latency(
+                controller.batch_size, controller.concurrency, capacity
+            )
+            latencies.append(latency)
+            clock.now += latency
+            controller.record(latency, success=True)
+
+        average = sum(latencies) / len(latencies)
+        self.assertLess(average, 2.0 * 1.5)
+        self.assertGreater(average, 2.0 / 4)
+        self.assertLess(max(latencies), 2.0 * 3)
+
+    def test_slot_limits_in_flight_requests(self):
+        controller = AdaptiveController(
+            initial_concurrency=2, increase_after=10**6, target_latency=60
+        )
+        client = ThreadSafeSolrClient(latency=0.02)
+
+        threads = [
+            threading.Thread(target=controller.run, args=(lambda: client.add([]),))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(client.batches), 8)
+        self.assertLessEqual(client.max_in_flight, 2)
+
+    def test_add_documents_uses_controller_batch_size(self):
+        controller = AdaptiveController(
+            initial_batch_size=500,
+            min_batch_size=100,
+            batch_size_step=100,
+            increase_after=1,
+            target_latency=60,
+        )
+        client = ThreadSafeSolrClient(latency=0.001)
+        documents = [{"id": str(index)} for index in range(5_000)]
+
+        add_documents_to_solr(client, documents, 1, controller=controller)
+
+        sizes = [len(batch) for batch in client.batches]
+        self.assertEqual(sum(sizes), len(documents))
+        self.assertEqual(sizes[:3], [500, 600, 700])
+        self.assertEqual(
+            [doc["id"] for batch in client.batches for doc in batch],
+            [doc["id"] for doc in documents],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,328 @@
+import json
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from pydantic import ValidationError
+
+from solr.usage.checkpoint import CheckpointLedger
+from solr.usage.document import (
+    SolrDocument,
+    generate_documents,
+    generate_documents_columnar,
+    generate_shared_update_body,
+    get_worker_function,
+    pre_generate_columns,
+    stream_documents,
+    validate_document_columns,
+    validate_documents,
+    validate_documents_json,
+)
+
+
+class CountingSolrClient:
+    url = "http://solr/people"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def add(self, documents, **kwargs):
+        with self.lock:
+            self.count += len(documents)
+
+
+class RecordingSolrClient:
+    def __init__(self, failing_id=None):
+        self.lock = threading.Lock()
+        self.ids = set()
+        self.failing_id = failing_id
+
+    def add(self, documents, **kwargs):
+        ids = {doc["id"] for doc in documents}
+        if self.failing_id in ids:
+            raise RuntimeError("Solr rejected the batch")
+        with self.lock:
+            self.ids |= ids
+
+
+class FailingSolrClient:
+    url = "http://solr/people"
+
+    def add(self, documents, **kwargs):
+        raise RuntimeError("Solr rejected the batch")
+
+
+class ForwardingSession:
+    """HTTP session that hands posted update bodies to a fake client's ``add``."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def post(self, url, data=None, **kwargs):
+        self.client.add(json.loads(data))
+        return SimpleNamespace(status_code=200, text="{}")
+
+
+def generate_or_fail(start_index: int, chunk_size: int, failing_start: int):
+    if start_index == failing_start:
+        raise RuntimeError("Worker crashed")
+    return generate_shared_update_body(
+        start_index,
+        chunk_size,
+        partial(generate_documents_columnar, vocabulary_size=50),
+    )
+
+
+def shared_memory_blocks() -> set:
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+class TestColumnarDocumentGenerator(unittest.TestCase):
+    vocabulary_size = 50
+
+    def test_generates_valid_documents_with_sequential_ids(self):
+        documents = generate_documents_columnar(
+            10, 200, vocabulary_size=self.vocabulary_size
+        )
+
+        self.assertEqual(len(documents), 200)
+        self.assertEqual([doc["id"] for doc in documents], list(range(10, 210)))
+        for document in documents[:20]:
+            self.assertEqual(SolrDocument(**document).model_dump(), document)
+            self.assertEqual(document["search_for"], document["gender"])
+
+    def test_rejects_out_of_bounds_age_column(self):
+        columns = pre_generate_columns(
+            100, self.vocabulary_size, np.random.default_rng(1)
+        )
+        columns["age"][0] = 99
+
+        with self.assertRaises(ValueError):
+            validate_document_columns(columns)
+
+    def test_rejects_invalid_email_column(self):
+        columns = pre_generate_columns(
+            100, self.vocabulary_size, np.random.default_rng(1)
+        )
+        columns["email"][0] = "not-an-email"
+
+        with self.assertRaises(ValueError):
+            validate_document_columns(columns)
+
+
+class TestBatchValidation(unittest.TestCase):
+    def setUp(self):
+        self.documents = generate_documents_columnar(1, 20, vocabulary_size=50)
+
+    def test_batch_validation_matches_per_object_validation(self):
+        expected = [SolrDocument(**doc).model_dump() for doc in self.documents]
+
+        self.assertEqual(validate_documents(self.documents), expected)
+        self.assertEqual(
+            validate_documents_json(json.dumps(self.documents).encode("utf-8")),
+            expected,
+        )
+
+    def test_cached_email_check_rejects_invalid_emails(self):
+        invalid = dict(self.documents[0], email="not-an-email")
+
+        with self.assertRaises(ValidationError):
+            validate_documents([invalid])
+        with self.assertRaises(ValueError):
+            SolrDocument.cast_to_email_str("not-an-email")
+
+    def test_trusted_generator_produces_valid_documents(self):
+        documents = generate_documents(1, 5, trusted=True)
+
+        self.assertEqual(validate_documents(documents), documents)
+
+    def test_trusted_worker_skips_column_validation(self):
+        worker = get_worker_function(
+            partial(generate_documents_columnar, vocabulary_size=50),
+            "documents",
+            trusted=True,
+        )
+
+        with patch("solr.usage.document.validate_document_columns") as validate:
+            documents = worker(1, 5)
+
+        validate.assert_not_called()
+        self.assertEqual(validate_documents(documents), documents)
+
+
+class TestStreamingDocuments(unittest.TestCase):
+    chunk_size = 1_000
+    generator = partial(generate_documents_columnar, vocabulary_size=50)
+
+    def stream_and_measure_peak(self, number_of_documents: int) -> int:
+        client = CountingSolrClient()
+        tracemalloc.start()
+        try:
+            stream_documents(
+                client,
+                number_of_documents,
+                self.chunk_size,
+                self.generator,
+                max_processes=2,
+                indexing_threads=2,
+                max_pending_batches=2,
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(client.count, number_of_documents)
+        return peak
+
+    def test_memory_ceiling_is_independent_of_number_of_documents(self):
+        small_peak = self.stream_and_measure_peak(10 * self.chunk_size)
+        large_peak = self.stream_and_measure_peak(60 * self.chunk_size)
+
+        # 6x more documents must not move the peak beyond thread timing noise,
+        # an unbounded queue would grow it about 6x
+        self.assertLess(large_peak, small_peak * 2)
+
+    def test_serialized_transports_index_every_document(self):
+        for transport in ["json", "shm"]:
+            with self.subTest(transport=transport):
+                client = CountingSolrClient()
+                with patch(
+                    "solr.session.get_http_session",
+                    return_value=ForwardingSession(client),
+                ):
+                    stream_documents(
+                        client,
+                        5 * self.chunk_size,
+                        self.chunk_size,
+                        get_worker_function(self.generator, transport),
+                        max_processes=2,
+                        indexing_threads=2,
+                        max_pending_batches=2,
+                    )
+
+                self.assertEqual(client.count, 5 * self.chunk_size)
+
+    def test_indexing_error_is_raised(self):
+        with self.assertRaises(RuntimeError):
+            stream_documents(
+                FailingSolrClient(),
+                10 * self.chunk_size,
+                self.chunk_size,
+                self.generator,
+                max_processes=2,
+                indexing_threads=2,
+                max_pending_batches=2,
+            )
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    @patch(
+        "solr.session.get_http_session",
+        return_value=ForwardingSession(FailingSolrClient()),
+    )
+    def test_indexing_error_frees_shared_memory(self, _):
+        before = shared_memory_blocks()
+
+        with self.assertRaises(RuntimeError):
+            stream_documents(
+                FailingSolrClient(),
+                20 * self.chunk_size,
+                self.chunk_size,
+                get_worker_function(self.generator, "shm"),
+                max_processes=2,
+                indexing_threads=2,
+                max_pending_batches=4,
+            )
+
+        self.assertEqual(shared_memory_blocks() - before, set())
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    def test_generation_error_frees_shared_memory(self):
+        before = shared_memory_blocks()
+
+        with self.assertRaisesRegex(RuntimeError, "Worker crashed"):
+            stream_documents(
+                CountingSolrClient(),
+                20 * self.chunk_size,
+                self.chunk_size,
+                partial(generate_or_fail, failing_start=3 * self.chunk_size + 1),
+                max_processes=4,
+                indexing_threads=2,
+                max_pending_batches=4,
+            )
+
+        self.assertEqual(shared_memory_blocks() - before, set())
+
+
+class TestCheckpointedLoad(unittest.TestCase):
+    chunk_size = 500
+    number_of_documents = 10 * chunk_size
+    generator = partial(generate_documents_columnar, vocabulary_size=50)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "checkpoint.db")
+
+    def stream(self, client, resume: bool) -> None:
+        checkpoint = CheckpointLedger(self.path)
+        try:
+            checkpoint.start_run("people", self.chunk_size, resume)
+            stream_documents(
+                client,
+                self.number_of_documents,
+                self.chunk_size,
+                self.generator,
+                max_processes=2,
+                indexing_threads=1,
+                max_pending_batches=2,
+                checkpoint=checkpoint,
+            )
+        finally:
+            checkpoint.close()
+
+    def test_resume_only_indexes_missing_chunks(self):
+        failed_run = RecordingSolrClient(failing_id=6 * self.chunk_size + 1)
+        with self.assertRaises(RuntimeError):
+            self.stream(failed_run, resume=False)
+
+        checkpoint = CheckpointLedger(self.path)
+        completed = checkpoint.completed_chunks()
+        checkpoint.close()
+        self.assertTrue(completed)
+        self.assertNotIn(6 * self.chunk_size + 1, completed)
+
+        resumed_run = RecordingSolrClient()
+        self.stream(resumed_run, resume=True)
+
+        self.assertFalse(failed_run.ids & resumed_run.ids)
+        self.assertEqual(
+            failed_run.ids | resumed_run.ids,
+            set(range(1, self.number_of_documents + 1)),
+        )
+
+    def test_without_resume_starts_over(self):
+        self.stream(RecordingSolrClient(), resume=False)
+
+        client = RecordingSolrClient()
+        self.stream(client, resume=False)
+
+        self.assertEqual(len(client.ids), self.number_of_documents)
+
+    def test_resume_rejects_different_chunk_size(self):
+        checkpoint = CheckpointLedger(self.path)
+        self.addCleanup(checkpoint.close)
+        checkpoint.start_run("people", 500, resume=False)
+
+        with self.assertRaises(ValueError):
+            checkpoint.start_run("people", 1_000, resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from solr.ltr.embedding import (
+    EMPTY_TEXT,
+    BatchEmbedder,
+    document_text,
+    load_text_fields,
+    reindex_embeddings,
+    stream_embedded_documents,
+)
+from solr.usage.commit import CommitPolicy
+
+
+class FakeModel:
+    """Encodes a text as [length, number of words], records the call sizes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, pool=None, batch_size=32, show_progress_bar=None):
+        self.calls.append((len(texts), batch_size))
+        return np.array(
+            [[len(text), len(text.split())] for text in texts], dtype=np.float32
+        )
+
+
+class RecordingSolrClient:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.documents = []
+
+    def add(self, documents, **kwargs):
+        with self.lock:
+            self.documents.extend(documents)
+
+    def commit(self, **kwargs):
+        pass
+
+    def search(self, query, cursorMark, rows, **params):
+        # Two stored pages, then the cursor stops moving
+        stored = {
+            "*": ([{"id": "1", "name": "Ann", "_version_": 7}], "a"),
+            "a": ([{"id": "2", "name": "Bob", "vector_field": [0.0, 0.0]}], "b"),
+            "b": ([], "b"),
+        }
+        docs, next_cursor_mark = stored[cursorMark]
+        return SimpleNamespace(
+            docs=[dict(d) for d in docs], nextCursorMark=next_cursor_mark
+        )
+
+
+def generate(start: int, size: int) -> list:
+    return [{"id": str(i), "name": f"Person {i}"} for i in range(start, start + size)]
+
+
+class TestBatchEmbedder(unittest.TestCase):
+    def test_text_fields_skip_vector_fields(self):
+        fields = load_text_fields()
+
+        self.assertIn("name", fields)
+        self.assertNotIn("vector_field", fields)
+        self.assertIs(load_text_fields(), fields)
+
+    def test_document_text(self):
+        self.assertEqual(
+            document_text({"name": "Ann", "city": "Rome", "x": 1}, ("name", "city")),
+            "Ann Rome",
+        )
+        self.assertEqual(document_text({"id": "1"}, ("name",)), EMPTY_TEXT)
+
+    def test_embeds_all_documents_with_one_encode_call(self):
+        model = FakeModel()
+        documents = generate(1, 1000)
+
+        BatchEmbedder(model, batch_size=128, fields=("name",)).embed(documents)
+
+        self.assertEqual(model.calls, [(1000, 128)])
+        self.assertEqual(documents[0]["vector_field"], [8.0, 2.0])
+        self.assertTrue(all(len(d["vector_field"]) == 2 for d in documents))
+
+
+class TestStreamEmbeddedDocuments(unittest.TestCase):
+    def test_indexes_every_chunk_with_vectors(self):
+        model = FakeModel()
+        client = RecordingSolrClient()
+
+        stream_embedded_documents(
+            client,
+            2_500,
+            BatchEmbedder(model, fields=("name",)),
+            chunk_size=1_000,
+            generator=generate,
+            commit_policy=CommitPolicy("none"),
+            max_pending_chunks=1,
+        )
+
+        self.assertEqual([size for size, _ in model.calls], [1000, 1000, 500])
+        self.assertEqual(
+            sorted(int(d["id"]) for d in client.documents), list(range(1, 2501))
+        )
+        self.assertTrue(all("vector_field" in d for d in client.documents))
+
+    def test_reindex_re_embeds_stored_documents(self):
+        client = RecordingSolrClient()
+
+        count = reindex_embeddings(
+            client,
+            BatchEmbedder(FakeModel(), fields=("name",)),
+            chunk_size=1,
+            commit_policy=CommitPolicy("none"),
+        )
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sorted(client.documents, key=lambda d: d["id"]),
+            [
+                {"id": "1", "name": "Ann", "vector_field": [3.0, 1.0]},
+                {"id": "2", "name": "Bob", "vector_field": [3.0, 1.0]},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from solr.ltr.embedding import BatchEmbedder
+from solr.ltr.embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, pool=None, batch_size=32, show_progress_bar=None):
+        self.encoded.extend(texts)
+        return np.array([[len(text), 1.0, 2.0] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def open_cache(self, max_entries=100, model="test/model"):
+        cache = EmbeddingCache(self.directory, model, 3, max_entries)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_round_trip_survives_reopening(self):
+        cache = self.open_cache()
+        cache.put_many(["a", "bb"], np.array([[1, 2, 3], [4, 5, 6]], np.float32))
+        cache.close()
+
+        embeddings, missing = self.open_cache().get_many(["bb", "c", "a"])
+
+        self.assertEqual(missing, [1])
+        np.testing.assert_array_equal(embeddings, [[4, 5, 6], [0, 0, 0], [1, 2, 3]])
+
+    def test_evicts_least_recently_used(self):
+        cache = self.open_cache(max_entries=3)
+        for text in ["a", "b", "c"]:
+            cache.put_many([text], np.ones((1, 3), np.float32))
+        cache.get_many(["a"])
+
+        cache.put_many(["d"], np.full((1, 3), 7, np.float32))
+
+        _, missing = cache.get_many(["a", "b", "c", "d"])
+        self.assertEqual(missing, [1])
+        self.assertEqual(len(cache), 3)
+
+    def test_rejects_a_different_layout(self):
+        self.open_cache(max_entries=10).close()
+        with self.assertRaises(ValueError):
+            EmbeddingCache(self.directory, "test/model", 4, 10)
+
+    def test_grows_on_reopening(self):
+        cache = self.open_cache(max_entries=2)
+        cache.put_many(["a", "b"], np.array([[1, 1, 1], [2, 2, 2]], np.float32))
+        cache.close()
+
+        cache = self.open_cache(max_entries=4)
+        cache.put_many(["c", "d"], np.array([[3, 3, 3], [4, 4, 4]], np.float32))
+
+        embeddings, missing = cache.get_many(["a", "b", "c", "d"])
+        self.assertEqual(missing, [])
+        np.testing.assert_array_equal(embeddings[:, 0], [1, 2, 3, 4])
+
+    def test_shrinking_keeps_most_recently_used(self):
+        cache = self.open_cache(max_entries=4)
+        for value, text in enumerate(["a", "b", "c", "d"], start=1):
+            cache.put_many([text], np.full((1, 3), value, np.float32))
+        cache.get_many(["d"])
+        cache.get_many(["a"])
+        cache.close()
+
+        cache = self.open_cache(max_entries=2)
+
+        embeddings, missing = cache.get_many(["a", "b", "c", "d"])
+        self.assertEqual(missing, [1, 2])
+        np.testing.assert_array_equal(embeddings[:, 0], [1, 0, 0, 4])
+        self.assertEqual(len(cache), 2)
+
+    def test_embedder_only_encodes_misses(self):
+        model = CountingModel()
+        embedder = BatchEmbedder(model, fields=("name",), cache=self.open_cache())
+        before = (
+            REGISTRY.get_sample_value(
+                "solr_embedding_cache_hits_total", {"model": "test/model"}
+            )
+            or 0
+        )
+
+        embedder.embed([{"name": "Ann"}, {"name": "Bob"}])
+        documents = embedder.embed([{"name": "Ann"}, {"name": "Carla"}])
+
+        self.assertEqual(model.encoded, ["Ann", "Bob", "Carla"])
+        self.assertEqual(documents[0]["vector_field"], [3.0, 1.0, 2.0])
+        self.assertEqual(documents[1]["vector_field"], [5.0, 1.0, 2.0])
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "solr_embedding_cache_hits_total", {"model": "test/model"}
+            ),
+            before + 1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pysolr
+
+from solr.usage.export import export_documents, export_parquet, load_arrow_schema
+from solr.usage.query import iter_documents
+
+
+class CursorSolrClient:
+    """Serves ``number_of_documents`` sorted by id through cursorMark paging."""
+
+    def __init__(self, number_of_documents: int):
+        self.documents = [
+            {"id": str(index).zfill(6), "age": 18 + index % 60}
+            for index in range(number_of_documents)
+        ]
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def search(self, query, **params):
+        with self.lock:
+            self.requests.append(params)
+        start = 0 if params["cursorMark"] == "*" else int(params["cursorMark"])
+        docs = self.documents[start : start + params["rows"]]
+        if params.get("fl"):
+            fields = params["fl"].split(",")
+            docs = [{key: doc[key] for key in fields} for doc in docs]
+        # Solr returns the same cursor once the end is reached
+        next_cursor = str(start + len(docs)) if docs else params["cursorMark"]
+        return pysolr.Results(
+            {
+                "response": {"docs": docs, "numFound": len(self.documents)},
+                "nextCursorMark": next_cursor,
+            }
+        )
+
+
+class TestIterDocuments(unittest.TestCase):
+    def test_walks_all_pages_sorted_by_id(self):
+        client = CursorSolrClient(2_500)
+
+        documents = list(iter_documents(client, batch_size=1_000))
+
+        self.assertEqual(documents, client.documents)
+        self.assertTrue(all(r["sort"] == "id asc" for r in client.requests))
+        self.assertEqual(
+            [r["cursorMark"] for r in client.requests], ["*", "1000", "2000", "2500"]
+        )
+
+    def test_yields_lazily_and_prefetches_the_next_page(self):
+        client = CursorSolrClient(2_500)
+        documents = iter_documents(client, batch_size=1_000, fl=["id"])
+
+        self.assertEqual(next(documents), {"id": "000000"})
+        # The second page is requested while the first one is consumed
+        for _ in range(100):
+            with client.lock:
+                if len(client.requests) == 2:
+                    break
+            threading.Event().wait(0.01)
+        self.assertEqual(len(client.requests), 2)
+        self.assertEqual(client.requests[0]["fl"], "id")
+        documents.close()
+
+    def test_without_prefetch(self):
+        client = CursorSolrClient(10)
+
+        documents = iter_documents(client, batch_size=3, prefetch=False)
+
+        self.assertEqual(len(list(documents)), 10)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_ndjson_export(self):
+        client = CursorSolrClient(1_234)
+        path = os.path.join(self.directory, "export.ndjson")
+
+        count = export_documents(client, path, "ndjson", batch_size=500)
+
+        with open(path, encoding="utf-8") as file:
+            exported = [json.loads(line) for line in file]
+        self.assertEqual(count, 1_234)
+        self.assertEqual(exported, client.documents)
+
+    def test_parquet_export(self):
+        client = CursorSolrClient(1_234)
+        path = os.path.join(self.directory, "export.parquet")
+
+        count = export_documents(client, path, "parquet", batch_size=500)
+
+        parquet_file = pq.ParquetFile(path)
+        self.assertEqual(count, 1_234)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(parquet_file.read().to_pylist(), client.documents)
+
+    def test_parquet_keeps_fields_of_later_rows_in_first_row_group(self):
+        path = os.path.join(self.directory, "export.parquet")
+        documents = [{"id": "1"}, {"id": "2", "city": "Berlin"}]
+
+        export_parquet(documents, path, row_group_size=10)
+
+        self.assertEqual(
+            pq.read_table(path).to_pylist(),
+            [{"id": "1", "city": None}, {"id": "2", "city": "Berlin"}],
+        )
+
+    def test_parquet_rejects_new_field_in_later_row_group(self):
+        path = os.path.join(self.directory, "export.parquet")
+        documents = [{"id": "1"}, {"id": "2"}, {"id": "3", "city": "Berlin"}]
+
+        with self.assertRaisesRegex(ValueError, "city"):
+            export_parquet(documents, path, row_group_size=2)
+
+    def test_parquet_uses_collection_schema_for_later_fields(self):
+        path = os.path.join(self.directory, "export.parquet")
+        documents = [{"id": "1"}, {"id": "2"}, {"id": "3", "age": 30}]
+        schema = pa.schema([("id", pa.string()), ("age", pa.int32())])
+
+        export_parquet(documents, path, row_group_size=2, schema=schema)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.schema, schema)
+        self.assertEqual(table.column("age").to_pylist(), [None, None, 30])
+
+
+class TestLoadArrowSchema(unittest.TestCase):
+    @patch("solr.usage.export.get_http_session")
+    def test_maps_stored_solr_fields_to_arrow_types(self, get_http_session):
+        get_http_session.return_value.get.return_value.json.return_value = {
+            "schema": {
+                "fieldTypes": [
+                    {"name": "string", "class": "solr.StrField"},
+                    {"name": "pint", "class": "solr.IntPointField"},
+                    {"name": "plong", "class": "solr.LongPointField"},
+                    {"name": "text_general", "class": "solr.TextField"},
+                    {"name": "knn_vector", "class": "solr.DenseVectorField"},
+                ],
+                "fields": [
+                    {"name": "id", "type": "string"},
+                    {"name": "age", "type": "pint"},
+                    {"name": "tags", "type": "string", "multiValued": True},
+                    {"name": "_text_", "type": "text_general", "stored": False},
+                    {"name": "_version_", "type": "plong"},
+                    {"name": "vector_field", "type": "knn_vector"},
+                ],
+            }
+        }
+        client = MagicMock(url="http://solr/people")
+
+        schema = load_arrow_schema(client)
+
+        get_http_session.return_value.get.assert_called_once_with(
+            "http://solr/people/schema", params={"wt": "json"}
+        )
+        self.assertEqual(
+            schema,
+            pa.schema(
+                [
+                    ("id", pa.string()),
+                    ("age", pa.int32()),
+                    ("tags", pa.list_(pa.string())),
+                    ("_version_", pa.int64()),
+                    ("vector_field", pa.list_(pa.float32())),
+                ]
+            ),
+        )
+        self.assertEqual(load_arrow_schema(client, "id,age").names, ["id", "age"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from pysolr import Results
+
+from solr.ltr.hybrid import (
+    hybrid_search,
+    reciprocal_rank_fusion,
+    weighted_score_fusion,
+)
+
+TEXT_DOCS = [
+    {"id": "a", "name": "Ann", "score": 12.0},
+    {"id": "b", "name": "Bob", "score": 6.0},
+    {"id": "c", "name": "Cid", "score": 2.0},
+]
+VECTOR_DOCS = [
+    {"id": "c", "name": "Cid", "score": 0.9},
+    {"id": "d", "name": "Dee", "score": 0.8},
+]
+
+
+class FakeModel:
+    def encode(self, text):
+        return np.array([0.5, -0.25], dtype=np.float32)
+
+
+class FakeSolrClient:
+    """Answers text and KNN requests after a delay and records their overlap."""
+
+    url = "http://solr/people"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    def post(self, url, data=None, **kwargs):
+        params = json.loads(data)["params"]
+        with self.lock:
+            self.requests.append(params)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        docs = VECTOR_DOCS if params["q"].startswith("{!knn") else TEXT_DOCS
+        text = json.dumps({"response": {"numFound": len(docs), "docs": docs}})
+        return SimpleNamespace(status_code=200, text=text)
+
+    @property
+    def decoder(self):
+        return json.JSONDecoder()
+
+    results_cls = Results
+
+
+class TestFusion(unittest.TestCase):
+    def test_reciprocal_rank_fusion(self):
+        scores = reciprocal_rank_fusion([TEXT_DOCS, VECTOR_DOCS], k=60)
+
+        self.assertAlmostEqual(scores["c"], 1 / 63 + 1 / 61)
+        self.assertEqual(max(scores, key=scores.get), "c")
+        self.assertAlmostEqual(scores["d"], 1 / 62)
+
+    def test_weighted_fusion_normalizes_scores(self):
+        scores = weighted_score_fusion([TEXT_DOCS, VECTOR_DOCS], [0.4, 0.6])
+
+        self.assertAlmostEqual(scores["a"], 0.4)
+        self.assertAlmostEqual(scores["b"], 0.4 * 0.4)
+        self.assertAlmostEqual(scores["c"], 0.6)
+        self.assertAlmostEqual(scores["d"], 0.0)
+
+
+class TestHybridSearch(unittest.TestCase):
+    def setUp(self):
+        # The fake client also answers the posts of the pooled session
+        patcher = patch(
+            "solr.session.get_http_session", side_effect=lambda: self.client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rrf_sends_text_and_knn_concurrently(self):
+        self.client = client = FakeSolrClient()
+
+        results = hybrid_search(
+            client,
+            FakeModel(),
+            "hiking fans",
+            text_weight=0.4,
+            vector_weight=0.6,
+            top_k=3,
+        )
+
+        self.assertEqual(client.max_in_flight, 2)
+        self.assertEqual([doc["id"] for doc in results], ["c", "d", "a"])
+        self.assertEqual(results[2]["name"], "Ann")
+        knn = [r for r in client.requests if r["q"].startswith("{!knn")][0]
+        self.assertEqual(knn["q"], "{!knn f=vector_field topK=3}[0.5,-0.25]")
+
+    def test_solr_mode_is_one_request(self):
+        self.client = client = FakeSolrClient(delay=0)
+
+        hybrid_search(client, FakeModel(), "hiking", mode="solr", top_k=5)
+
+        (params,) = client.requests
+        self.assertTrue(params["q"].startswith("{!func}sum("))
+        self.assertEqual(params["user_query"], "hiking")
+        self.assertEqual(
+            params["vector_query"], "{!knn f=vector_field topK=5}[0.5,-0.25]"
+        )
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            hybrid_search(FakeSolrClient(), FakeModel(), "x", mode="sum")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from prometheus_client import REGISTRY
+
+from solr.metrics import observe_qtime
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import generate_documents_columnar
+
+
+def sample(name: str, labels: dict = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+class TestIngestMetrics(unittest.TestCase):
+    def test_qtime_is_read_from_update_response(self):
+        before_count = sample("solr_update_qtime_seconds_count")
+        before_sum = sample("solr_update_qtime_seconds_sum")
+
+        observe_qtime(json.dumps({"responseHeader": {"status": 0, "QTime": 250}}))
+        observe_qtime("<response/>")
+        observe_qtime(None)
+
+        self.assertEqual(sample("solr_update_qtime_seconds_count"), before_count + 1)
+        self.assertAlmostEqual(
+            sample("solr_update_qtime_seconds_sum"), before_sum + 0.25
+        )
+
+    @patch("solr.session.get_http_session")
+    def test_add_and_serialize_stages(self, get_http_session):
+        get_http_session.return_value.post.return_value.status_code = 200
+        client = MagicMock(url="http://solr/people")
+        client.add.return_value = '{"responseHeader":{"QTime":3}}'
+        before_add = sample("solr_ingest_stage_seconds_count", {"stage": "add"})
+        before_serialize = sample(
+            "solr_ingest_stage_seconds_count", {"stage": "serialize"}
+        )
+
+        CommitPolicy("none").add(client, [{"id": 1}])
+        CommitPolicy("none", update_format="cbor").add(client, [{"id": 2}])
+
+        self.assertEqual(
+            sample("solr_ingest_stage_seconds_count", {"stage": "add"}), before_add + 2
+        )
+        self.assertEqual(
+            sample("solr_ingest_stage_seconds_count", {"stage": "serialize"}),
+            before_serialize + 1,
+        )
+
+    def test_columnar_generator_reports_generate_and_validate(self):
+        before_generate = sample(
+            "solr_ingest_stage_seconds_count", {"stage": "generate"}
+        )
+        before_validate = sample(
+            "solr_ingest_stage_seconds_count", {"stage": "validate"}
+        )
+
+        generate_documents_columnar(1, 100, vocabulary_size=50)
+
+        self.assertEqual(
+            sample("solr_ingest_stage_seconds_count", {"stage": "generate"}),
+            before_generate + 1,
+        )
+        self.assertEqual(
+            sample("solr_ingest_stage_seconds_count", {"stage": "validate"}),
+            before_validate + 1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+
+from solr.usage.cache import set_query_cache
+from solr.usage.parallel import QuerySpec, run_queries
+from solr.usage.query import query_by_age_range
+
+
+class SlowSolrClient:
+    url = "http://solr/people"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def search(self, query, **params):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later queries answer faster, so completion order differs from input order
+            age_filter = " ".join(params.get("fq", []))
+            min_age = (
+                int(age_filter.split("[")[1].split(" ")[0]) if "[" in age_filter else 0
+            )
+            time.sleep(0.05 if min_age == 99 else 0.02 - min_age / 10_000)
+            if min_age == 77:
+                raise ValueError("Solr rejected the query")
+            return [{"id": age_filter}]
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestRunQueries(unittest.TestCase):
+    def setUp(self):
+        set_query_cache(None)
+        self.addCleanup(set_query_cache, None)
+
+    def test_keeps_input_order_and_runs_concurrently(self):
+        client = SlowSolrClient()
+        specs = [QuerySpec(query_by_age_range, (age, age + 5)) for age in range(18, 58)]
+
+        batch = run_queries(client, specs, max_workers=8)
+
+        self.assertEqual(
+            batch.values,
+            [[str({"id": f"age:[{age} TO {age + 5}]"})] for age in range(18, 58)],
+        )
+        self.assertEqual(client.max_in_flight, 8)
+        summary = batch.latency_summary()
+        self.assertEqual(summary["queries"], 40)
+        self.assertEqual(summary["failed"], 0)
+        self.assertLess(summary["wall_time"], summary["total_latency"] / 3)
+        self.assertLessEqual(summary["p50"], summary["p95"])
+        self.assertLessEqual(summary["p95"], summary["max"])
+
+    def test_errors_and_timeouts_are_reported_per_query(self):
+        client = SlowSolrClient()
+        specs = [
+            QuerySpec(query_by_age_range, (18, 30)),
+            QuerySpec(query_by_age_range, (99, 100), timeout=0.01),
+            QuerySpec(query_by_age_range, (77, 80)),
+            QuerySpec(query_by_age_range, (40, 50)),
+        ]
+
+        batch = run_queries(client, specs, max_workers=4)
+
+        self.assertEqual(
+            [result.ok for result in batch.results], [True, False, False, True]
+        )
+        self.assertIsInstance(batch.results[1].error, TimeoutError)
+        self.assertIsInstance(batch.results[2].error, ValueError)
+        self.assertIsNone(batch.values[1])
+        self.assertEqual(batch.latency_summary()["failed"], 2)
+
+    def test_batch_timeout_applies_to_every_query(self):
+        client = SlowSolrClient()
+        specs = [QuerySpec(query_by_age_range, (18, 20))] + [
+            QuerySpec(query_by_age_range, (99, 100)) for _ in range(3)
+        ]
+
+        batch = run_queries(client, specs, max_workers=4, timeout=0.03)
+
+        self.assertEqual([result.ok for result in batch.results], [True] + [False] * 3)
+
+    def test_time_spent_queued_does_not_count(self):
+        client = SlowSolrClient()
+        # 12 queries of ~20ms on 2 workers take ~120ms, each one is fast
+        specs = [QuerySpec(query_by_age_range, (age, age + 1)) for age in range(20, 32)]
+
+        batch = run_queries(client, specs, max_workers=2, timeout=0.045)
+
+        self.assertTrue(all(result.ok for result in batch.results))
+        self.assertGreater(batch.wall_time, 0.045)
+
+    def test_late_result_collected_after_its_timeout_is_reported(self):
+        client = SlowSolrClient()
+        specs = [
+            QuerySpec(query_by_age_range, (99, 100)),
+            QuerySpec(query_by_age_range, (40, 50), timeout=0.001),
+        ]
+
+        batch = run_queries(client, specs, max_workers=2)
+
+        # The second query is done before the first, but over its timeout
+        self.assertEqual([result.ok for result in batch.results], [True, False])
+        self.assertIsInstance(batch.results[1].error, TimeoutError)
+
+    def test_kwargs_default_is_not_shared(self):
+        self.assertIsNone(QuerySpec(query_by_age_range).kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock
+
+from solr.usage.cache import set_query_cache
+from solr.usage.query import query_by_age_range, query_by_gender_and_city
+from solr.usage.query_builder import SolrQuery, escape_query_value
+
+
+class TestEscapeQueryValue(unittest.TestCase):
+    def test_escapes_special_characters_and_whitespace(self):
+        self.assertEqual(escape_query_value("New York"), "New\\ York")
+        self.assertEqual(escape_query_value('a:b(c)"d"'), 'a\\:b\\(c\\)\\"d\\"')
+        self.assertEqual(escape_query_value("AT&T || x"), "AT\\&T\\ \\|\\|\\ x")
+        self.assertEqual(escape_query_value("C:\\dir/*"), "C\\:\\\\dir\\/\\*")
+
+    def test_leaves_plain_values_untouched(self):
+        self.assertEqual(escape_query_value("Female"), "Female")
+        self.assertEqual(escape_query_value(42), "42")
+
+
+class TestSolrQuery(unittest.TestCase):
+    def test_constraints_become_separate_filter_queries(self):
+        query = (
+            SolrQuery()
+            .filter("gender", "Female")
+            .filter("city", "Port Alexander")
+            .range("age", 18, None)
+            .param("rows", 5)
+        )
+
+        self.assertEqual(query.q, "*:*")
+        self.assertEqual(
+            query.to_params(),
+            {
+                "rows": 5,
+                "fq": [
+                    "gender:Female",
+                    "{!cache=false}city:Port\\ Alexander",
+                    "age:[18 TO *]",
+                ],
+            },
+        )
+
+    def test_cache_flag_overrides_field_default(self):
+        query = SolrQuery().filter("city", "Berlin", cache=True)
+        query.range("age", 18, 30, cache=False)
+
+        self.assertEqual(
+            query.to_params()["fq"], ["city:Berlin", "{!cache=false}age:[18 TO 30]"]
+        )
+
+    def test_no_filters_sends_no_fq(self):
+        self.assertEqual(SolrQuery("name:x").to_params(), {})
+
+
+class TestQueryHelpers(unittest.TestCase):
+    def setUp(self):
+        set_query_cache(None)
+        self.addCleanup(set_query_cache, None)
+        self.client = MagicMock()
+        self.client.search.return_value = [{"id": "1"}]
+
+    def test_gender_and_city_use_filter_queries(self):
+        self.assertEqual(
+            query_by_gender_and_city(self.client, "Male", "Lake Mary"),
+            ["{'id': '1'}"],
+        )
+        self.client.search.assert_called_once_with(
+            "*:*", fq=["gender:Male", "{!cache=false}city:Lake\\ Mary"]
+        )
+
+    def test_age_range_uses_filter_query(self):
+        query_by_age_range(self.client, 18, 30)
+        self.client.search.assert_called_once_with("*:*", fq=["age:[18 TO 30]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
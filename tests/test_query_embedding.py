@@ -0,0 +1,108 @@
+import gc
+import threading
+import unittest
+import weakref
+from types import SimpleNamespace
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from solr.ltr.query_embedding import (
+    QueryEmbeddingCache,
+    get_query_embedding,
+    get_query_embedding_cache,
+    normalize_query,
+    tokenizer_lowercases,
+)
+
+
+class CountingModel:
+    def __init__(self, do_lower_case: bool = True):
+        self.encoded = []
+        self.lock = threading.Lock()
+        self.tokenizer = SimpleNamespace(do_lower_case=do_lower_case)
+
+    def encode(self, text):
+        with self.lock:
+            self.encoded.append(text)
+        return np.array([len(text), 0.5], dtype=np.float32)
+
+
+def hits() -> float:
+    return REGISTRY.get_sample_value("solr_query_embedding_cache_hits_total") or 0
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(
+            normalize_query("  Hiking\tand\n OUTDOOR  "), "hiking and outdoor"
+        )
+        self.assertEqual(normalize_query("ｈｉｋｉｎｇ"), "hiking")
+        self.assertEqual(normalize_query(" Hiking  ", casefold=False), "Hiking")
+
+    def test_repeated_queries_are_encoded_once(self):
+        model = CountingModel()
+        cache = QueryEmbeddingCache()
+        before = hits()
+
+        first = cache.get(model, "Hiking  trips")
+        second = cache.get(model, "hiking trips ")
+
+        self.assertIs(first, second)
+        # The query is encoded as given, only the key is normalized
+        self.assertEqual(model.encoded, ["Hiking  trips"])
+        self.assertEqual(first.vector_str, "[13.0,0.5]")
+        self.assertFalse(first.vector.flags.writeable)
+        self.assertEqual(hits(), before + 1)
+
+    def test_evicts_least_recently_used(self):
+        model = CountingModel()
+        cache = QueryEmbeddingCache(max_entries=2)
+
+        for query in ["a", "b", "a", "c", "a", "b"]:
+            cache.get(model, query)
+
+        self.assertEqual(model.encoded, ["a", "b", "c", "b"])
+        self.assertEqual(len(cache), 2)
+
+    def test_one_cache_per_model(self):
+        model = CountingModel()
+
+        get_query_embedding(model, "x")
+        get_query_embedding(model, "X")
+
+        self.assertIs(
+            get_query_embedding_cache(model), get_query_embedding_cache(model)
+        )
+        self.assertIsNot(
+            get_query_embedding_cache(model), get_query_embedding_cache(CountingModel())
+        )
+        self.assertEqual(model.encoded, ["x"])
+
+    def test_cased_models_keep_case_in_the_key(self):
+        model = CountingModel(do_lower_case=False)
+        self.assertFalse(tokenizer_lowercases(model))
+
+        get_query_embedding(model, "Paris")
+        get_query_embedding(model, "paris")
+
+        self.assertEqual(model.encoded, ["Paris", "paris"])
+
+    def test_cache_does_not_keep_the_model_alive(self):
+        model = CountingModel()
+        get_query_embedding(model, "x")
+        model_ref = weakref.ref(model)
+
+        del model
+        gc.collect()
+
+        self.assertIsNone(model_ref())
+
+    def test_formats_with_the_configured_encoding(self):
+        cache = QueryEmbeddingCache(encoding="int8")
+
+        self.assertEqual(cache.get(CountingModel(), "abcd").vector_str, "[127,16]")
+
+
+if __name__ == "__main__":
+    unittest.main()
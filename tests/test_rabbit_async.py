@@ -0,0 +1,187 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from solr.importer.rabbit_async import AsyncBatchingWorker, AsyncSolrWriter
+from solr.usage.commit import CommitPolicy
+
+
+class FakeMessage:
+    def __init__(self, delivery_tag: int, body: bytes):
+        self.delivery_tag = delivery_tag
+        self.body = body
+        self.state = None
+
+    async def ack(self):
+        self.state = "ack"
+
+    async def nack(self, requeue: bool = True):
+        self.state = "nack"
+
+    async def reject(self, requeue: bool = False):
+        self.state = "reject"
+
+
+class FakeAsyncWriter:
+    def __init__(self, rejected_ids: set = frozenset(), latency: float = 0.01):
+        self.rejected_ids = rejected_ids
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def add(self, documents):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if any(document["id"] in self.rejected_ids for document in documents):
+                raise Exception("Solr rejected the batch")
+            self.requests.append(documents)
+        finally:
+            self.in_flight -= 1
+
+
+def make_messages(count: int) -> list:
+    return [
+        FakeMessage(index + 1, json.dumps({"id": index}).encode("utf-8"))
+        for index in range(count)
+    ]
+
+
+class TestAsyncBatchingWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_batches_are_written_concurrently_and_acked(self):
+        writer = FakeAsyncWriter()
+        worker = AsyncBatchingWorker(writer, writers=4, batch_size=10)
+        worker.start()
+
+        messages = make_messages(80)
+        for message in messages:
+            await worker.on_message(message)
+        await worker.shutdown()
+
+        self.assertEqual(len(writer.requests), 8)
+        self.assertGreater(writer.max_in_flight, 1)
+        self.assertTrue(all(message.state == "ack" for message in messages))
+
+    async def test_failed_messages_are_nacked_and_partial_batch_flushed(self):
+        writer = FakeAsyncWriter(rejected_ids={3})
+        worker = AsyncBatchingWorker(writer, writers=2, batch_size=100)
+        worker.start()
+
+        messages = make_messages(5) + [FakeMessage(6, b"not json")]
+        for message in messages:
+            await worker.on_message(message)
+        await worker.shutdown()
+
+        states = {message.delivery_tag: message.state for message in messages}
+        self.assertEqual(
+            states, {1: "ack", 2: "ack", 3: "ack", 4: "nack", 5: "ack", 6: "reject"}
+        )
+
+    async def test_failed_ack_does_not_stop_the_writer(self):
+        writer = FakeAsyncWriter()
+        worker = AsyncBatchingWorker(writer, writers=1, batch_size=3)
+        worker.start()
+
+        messages = make_messages(6)
+
+        async def closed_channel():
+            raise Exception("Channel closed")
+
+        messages[1].ack = closed_channel
+        for message in messages:
+            await worker.on_message(message)
+        await worker.shutdown()
+
+        # Neither batch is sent twice and the second one is still written
+        self.assertEqual(len(writer.requests), 2)
+        self.assertEqual(
+            [message.state for message in messages],
+            ["ack", None, "ack", "ack", "ack", "ack"],
+        )
+
+    async def test_batch_timeout_flushes_incomplete_batches(self):
+        writer = FakeAsyncWriter()
+        worker = AsyncBatchingWorker(
+            writer, writers=1, batch_size=100, batch_timeout_ms=20
+        )
+        worker.start()
+
+        messages = make_messages(3)
+        for message in messages:
+            await worker.on_message(message)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(writer.requests), 1)
+        await worker.shutdown()
+
+
+class RecordingAsyncSolrWriter(AsyncSolrWriter):
+    """Records the update requests instead of posting them."""
+
+    def __init__(self, policy: CommitPolicy):
+        super().__init__("http://solr", policy)
+        self.posts = []
+
+    async def _post(self, handler, body, params, content_type):
+        self.posts.append((handler, params))
+
+
+class TestAsyncSolrWriterCommits(unittest.IsolatedAsyncioTestCase):
+    async def test_soft_policy_commits_when_due_and_on_finish(self):
+        writer = RecordingAsyncSolrWriter(
+            CommitPolicy("soft", soft_commit_docs=10, soft_commit_seconds=None)
+        )
+
+        for _ in range(4):
+            await writer.add([{"id": index} for index in range(4)])
+        await writer.finish()
+
+        # Due after the third add, the fourth is committed by finish
+        self.assertEqual(
+            writer.posts,
+            [
+                ("update", {}),
+                ("update", {}),
+                ("update", {}),
+                ("update", {"softCommit": "true"}),
+                ("update", {}),
+                ("update", {"softCommit": "true"}),
+            ],
+        )
+
+    async def test_hard_policy_commits_once_on_finish(self):
+        writer = RecordingAsyncSolrWriter(CommitPolicy("hard"))
+
+        await writer.add([{"id": 1}])
+        await writer.finish()
+
+        self.assertEqual(writer.posts, [("update", {}), ("update", {"commit": "true"})])
+
+    @patch("solr.importer.rabbit_async.invalidate_query_cache")
+    async def test_within_policy_never_commits(self, invalidate):
+        writer = RecordingAsyncSolrWriter(CommitPolicy("within", 500))
+
+        await writer.add([{"id": 1}])
+        await writer.finish()
+
+        self.assertEqual(writer.posts, [("update", {"commitWithin": "500"})])
+        invalidate.assert_not_called()
+
+
+class TestAsyncSolrWriter(unittest.TestCase):
+    def test_update_params_follow_commit_policy(self):
+        self.assertEqual(
+            AsyncSolrWriter("http://solr", CommitPolicy("within", 500)).update_params(),
+            {"commitWithin": "500"},
+        )
+        self.assertEqual(
+            AsyncSolrWriter("http://solr", CommitPolicy("always")).update_params(),
+            {"commit": "true"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
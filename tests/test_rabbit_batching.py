@@ -0,0 +1,64 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from solr.importer.rabbit import BatchingConsumer
+from solr.usage.commit import CommitPolicy
+from tests.stubs import StubChannel
+
+
+class RejectingSolrClient:
+    def __init__(self, rejected_ids: set):
+        self.rejected_ids = rejected_ids
+        self.requests = []
+
+    def add(self, documents, **kwargs):
+        self.requests.append(documents)
+        if any(document["id"] in self.rejected_ids for document in documents):
+            raise Exception("Solr rejected the batch")
+
+
+class TestBatchingConsumer(unittest.TestCase):
+    def setUp(self):
+        self.bodies = [json.dumps({"id": index}).encode("utf-8") for index in range(10)]
+
+    def test_sends_one_add_per_batch_and_acks_multiple(self):
+        channel = StubChannel(self.bodies)
+        solr = RejectingSolrClient(set())
+
+        BatchingConsumer(
+            channel, solr, batch_size=5, policy=CommitPolicy("within")
+        ).start()
+
+        self.assertEqual(channel.prefetch_count, 10)
+        self.assertEqual([len(request) for request in solr.requests], [5, 5])
+        self.assertEqual(channel.acked, set(range(1, 11)))
+        self.assertEqual(channel.nacked, set())
+
+    def test_nacks_only_failed_and_malformed_messages(self):
+        channel = StubChannel(self.bodies[:4] + [b"not json"] + self.bodies[4:])
+        solr = RejectingSolrClient({2})
+
+        BatchingConsumer(
+            channel, solr, batch_size=20, policy=CommitPolicy("within")
+        ).start()
+
+        # delivery tag 3 carries id 2, tag 5 the malformed message
+        self.assertEqual(channel.nacked, {3, 5})
+        self.assertEqual(channel.acked, set(range(1, 12)) - {3, 5})
+
+    def test_uses_commit_policy_for_batches(self):
+        channel = StubChannel(self.bodies)
+        solr = MagicMock()
+
+        BatchingConsumer(
+            channel, solr, batch_size=10, policy=CommitPolicy("within", 250)
+        ).start()
+
+        solr.add.assert_called_once()
+        self.assertEqual(solr.add.call_args.kwargs["commitWithin"], 250)
+        solr.commit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
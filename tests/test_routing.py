@@ -0,0 +1,204 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pysolr
+
+from solr.usage.commit import CommitPolicy
+from solr.usage.document import add_documents_to_solr
+from solr.usage.routing import (
+    ShardRouter,
+    base_url_for_node_name,
+    composite_id_hash,
+    murmurhash3_x86_32,
+    parse_shards,
+)
+
+FOUR_SHARDS = {
+    "shards": {
+        f"shard{index + 1}": {
+            "range": hash_range,
+            "state": "active",
+            "replicas": {
+                f"core_node{index * 2 + 1}": {
+                    "core": f"people_shard{index + 1}_replica_n1",
+                    "base_url": "http://solr1:8983/solr",
+                    "state": "active",
+                    "leader": "true",
+                },
+                f"core_node{index * 2 + 2}": {
+                    "core": f"people_shard{index + 1}_replica_n2",
+                    "base_url": "http://solr2:8983/solr",
+                    "state": "active",
+                },
+            },
+        }
+        for index, hash_range in enumerate(
+            [
+                "80000000-bfffffff",
+                "c0000000-ffffffff",
+                "0-3fffffff",
+                "40000000-7fffffff",
+            ]
+        )
+    }
+}
+
+
+class TestCompositeIdHash(unittest.TestCase):
+    def test_murmurhash3_reference_values(self):
+        self.assertEqual(murmurhash3_x86_32(b"hello") & 0xFFFFFFFF, 0x248BFA47)
+        self.assertEqual(murmurhash3_x86_32(b""), 0)
+        self.assertEqual(murmurhash3_x86_32(b"", seed=1) & 0xFFFFFFFF, 0x514E28B7)
+
+    def test_plain_id_hashes_utf8(self):
+        self.assertEqual(
+            composite_id_hash("hello"), murmurhash3_x86_32("hello".encode("utf-8"))
+        )
+        self.assertEqual(
+            composite_id_hash("müller"), murmurhash3_x86_32("müller".encode("utf-8"))
+        )
+
+    def test_shard_key_prefix_sets_upper_bits(self):
+        tenant = murmurhash3_x86_32(b"tenant") & 0xFFFFFFFF
+        doc = murmurhash3_x86_32(b"42") & 0xFFFFFFFF
+
+        expected = (tenant & 0xFFFF0000) | (doc & 0x0000FFFF)
+        self.assertEqual(composite_id_hash("tenant!42") & 0xFFFFFFFF, expected)
+
+        # Documents of the same tenant share the upper 16 bits
+        self.assertEqual(
+            composite_id_hash("tenant!1") >> 16, composite_id_hash("tenant!2") >> 16
+        )
+
+    def test_shard_key_bits(self):
+        tenant = murmurhash3_x86_32(b"tenant") & 0xFFFFFFFF
+        doc = murmurhash3_x86_32(b"42") & 0xFFFFFFFF
+
+        expected = (tenant & 0xF0000000) | (doc & 0x0FFFFFFF)
+        self.assertEqual(composite_id_hash("tenant/4!42") & 0xFFFFFFFF, expected)
+
+
+class TestShardRouter(unittest.TestCase):
+    def test_parse_shards_picks_leaders(self):
+        shards = parse_shards(FOUR_SHARDS)
+
+        self.assertEqual(len(shards), 4)
+        shard1 = next(shard for shard in shards if shard.name == "shard1")
+        self.assertEqual(shard1.range_min, -(2**31))
+        self.assertEqual(shard1.range_max, -(2**30) - 1)
+        self.assertEqual(
+            shard1.leader_url, "http://solr1:8983/solr/people_shard1_replica_n1"
+        )
+
+    def test_parse_solr9_state_json_without_base_url(self):
+        # /collections/people/state.json as written by Solr 9
+        state = {
+            "shards": {
+                "shard1": {
+                    "range": "80000000-ffffffff",
+                    "state": "active",
+                    "replicas": {
+                        "core_node2": {
+                            "core": "people_shard1_replica_n1",
+                            "node_name": "solr1:8983_solr",
+                            "type": "NRT",
+                            "state": "active",
+                            "leader": "true",
+                            "force_set_state": "false",
+                        }
+                    },
+                },
+                "shard2": {
+                    "range": "0-7fffffff",
+                    "state": "active",
+                    "replicas": {
+                        "core_node4": {
+                            "core": "people_shard2_replica_n3",
+                            "node_name": "solr2:8983_solr",
+                            "type": "NRT",
+                            "state": "active",
+                            "leader": "true",
+                        }
+                    },
+                },
+            }
+        }
+
+        shards = {shard.name: shard.leader_url for shard in parse_shards(state)}
+
+        self.assertEqual(
+            shards,
+            {
+                "shard1": "http://solr1:8983/solr/people_shard1_replica_n1",
+                "shard2": "http://solr2:8983/solr/people_shard2_replica_n3",
+            },
+        )
+        self.assertEqual(
+            parse_shards(state, "https")[0].leader_url[:27],
+            "https://solr1:8983/solr/peo",
+        )
+
+    def test_base_url_for_node_name(self):
+        self.assertEqual(
+            base_url_for_node_name("10.0.0.5:8983_solr"), "http://10.0.0.5:8983/solr"
+        )
+        self.assertEqual(
+            base_url_for_node_name("host:80_my%2Fsolr", "https"),
+            "https://host:80/my/solr",
+        )
+
+    def test_partition_matches_hash_ranges(self):
+        router = ShardRouter(lambda: parse_shards(FOUR_SHARDS))
+        documents = [{"id": index} for index in range(1_000)]
+
+        batches = router.partition(documents)
+
+        self.assertEqual(sum(len(batch) for batch in batches.values()), 1_000)
+        self.assertEqual(len(batches), 4)
+        shards = {shard.name: shard for shard in router.shards}
+        for name, batch in batches.items():
+            for document in batch:
+                doc_hash = composite_id_hash(str(document["id"]))
+                self.assertGreaterEqual(doc_hash, shards[name].range_min)
+                self.assertLessEqual(doc_hash, shards[name].range_max)
+
+    @patch("solr.usage.routing.get_shared_solr_client")
+    def test_add_documents_sends_sub_batches_to_leaders(self, get_client):
+        leaders = {}
+        get_client.side_effect = lambda url: leaders.setdefault(url, MagicMock())
+        router = ShardRouter(lambda: parse_shards(FOUR_SHARDS))
+        collection_client = MagicMock()
+        documents = [{"id": index} for index in range(1_000)]
+
+        add_documents_to_solr(
+            collection_client,
+            documents,
+            1,
+            batch_size=500,
+            commit_policy=CommitPolicy("none"),
+            router=router,
+        )
+
+        collection_client.add.assert_not_called()
+        self.assertEqual(len(leaders), 4)
+        for url, client in leaders.items():
+            self.assertEqual(client.add.call_count, 2)
+            shard = next(shard for shard in router.shards if shard.leader_url == url)
+            for call in client.add.call_args_list:
+                for document in call.args[0]:
+                    self.assertIs(router.shard_for(document["id"]), shard)
+
+    @patch("solr.usage.routing.get_shared_solr_client")
+    def test_failure_refreshes_cluster_state(self, get_client):
+        get_client.return_value.add.side_effect = pysolr.SolrError("leader moved")
+        load_shards = MagicMock(return_value=parse_shards(FOUR_SHARDS))
+        router = ShardRouter(load_shards)
+
+        with self.assertRaises(pysolr.SolrError):
+            router.add(lambda client: client.add([{"id": 1}]), "shard1")
+
+        self.assertEqual(load_shards.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
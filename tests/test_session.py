@@ -0,0 +1,103 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prometheus_client import REGISTRY
+
+from solr.session import (
+    create_http_session,
+    get_pool_stats,
+    get_shared_solr_client,
+    reset_http_session,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"responseHeader": {"status": 0}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def tearDown(self):
+        reset_http_session()
+
+    def test_update_posts_are_not_retried_on_gateway_errors(self):
+        retries = create_http_session().get_adapter(self.url).max_retries
+
+        self.assertTrue(retries.is_retry("GET", 503))
+        self.assertFalse(retries.is_retry("POST", 503))
+
+    def test_shared_client_is_reused_per_url(self):
+        first = get_shared_solr_client(f"{self.url}/collection")
+        second = get_shared_solr_client(f"{self.url}/collection")
+        other = get_shared_solr_client(f"{self.url}/other")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertIs(first.session, other.session)
+
+    def test_keep_alive_connections_count_as_pool_hits(self):
+        session = create_http_session(pool_maxsize=2)
+        before = get_pool_stats()
+
+        for _ in range(5):
+            self.assertEqual(session.get(f"{self.url}/admin/ping").status_code, 200)
+        session.close()
+
+        after = get_pool_stats()
+        self.assertEqual(after["checkouts"] - before["checkouts"], 5)
+        self.assertEqual(after["new_connections"] - before["new_connections"], 1)
+        self.assertGreater(after["hits"], before["hits"])
+
+    def test_round_trip_of_updates_and_in_flight_are_measured(self):
+        session = create_http_session()
+        host = self.url.split("//")[1]
+        before = (
+            REGISTRY.get_sample_value(
+                "solr_ingest_stage_seconds_count", {"stage": "http"}
+            )
+            or 0
+        )
+
+        for _ in range(3):
+            session.get(f"{self.url}/people/update")
+        # Queries are not part of the ingest stage
+        session.get(f"{self.url}/people/select")
+        session.close()
+
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "solr_ingest_stage_seconds_count", {"stage": "http"}
+            ),
+            before + 3,
+        )
+        self.assertEqual(
+            REGISTRY.get_sample_value("solr_http_in_flight_requests", {"host": host}),
+            0,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
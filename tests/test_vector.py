@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pysolr
+
+from solr.ltr.vector import (
+    encode_vectors,
+    format_vector,
+    get_vector_encoding,
+    load_schema_vector_encoding,
+    quantize_int8,
+)
+from solr.usage.query import search_with_post
+
+
+class TestVectorFormatting(unittest.TestCase):
+    def test_float32_is_rounded_to_precision(self):
+        vector = np.array([0.0125728633, -0.5, 1e-9], dtype=np.float32)
+
+        self.assertEqual(format_vector(vector), "[0.012573,-0.5,0.0]")
+        self.assertEqual(format_vector(vector, precision=3), "[0.013,-0.5,0.0]")
+
+    def test_float16_drops_digits_float16_cannot_hold(self):
+        vector = np.array([0.0125728633, 0.333333], dtype=np.float32)
+
+        self.assertEqual(format_vector(vector, "float16"), "[0.0126,0.3333]")
+
+    def test_int8_scales_each_vector(self):
+        vectors = np.array([[0.5, -0.25, 0.0], [0.0, 0.0, 0.0]], dtype=np.float32)
+
+        np.testing.assert_array_equal(
+            quantize_int8(vectors), [[127, -64, 0], [0, 0, 0]]
+        )
+        self.assertEqual(encode_vectors(vectors, "int8"), [[127, -64, 0], [0, 0, 0]])
+        self.assertEqual(format_vector(vectors[0], "int8"), "[127,-64,0]")
+
+    def test_rejects_unknown_encoding(self):
+        with self.assertRaises(ValueError):
+            format_vector(np.zeros(2), "bfloat16")
+
+
+class TestVectorEncodingConfig(unittest.TestCase):
+    def test_schema_default_is_float32(self):
+        self.assertEqual(load_schema_vector_encoding(), "FLOAT32")
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_vector_encoding(), "float32")
+        with patch.dict(os.environ, {"SOLR_VECTOR_ENCODING": "float16"}):
+            self.assertEqual(get_vector_encoding(), "float16")
+
+    def test_byte_field_needs_int8(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+            json.dump(
+                {
+                    "add-field-type": [
+                        {
+                            "name": "v",
+                            "class": "solr.DenseVectorField",
+                            "vectorEncoding": "BYTE",
+                        }
+                    ]
+                },
+                file,
+            )
+        self.addCleanup(os.remove, file.name)
+        schema_encoding = load_schema_vector_encoding(file.name)
+
+        with patch(
+            "solr.ltr.vector.load_schema_vector_encoding", return_value=schema_encoding
+        ):
+            with patch.dict(os.environ, {}, clear=True):
+                self.assertEqual(get_vector_encoding(), "int8")
+            with patch.dict(os.environ, {"SOLR_VECTOR_ENCODING": "float32"}):
+                with self.assertRaises(ValueError):
+                    get_vector_encoding()
+
+
+class TestSearchWithPost(unittest.TestCase):
+    def test_sends_params_as_json_body(self):
+        client = pysolr.Solr("http://localhost:8983/solr/people")
+        response = {"response": {"numFound": 1, "docs": [{"id": "1"}]}}
+
+        with patch("solr.session.get_http_session") as get_http_session:
+            post = get_http_session.return_value.post
+            post.return_value.status_code = 200
+            post.return_value.text = json.dumps(response)
+            results = search_with_post(client, q="*:*", fq="{!knn f=v topK=5}[1,2]")
+
+        self.assertEqual(
+            post.call_args.args, ("http://localhost:8983/solr/people/select",)
+        )
+        self.assertEqual(
+            json.loads(post.call_args.kwargs["data"]),
+            {"params": {"q": "*:*", "fq": "{!knn f=v topK=5}[1,2]", "wt": "json"}},
+        )
+        self.assertEqual(results.docs, [{"id": "1"}])
+
+
+if __name__ == "__main__":
+    unittest.main()